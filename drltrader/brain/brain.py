@@ -1,4 +1,5 @@
 import numpy as np
+import functools
 import json
 import logging
 import time
@@ -6,15 +7,24 @@ import os
 from pathlib import Path
 import pickle
 import shutil
+import tempfile
+import warnings
 
-from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecNormalize
 from stable_baselines3 import A2C
+from stable_baselines3.common.running_mean_std import RunningMeanStd
 from matplotlib import pyplot as plt
 
 from drltrader.data.data_provider import DataProvider
+from drltrader.data.feature_store import FeatureStore
+from drltrader.data.feature_store import MappedPanel
 from drltrader.data.scenario import Scenario
+from drltrader.envs.backtest import backtest
 from drltrader.envs.single_stock_env import SingleStockEnv
+from drltrader.envs.single_stock_vec_env import SingleStockVecEnv
 from drltrader.envs.portfolio_stocks_env import PortfolioStocksEnv
+from drltrader.envs.portfolio_stocks_env import InfoModes
+from drltrader.envs.portfolio_stocks_vec_env import PortfolioStocksVecEnv
 from drltrader.observers import Observer
 
 logging.basicConfig(format='%(asctime)s %(message)s',
@@ -23,26 +33,50 @@ logging.basicConfig(format='%(asctime)s %(message)s',
                     level=logging.DEBUG)
 
 
+class EnvironmentBackends:
+    # A single PortfolioStocksVecEnv (or SingleStockVecEnv) stepping every environment as NumPy operations
+    Native = 'native'
+    # One env per environment, stepped one after the other in this process
+    Dummy = 'dummy'
+    # One env per environment, each one in its own process
+    Subprocess = 'subprocess'
+
+
 class BrainConfiguration:
+    """
+    With the subprocess environments backend, portfolio panels are shared with every subprocess through a memory
+    mapped feature store, a temporary one when the data provider doesn't have any. Single stock environments
+    don't have a shared layout yet, every subprocess gets its own copy of the bars.
+    """
     def __init__(self,
                  first_layer_size: int = 256,
                  second_layer_size: int = 256,
                  window_size: int = 3,
                  prices_feature_name: str = 'Low',
                  signal_feature_names: list = ['Low', 'Volume'],
-                 use_normalized_observations: bool = True):
+                 use_normalized_observations: bool = True,
+                 environments: int = 1,
+                 environments_backend: str = EnvironmentBackends.Native):
         self.first_layer_size = first_layer_size
         self.second_layer_size = second_layer_size
         self.window_size = window_size
         self.prices_feature_name = prices_feature_name
         self.use_normalized_observations = use_normalized_observations
         self.signal_feature_names = signal_feature_names
+        self.environments = environments
+        self.environments_backend = environments_backend
 
     def __str__(self):
         return json.dumps(self.__dict__)
 
 
 class Brain:
+    PREDICTION_BATCH_SIZE = 4096
+
+    # Same as the VecNormalize defaults used for the environments
+    NORMALIZATION_CLIP = 10.0
+    NORMALIZATION_EPSILON = 1e-8
+
     def __init__(self,
                  data_provider: DataProvider = DataProvider(),
                  brain_configuration: BrainConfiguration = BrainConfiguration()):
@@ -54,11 +88,13 @@ class Brain:
         self._observing = False
         self._model = None
         self._using_multi_symbol_scenarios = None
+        self._temporary_feature_store_directory = None
 
     def learn(self,
               training_scenario: Scenario,
               total_timesteps: int = 1000):
-        training_environment = self._build_environment(training_scenario)
+        training_environment = self._build_environment(training_scenario,
+                                                       environments=self._brain_configuration.environments)
 
         if self._model is None:
             self._init_model(training_environment)
@@ -66,24 +102,75 @@ class Brain:
             self._model.set_env(training_environment)
 
         self._model.learn(total_timesteps=total_timesteps)
+        training_environment.close()
 
     def evaluate(self,
                  testing_scenario: Scenario,
-                 render=True):
-        _, _, info = self._analyze_scenario(testing_scenario, render=render)
+                 render=True,
+                 deterministic: bool = False):
+        if testing_scenario.symbols is not None:
+            internal_environment, info = self._evaluate_portfolio_scenario(testing_scenario, deterministic)
+        else:
+            internal_environment, _, info = self._analyze_scenario(testing_scenario,
+                                                                   render=False,
+                                                                   deterministic=deterministic)
+
+        if render:
+            plt.figure(figsize=(15, 6))
+            plt.cla()
+            internal_environment.render_all()
+            plt.show()
+
         return info
 
-    def start_observing(self, scenario: Scenario, observer: Observer = None):
+    @staticmethod
+    def evaluate_population(brains: list, testing_scenario: Scenario, deterministic: bool = False) -> list:
+        """
+        Profit of every brain on the scenario, in order. Portfolio brains observing the same window of the same
+        features share a single environment: every batch of its observations is read (and normalized) once and
+        given to every policy, and the resulting action sequences are all scored at once by the backtest kernel.
+        Single stock observations depend on the actions taken, so those brains are still evaluated one by one.
+        """
+        if testing_scenario.symbols is None:
+            return [brain.evaluate(testing_scenario, render=False, deterministic=deterministic)['total_profit']
+                    for brain in brains]
+
+        brain_idxs_per_observation_spec = {}
+        for brain_idx, brain in enumerate(brains):
+            brain_idxs_per_observation_spec.setdefault(brain._observation_spec(), []).append(brain_idx)
+
+        profits = [None] * len(brains)
+        for brain_idxs in brain_idxs_per_observation_spec.values():
+            environment = brains[brain_idxs[0]]._build_portfolio_stock_scenario(testing_scenario)
+            allocation = np.array(list(environment.portfolio_allocation().values()))
+            allocated_symbol_idxs = np.flatnonzero(allocation)
+            if len(allocated_symbol_idxs) != 1:
+                raise ValueError("Populations can only be evaluated with a single allocated symbol")
+
+            actions = Brain._predict_population_actions([brains[brain_idx] for brain_idx in brain_idxs],
+                                                        environment.observations(),
+                                                        deterministic)
+            _, final_profits, _ = backtest(actions,
+                                           environment.prices(),
+                                           start_tick=0,
+                                           initial_symbol_idx=allocated_symbol_idxs[0],
+                                           initial_shares=allocation[allocated_symbol_idxs[0]])
+            for brain_idx, final_profit in zip(brain_idxs, final_profits.tolist()):
+                profits[brain_idx] = final_profit
+
+        return profits
+
+    def start_observing(self, scenario: Scenario, observer: Observer = None, live_lookback: int = 1024):
         # TODO: This is done only for PortfolioStocksEnv
         # TODO: Validate that scenario is without end_date
         internal_environment, environment, info = self._analyze_scenario(scenario, render=False)
 
         internal_environment.observer = observer
+        internal_environment.enable_live_mode(live_lookback)
         self._observing = True
         while self._observing:
             logging.info("Running cycle...")
-            new_dataframe_per_symbol = self._data_provider.retrieve_datas(scenario)
-            internal_environment.append_data(dataframe_per_symbol=new_dataframe_per_symbol)
+            internal_environment.append_data(panel=self._retrieve_cycle_panel(scenario))
 
             obs, rewards, done, info = internal_environment.get_step_outputs()
 
@@ -108,6 +195,15 @@ class Brain:
     def stop_observing(self):
         self._observing = False
 
+    def _retrieve_cycle_panel(self, scenario: Scenario):
+        # Streaming providers only fetch and calculate the bars since the last cycle, so cycles cost the same no
+        # matter how long the brain has been observing. The rest calculate the whole scenario again, indicators
+        # calculated over any shorter history wouldn't match the ones the brain was trained with
+        if self._data_provider.is_streaming():
+            return self._data_provider.retrieve_live_panel(scenario, feature_names=self._feature_names())
+
+        return self._data_provider.retrieve_panel(scenario, feature_names=self._feature_names())
+
     def save(self, path: str, override: bool = False):
         # Check and create directory
         directory_exists = (Path.cwd() / path).exists()
@@ -128,13 +224,16 @@ class Brain:
             pickle.dump(self._brain_configuration.__dict__, brain_configuration_file)
 
     @staticmethod
-    def load(path: str):
+    def load(path: str, data_provider: DataProvider = None):
         model_path = f"{path}/model"
         brain_configuration_path = f"{path}/brain_configuration.json"
 
         with open(brain_configuration_path, 'rb') as brain_configuration_file:
             brain_configuration: BrainConfiguration = BrainConfiguration(**pickle.load(brain_configuration_file))
-            new_brain = Brain(brain_configuration=brain_configuration)
+            if data_provider is None:
+                new_brain = Brain(brain_configuration=brain_configuration)
+            else:
+                new_brain = Brain(data_provider=data_provider, brain_configuration=brain_configuration)
             new_brain._model = A2C.load(model_path)
 
             return new_brain
@@ -145,9 +244,74 @@ class Brain:
 
         self._model = A2C('MlpPolicy', env, verbose=0, policy_kwargs=policy_kwargs)
 
+    def _evaluate_portfolio_scenario(self, scenario: Scenario, deterministic: bool):
+        """
+        Portfolio observations don't depend on the actions, so the policy runs once over all of them, in batches,
+        and only the resulting actions are stepped through the environment. Same results as _analyze_scenario.
+        """
+        environment = self._build_portfolio_stock_scenario(scenario)
+        actions = Brain._predict_population_actions([self], environment.observations(), deterministic)
+
+        info = None
+        for action in actions[0]:
+            obs, rewards, done, info = environment.step(action)
+
+        return environment, info
+
+    @staticmethod
+    def _predict_population_actions(brains: list, observations: np.ndarray, deterministic: bool) -> np.ndarray:
+        # (brains, ticks) actions, observations are normalized batch by batch and only once for all the brains.
+        # Every (ticks, window_size, symbols, features) batch is flattened to the observations of the environment
+        observation_shape = (observations.shape[1], int(np.prod(observations.shape[2:])))
+        observations_rms = RunningMeanStd(shape=observation_shape)
+        actions = np.empty((len(brains), len(observations)), dtype=np.int64)
+
+        for batch_start in range(0, len(observations), Brain.PREDICTION_BATCH_SIZE):
+            batch_observations = observations[batch_start:batch_start + Brain.PREDICTION_BATCH_SIZE]
+            batch_observations = batch_observations.reshape((len(batch_observations),) + observation_shape)
+            normalized_batch_observations = None
+            if any(brain._brain_configuration.use_normalized_observations for brain in brains):
+                normalized_batch_observations = Brain._normalize_observations(batch_observations, observations_rms)
+
+            for brain_idx, brain in enumerate(brains):
+                brain_observations = normalized_batch_observations \
+                    if brain._brain_configuration.use_normalized_observations else batch_observations
+                batch_actions, _states = brain._model.predict(brain_observations, deterministic=deterministic)
+                actions[brain_idx, batch_start:batch_start + len(batch_observations)] = batch_actions
+
+        return actions
+
+    @staticmethod
+    def _normalize_observations(observations: np.ndarray, observations_rms: RunningMeanStd) -> np.ndarray:
+        # Same as VecNormalize updating its statistics with every observation before normalizing it, but for a
+        # whole batch at once: the statistics seen by every observation are cumulative sums, shifted by the first
+        # observation so they don't lose precision
+        observations = observations.astype(np.float64)
+        shift = observations[0]
+        prior_delta = observations_rms.mean - shift
+        shifted_observations = observations - shift
+
+        counts = (observations_rms.count + np.arange(1, len(observations) + 1)).reshape((-1,) + (1,) * shift.ndim)
+        shifted_sums = observations_rms.count * prior_delta + np.cumsum(shifted_observations, axis=0)
+        shifted_square_sums = observations_rms.count * (observations_rms.var + np.square(prior_delta)) + \
+            np.cumsum(np.square(shifted_observations), axis=0)
+
+        shifted_means = shifted_sums / counts
+        means = shift + shifted_means
+        variances = np.maximum(shifted_square_sums / counts - np.square(shifted_means), 0.0)
+
+        observations_rms.mean = means[-1]
+        observations_rms.var = variances[-1]
+        observations_rms.count = float(counts[-1].item())
+
+        return np.clip((observations - means) / np.sqrt(variances + Brain.NORMALIZATION_EPSILON),
+                       -Brain.NORMALIZATION_CLIP,
+                       Brain.NORMALIZATION_CLIP)
+
     def _analyze_scenario(self,
                           scenario: Scenario,
-                          render=True):
+                          render=True,
+                          deterministic: bool = False):
         environment = self._build_environment(scenario=scenario)
 
         obs = environment.reset()
@@ -162,7 +326,7 @@ class Brain:
 
         while True:
             obs = obs[np.newaxis, ...]
-            action, _states = self._model.predict(obs[0])
+            action, _states = self._model.predict(obs[0], deterministic=deterministic)
             obs, rewards, done, info = environment.step(action)
             if done[0]:
                 break
@@ -175,21 +339,89 @@ class Brain:
 
         return internal_environment, environment, info[0]
 
-    def _build_environment(self, scenario: Scenario):
-        env = None
-        if scenario.symbols is not None:
-            env = self._build_portfolio_stock_scenario(scenario)
+    def _build_environment(self, scenario: Scenario, environments: int = 1):
+        if environments > 1:
+            vec_env = self._build_vec_environment(scenario, environments)
         else:
-            env = self._build_single_stock_scenario(scenario)
+            env = None
+            if scenario.symbols is not None:
+                env = self._build_portfolio_stock_scenario(scenario)
+            else:
+                env = self._build_single_stock_scenario(scenario)
+
+            vec_env = DummyVecEnv([lambda: env])
 
         if self._brain_configuration.use_normalized_observations:
-            return VecNormalize(DummyVecEnv([lambda: env]))
+            return VecNormalize(vec_env)
+        else:
+            return vec_env
+
+    def _build_vec_environment(self, scenario: Scenario, environments: int):
+        # Every environment starts its episodes at random ticks of the scenario
+        backend = self._brain_configuration.environments_backend
+        if backend not in [EnvironmentBackends.Native, EnvironmentBackends.Dummy, EnvironmentBackends.Subprocess]:
+            raise ValueError(f"Unknown environments backend {backend}")
+
+        if scenario.symbols is not None:
+            panel = self._data_provider.retrieve_panel(scenario, feature_names=self._feature_names())
+            initial_portfolio_allocation = {panel.symbols[0]: 1.0} # FIXME: This is not configurable
+
+            if backend == EnvironmentBackends.Native:
+                return PortfolioStocksVecEnv(panel=panel,
+                                             window_size=self._brain_configuration.window_size,
+                                             num_envs=environments,
+                                             initial_portfolio_allocation=initial_portfolio_allocation,
+                                             prices_feature_name=self._brain_configuration.prices_feature_name,
+                                             signal_feature_names=self._brain_configuration.signal_feature_names)
+
+            # Only the function is pickled to subprocesses, with a memory mapped panel that's only its path, so
+            # every process maps the same pages instead of getting its own copy. Without a feature store, the panel
+            # is written to a temporary one that lasts until the next environments are built
+            if backend == EnvironmentBackends.Subprocess and not isinstance(panel, MappedPanel):
+                self._temporary_feature_store_directory = tempfile.TemporaryDirectory(prefix='drltrader_panels_')
+                panel = FeatureStore(self._temporary_feature_store_directory.name).write('panel', panel)
+
+            env_function = functools.partial(PortfolioStocksEnv,
+                                             initial_portfolio_allocation=initial_portfolio_allocation,
+                                             panel=panel,
+                                             window_size=self._brain_configuration.window_size,
+                                             prices_feature_name=self._brain_configuration.prices_feature_name,
+                                             signal_feature_names=self._brain_configuration.signal_feature_names,
+                                             copy_observations=False,
+                                             info_mode=InfoModes.Scalars,
+                                             random_start_offsets=True)
         else:
-            return DummyVecEnv([lambda: env])
+            symbol_dataframe = self._data_provider.retrieve_data(scenario, feature_names=self._feature_names())
+            frame_bound = (self._brain_configuration.window_size, len(symbol_dataframe.index) - 1)
+
+            if backend == EnvironmentBackends.Native:
+                return SingleStockVecEnv(df=symbol_dataframe,
+                                         window_size=self._brain_configuration.window_size,
+                                         frame_bound=frame_bound,
+                                         prices_feature_name=self._brain_configuration.prices_feature_name,
+                                         signal_feature_names=self._brain_configuration.signal_feature_names,
+                                         num_envs=environments)
+
+            env_function = functools.partial(SingleStockEnv,
+                                             df=symbol_dataframe,
+                                             window_size=self._brain_configuration.window_size,
+                                             frame_bound=frame_bound,
+                                             prices_feature_name=self._brain_configuration.prices_feature_name,
+                                             signal_feature_names=self._brain_configuration.signal_feature_names,
+                                             random_start_offsets=True)
+
+            if backend == EnvironmentBackends.Subprocess:
+                warnings.warn(f"Single stock scenario {scenario} data is copied to {environments} subprocesses, "
+                              f"the native backend steps them without any copy")
+
+        if backend == EnvironmentBackends.Dummy:
+            return DummyVecEnv([env_function] * environments)
+
+        return SubprocVecEnv([env_function] * environments)
 
     def _build_single_stock_scenario(self, scenario: Scenario):
         # TODO: env_observer is not forwarded to SingleStockEnv
-        symbol_dataframe = self._data_provider.retrieve_data(scenario)
+        symbol_dataframe = self._data_provider.retrieve_data(scenario, feature_names=self._feature_names())
         env = SingleStockEnv(df=symbol_dataframe,
                              window_size=self._brain_configuration.window_size,
                              frame_bound=(self._brain_configuration.window_size, len(symbol_dataframe.index) - 1),
@@ -199,14 +431,26 @@ class Brain:
         return env
 
     def _build_portfolio_stock_scenario(self, scenario: Scenario):
-        dataframe_per_symbol = self._data_provider.retrieve_datas(scenario)
-        first_symbol = list(dataframe_per_symbol.keys())[0]
+        panel = self._data_provider.retrieve_panel(scenario, feature_names=self._feature_names())
+        first_symbol = panel.symbols[0]
         initial_portfolio_allocation = {first_symbol: 1.0} # FIXME: This is not configurable
 
         env = PortfolioStocksEnv(initial_portfolio_allocation=initial_portfolio_allocation,
-                                 dataframe_per_symbol=dataframe_per_symbol,
+                                 panel=panel,
                                  window_size=self._brain_configuration.window_size,
                                  prices_feature_name=self._brain_configuration.prices_feature_name,
-                                 signal_feature_names=self._brain_configuration.signal_feature_names)
+                                 signal_feature_names=self._brain_configuration.signal_feature_names,
+                                 copy_observations=False,
+                                 info_mode=InfoModes.Scalars)
 
         return env
+
+    def _observation_spec(self):
+        # Brains with the same spec see the same observations of a scenario (before normalization)
+        return (id(self._data_provider),
+                self._brain_configuration.window_size,
+                self._brain_configuration.prices_feature_name,
+                tuple(self._brain_configuration.signal_feature_names))
+
+    def _feature_names(self):
+        return [self._brain_configuration.prices_feature_name] + self._brain_configuration.signal_feature_names
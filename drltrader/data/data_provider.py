@@ -1,10 +1,30 @@
-import yfinance as yf
+import numpy as np
 import pandas as pd
 from datetime import datetime
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from finta import TA
 
 from drltrader.data.scenario import Scenario
+from drltrader.data.scenario import ceil_to_interval
+from drltrader.data.scenario import to_naive_local
+from drltrader.data.ohlcv_store import OHLCVStore
+from drltrader.data.lru_cache import LRUCache
+from drltrader.data.streaming_indicators import StreamingIndicatorEngine
+from drltrader.data.indicator_registry import IndicatorRegistry
+from drltrader.data.indicator_registry import IndicatorContext
+from drltrader.data.indicator_registry import build_default_indicator_registry
+from drltrader.data.indicator_workers import IndicatorWorkerPool
+from drltrader.data.panel import Panel
+from drltrader.data.panel import Alignments
+from drltrader.data.panel import FillPolicies
+from drltrader.data.feature_store import FeatureStore
+from drltrader.data.feature_cache import FeatureCache
+from drltrader.data.resampling import can_resample
+from drltrader.data.resampling import resample_ohlcv
+from drltrader.data.sources import DataSource
+from drltrader.data.sources.yahoo_data_source import YahooDataSource
 
 logging.basicConfig(format='%(asctime)s %(message)s',
                     filename='logs/training.log',
@@ -14,99 +34,316 @@ logging.basicConfig(format='%(asctime)s %(message)s',
 
 class DataProvider:
     def __init__(self,
-                 cache_enabled: bool = True):
+                 cache_enabled: bool = True,
+                 cache_max_entries: int = 256,
+                 cache_max_bytes: int = 512 * 1024 * 1024,
+                 store_directory: str = None,
+                 streaming_enabled: bool = False,
+                 indicator_registry: IndicatorRegistry = None,
+                 lazy_indicators: bool = False,
+                 data_source: DataSource = None,
+                 indicator_workers: int = 0,
+                 feature_store_directory: str = None,
+                 feature_cache_directory: str = None,
+                 base_interval: str = None):
         self.indicator_column_names = None
-        self._cache = {}
+        self._data_source = data_source if data_source is not None else YahooDataSource()
+        self._cache_max_entries = cache_max_entries
+        self._cache_max_bytes = cache_max_bytes
+        self._cache = LRUCache(max_entries=cache_max_entries, max_bytes=cache_max_bytes)
         self._cache_enabled = cache_enabled
+        self._store = OHLCVStore(store_directory) if store_directory is not None else None
+        self._base_interval = base_interval
+        self._feature_store = FeatureStore(feature_store_directory) if feature_store_directory is not None else None
+        self._streaming_enabled = streaming_enabled
+        self._streams = {}
+        self._lazy_indicators = lazy_indicators
+        self._indicator_registry = indicator_registry if indicator_registry is not None \
+            else build_default_indicator_registry()
+        self._feature_cache = FeatureCache(feature_cache_directory, self._indicator_registry) \
+            if feature_cache_directory is not None else None
         self._define_indicators()
 
-    def retrieve_datas(self, scenario: Scenario):
+        if self._streaming_enabled and not StreamingIndicatorEngine.supports(self.indicators_parameters):
+            raise ValueError("Streaming is enabled but some indicators don't support it")
+        if self._streaming_enabled and self._lazy_indicators:
+            raise ValueError("Streaming and lazy indicators can't be enabled at the same time")
+        if indicator_workers > 1 and (self._streaming_enabled or self._lazy_indicators):
+            raise ValueError("Indicator workers can't be used with streaming or lazy indicators")
+
+        # With more than one worker, the indicators of the symbols of retrieve_datas are calculated in parallel
+        self._indicator_workers = indicator_workers
+        self._indicator_pool = None
+
+    def __getstate__(self):
+        # Only the configuration is pickled: caches, streams and the indicator pool stay in this process. Other
+        # processes fill their own caches, from the on-disk stores when there are any
+        state = self.__dict__.copy()
+        del state['_cache']
+        state['_streams'] = {}
+        state['_indicator_pool'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache = LRUCache(max_entries=self._cache_max_entries, max_bytes=self._cache_max_bytes)
+
+    def has_store(self) -> bool:
+        return self._store is not None
+
+    def with_store_directory(self, store_directory: str) -> 'DataProvider':
+        # Same configuration and data source with empty caches, keeping the bars on the store at store_directory
+        data_provider = DataProvider.__new__(DataProvider)
+        data_provider.__setstate__(self.__getstate__())
+        data_provider._store = OHLCVStore(store_directory)
+        return data_provider
+
+    def warm_store(self, scenario: Scenario):
+        # Fetches the raw bars of every symbol of the scenario into the store, without calculating any indicator
+        if self._store is None:
+            raise ValueError("There's no store to warm")
+
+        scenario = DataProvider._with_end_date(scenario)
+        symbol_scenarios = [scenario.clone_with_symbol(symbol) for symbol in scenario.symbols] \
+            if scenario.symbols is not None else [scenario]
+        with ThreadPoolExecutor(max_workers=min(len(symbol_scenarios), self._data_source.max_concurrency)) as executor:
+            list(executor.map(self._retrieve_ohlcv, symbol_scenarios))
+
+    def close(self):
+        # Stops the indicator workers, they're started again if indicators are calculated afterwards
+        if self._indicator_pool is not None:
+            self._indicator_pool.shutdown()
+            self._indicator_pool = None
+
+    def retrieve_datas(self, scenario: Scenario, feature_names: list = None):
+        scenario = DataProvider._with_end_date(scenario)
+        symbol_scenarios = [scenario.clone_with_symbol(symbol) for symbol in scenario.symbols]
+
+        # Bars of the symbols not cached yet are fetched concurrently, indicators are calculated afterwards
+        missing_scenarios = [symbol_scenario for symbol_scenario in symbol_scenarios
+                             if not self._is_cached(symbol_scenario)]
+        ohlcv_df_per_symbol = self._retrieve_ohlcvs(missing_scenarios)
+        indicator_values_per_symbol = self._calculate_indicators_in_workers(missing_scenarios, ohlcv_df_per_symbol)
+
         dataframe_per_symbol = {}
-        for symbol in scenario.symbols:
-            dataframe_per_symbol[symbol] = self.retrieve_data(scenario.clone_with_symbol(symbol))
+        for symbol_scenario in symbol_scenarios:
+            dataframe_per_symbol[symbol_scenario.symbol] = self._retrieve_data(
+                symbol_scenario,
+                feature_names=feature_names,
+                ohlcv_df=ohlcv_df_per_symbol.get(symbol_scenario.symbol),
+                indicator_values=indicator_values_per_symbol.get(symbol_scenario.symbol))
 
         return dataframe_per_symbol
 
-    def retrieve_data(self, scenario: Scenario):
-        if scenario.end_date is None:
-            scenario = scenario.copy_with_end_date(datetime.now())
+    def retrieve_panel(self,
+                       scenario: Scenario,
+                       feature_names: list = None,
+                       alignment: str = Alignments.Union,
+                       fill_policy: str = FillPolicies.ForwardFill) -> Panel:
+        # Unlike retrieve_datas, feature_names also limits the features of the panel
+        feature_store_key = self._feature_store_key(scenario, feature_names, alignment, fill_policy)
+        if feature_store_key is not None and self._feature_store.contains(feature_store_key):
+            logging.info(f"Panel for scenario {scenario} available on the feature store")
+            return self._feature_store.read(feature_store_key)
+
+        panel = Panel.from_dataframes(self.retrieve_datas(scenario, feature_names=feature_names),
+                                      feature_names=feature_names,
+                                      alignment=alignment,
+                                      fill_policy=fill_policy)
 
-        if self._cache_enabled and str(scenario) in self._cache:
+        # Written once, every later retrieval (from this or any other process) maps it read-only
+        if feature_store_key is not None:
+            panel = self._feature_store.write(feature_store_key, panel)
+
+        return panel
+
+    def is_streaming(self) -> bool:
+        return self._streaming_enabled
+
+    def retrieve_live_datas(self, scenario: Scenario) -> dict:
+        """
+        Live counterpart of retrieve_datas, only with streaming enabled. The first retrieval of a symbol starts its
+        indicators stream at the scenario start, later ones only fetch the bars after the last streamed one and
+        carry on with the same indicators. Frames only hold the last bars the indicators look back plus the new
+        ones, never the whole scenario, so they're meant to be appended to live environments.
+        """
+        if not self._streaming_enabled:
+            raise ValueError("Live retrievals need streaming to be enabled")
+
+        scenario = DataProvider._with_end_date(scenario)
+        return {symbol: self._retrieve_live_data(scenario.clone_with_symbol(symbol)) for symbol in scenario.symbols}
+
+    def retrieve_live_panel(self,
+                            scenario: Scenario,
+                            feature_names: list = None,
+                            alignment: str = Alignments.Union,
+                            fill_policy: str = FillPolicies.ForwardFill) -> Panel:
+        return Panel.from_dataframes(self.retrieve_live_datas(scenario),
+                                     feature_names=feature_names,
+                                     alignment=alignment,
+                                     fill_policy=fill_policy)
+
+    def retrieve_data(self, scenario: Scenario, feature_names: list = None):
+        # feature_names is only a hint: with lazy indicators only those indicator columns are calculated (next to
+        # the ones already calculated for the scenario), otherwise every indicator column is returned
+        return self._retrieve_data(DataProvider._with_end_date(scenario), feature_names=feature_names)
+
+    def _retrieve_data(self,
+                       scenario: Scenario,
+                       feature_names: list = None,
+                       ohlcv_df: pd.DataFrame = None,
+                       indicator_values: np.ndarray = None):
+        if self._lazy_indicators:
+            return self._retrieve_lazy_data(scenario, feature_names, ohlcv_df)
+
+        if self._is_cached(scenario):
             logging.info(f"Data for scenario {scenario} available on cache. Returning saved version...")
-            return self._cache[str(scenario)]
+            return self._cache.get(scenario)
         else:
             logging.info(f"Data for scenario {scenario} not available on cache. Fetching it...")
-            df = self._fetch_data(scenario)
-            self._calculate_indicators(df)
-
-            if self._cache_enabled:
-                self._cache[str(scenario)] = df
+            df = ohlcv_df if ohlcv_df is not None else self._retrieve_ohlcv(scenario)
+            self._calculate_indicators(df, indicator_values, scenario)
 
             # FIXME: There's some weird bug on Yahoo
             df = df.iloc[:-1, :]
 
+            if self._cache_enabled:
+                self._cache.put(scenario, df)
+
             return df
 
+    def _retrieve_lazy_data(self, scenario: Scenario, feature_names: list, ohlcv_df: pd.DataFrame = None):
+        lazy_indicators_frame = self._cache.get(scenario) if self._cache_enabled else None
+
+        if lazy_indicators_frame is None:
+            logging.info(f"Data for scenario {scenario} not available on cache. Fetching it...")
+
+            # FIXME: There's some weird bug on Yahoo
+            df = (ohlcv_df if ohlcv_df is not None else self._retrieve_ohlcv(scenario)).iloc[:-1, :]
+            lazy_indicators_frame = LazyIndicatorsFrame(df,
+                                                        IndicatorContext(self._indicator_registry, df),
+                                                        feature_cache=self._feature_cache,
+                                                        scenario=scenario)
+
+        indicators = [indicator for indicator in self._parse_indicators()
+                      if feature_names is None or indicator[1] in feature_names]
+        df = lazy_indicators_frame.materialize(indicators)
+
+        # Put again even on hits, so the cache accounts for the columns materialized since the last time
+        if self._cache_enabled:
+            self._cache.put(scenario, lazy_indicators_frame)
+
+        return df
+
+    def _feature_store_key(self, scenario: Scenario, feature_names: list, alignment: str, fill_policy: str):
+        # Panels of scenarios reaching the present keep changing, they're never stored
+        if self._feature_store is None or scenario.end_date is None or scenario.end_date > datetime.now():
+            return None
+
+        # Symbols are hashed, a universe of hundreds of symbols would not fit in a file name. Changing the bars of a
+        # symbol or the definition of an indicator changes the key, so stale panels are never read again
+        options = json.dumps([FeatureStore.VERSION, scenario.symbols, feature_names, alignment, fill_policy,
+                              self._base_interval,
+                              list(self.indicators_parameters.items()),
+                              [self._indicator_registry.definition_hash(indicator_name)
+                               for indicator_name in self.indicators_parameters],
+                              [self._data_source.digest(self._fetched_scenario(scenario.clone_with_symbol(symbol)))
+                               for symbol in scenario.symbols]])
+        return f"{scenario.interval}" \
+               f"_{scenario.start_date.strftime('%Y-%m-%d-%H-%M-%S')}" \
+               f"_{scenario.end_date.strftime('%Y-%m-%d-%H-%M-%S')}" \
+               f"_{hashlib.sha1(options.encode()).hexdigest()[:16]}"
+
+    def _is_cached(self, scenario: Scenario):
+        return self._cache_enabled and scenario in self._cache
+
+    @staticmethod
+    def _with_end_date(scenario: Scenario):
+        if scenario.end_date is None:
+            # Every poll within the same bar maps to the same end date, so live loops hit the cache
+            return scenario.copy_with_end_date(ceil_to_interval(datetime.now(), scenario.interval))
+
+        return scenario
+
     def _define_indicators(self):
-        self.indicators_function = {}
-        self.indicators_parameters = {}
-
-        self.indicators_function['SMA'] = TA.SMA
-        self.indicators_parameters['SMA'] = {
-            "period": [4, 6, 8, 10, 12, 14, 16, 18]
-        }
-        self.indicators_function['VWAP'] = TA.VWAP
-        self.indicators_parameters['VWAP'] = {}
-        self.indicators_function['MACD'] = DataProvider._extract_column(TA.MACD, 'SIGNAL')
-        self.indicators_parameters['MACD'] = {
-            "period_fast": [4, 8, 12, 16],
-            "period_slow": [8, 16, 24, 32],
-            "signal": [3, 6, 9, 12]
-        }
-        self.indicators_function['PPO'] = DataProvider._extract_column(TA.PPO, 'HISTO')
-        self.indicators_parameters['PPO'] = {
-            "period_fast": [4, 8, 12, 16],
-            "period_slow": [8, 16, 24, 32],
-            "signal": [3, 6, 9, 12]
-        }
-        self.indicators_function['VW_MACD'] = DataProvider._extract_column(TA.VW_MACD, 'SIGNAL')
-        self.indicators_parameters['VW_MACD'] = {
-            "period_fast": [4, 8, 12, 16],
-            "period_slow": [8, 16, 24, 32],
-            "signal": [3, 6, 9, 12]
-        }
-        self.indicators_function['RSI'] = TA.RSI
-        self.indicators_parameters['RSI'] = {
-            "period": [4, 6, 8, 10, 12, 14, 16, 18]
-        }
-        self.indicators_function['OBV'] = TA.OBV
-        self.indicators_parameters['OBV'] = {}
-
-        self.indicators_function['MOM'] = TA.MOM
-        self.indicators_parameters['MOM'] = {
-            "period": [4, 6, 8, 10, 12, 14, 16, 18]
-        }
-        self.indicators_function['ROC'] = TA.ROC
-        self.indicators_parameters['ROC'] = {
-            "period": [4, 6, 8, 10, 12, 14, 16, 18]
-        }
-        self.indicators_function['VBM'] = TA.VBM
-        self.indicators_parameters['VBM'] = {
-            "roc_period": [6, 8, 10, 12, 14],
-            "atr_period": [12, 16, 20, 24, 28]
-        }
+        self.indicators_parameters = self._indicator_registry.indicators_parameters()
 
         # Populate indicator_column_names
         df = pd.DataFrame(columns=['Open', 'High', 'Close', 'Low', 'Volume'])
         self._calculate_indicators(df)
 
-    def _calculate_indicators(self, df):
+    def _calculate_indicators(self, df, indicator_values: np.ndarray = None, scenario: Scenario = None):
         logging.info(f"Calculating indicators...")
 
-        all_indicator_columns_names = []
+        indicators = self._parse_indicators()
+
+        # Intermediates shared between indicators (e.g. EMAs, true range) are computed only once per DataFrame
+        if indicator_values is None:
+            indicator_context = IndicatorContext(self._indicator_registry, df)
+            if self._feature_cache is None or scenario is None:
+                indicator_values = indicator_context.compute_indicators(indicators)
+            else:
+                values_per_column_name = self._feature_cache.retrieve(scenario, df, indicators,
+                                                                      indicator_context.compute_indicators)
+                indicator_values = DataProvider._stack_columns(values_per_column_name, indicators, len(df.index))
+
+        for column_idx, (_, indicator_column_name, _) in enumerate(indicators):
+            df[indicator_column_name] = indicator_values[:, column_idx]
+
+        df.fillna(0.0, inplace=True)
+
+        if self.indicator_column_names is None:
+            self.indicator_column_names = [indicator_column_name for _, indicator_column_name, _ in indicators]
 
-        for indicator_name in self.indicators_function:
-            function = self.indicators_function[indicator_name]
+        logging.info(f"The following indicators were calculated: {self.indicator_column_names}")
+
+    def _retrieve_live_data(self, scenario: Scenario):
+        # Streams only keep the last bars the indicators look back. Scenarios starting within the streamed bars
+        # only fetch the bars since the last streamed one, the rest start the stream again
+        stream_key = f"{scenario.interval}_{scenario.symbol}"
+        engine, first_timestamp, tail_df = self._streams.get(stream_key, (None, None, None))
+
+        fetched_scenario = scenario
+        if engine is not None and \
+                to_naive_local(first_timestamp) <= scenario.start_date <= to_naive_local(tail_df.index[-1]):
+            fetched_scenario = scenario.copy_with_dates(to_naive_local(tail_df.index[-1]), scenario.end_date)
+
+        # FIXME: There's some weird bug on Yahoo
+        df = self._retrieve_ohlcv(fetched_scenario).iloc[:-1, :]
+        if len(df.index) == 0:
+            if fetched_scenario is not scenario:
+                return tail_df
+
+            self._calculate_indicators(df)
+            return df
+
+        return self._calculate_streaming_indicators(stream_key, df)
+
+    def _calculate_streaming_indicators(self, stream_key: str, df):
+        # Bars starting anywhere within the streamed ones continue the same stream, returns the kept tail of the
+        # stream plus the new bars
+        engine, first_timestamp, tail_df = self._streams.get(stream_key, (None, None, None))
+
+        if engine is None or not first_timestamp <= df.index[0] <= tail_df.index[-1]:
+            logging.info(f"Starting indicators stream {stream_key}")
+            engine = StreamingIndicatorEngine(self._parse_indicators())
+            first_timestamp = df.index[0]
+            tail_df = None
+            new_df = df
+        else:
+            new_df = df.loc[df.index > tail_df.index[-1]]
+
+        logging.info(f"Calculating indicators for {len(new_df.index)} new bars of stream {stream_key}")
+        new_df = pd.concat([new_df.fillna(0.0), engine.update(new_df)], axis=1)
+        stream_df = new_df if tail_df is None else pd.concat([tail_df, new_df])
+        self._streams[stream_key] = (engine, first_timestamp, stream_df.iloc[-engine.lookback:])
+
+        return stream_df
+
+    def _parse_indicators(self):
+        indicators = []
+
+        for indicator_name in self.indicators_parameters:
             parameters = self.indicators_parameters[indicator_name]
 
             indicator_column_names = []
@@ -126,26 +363,150 @@ class DataProvider:
                         indicator_column_names[parameter_value_idx] = f"{indicator_column_names[parameter_value_idx]}_{parsed_parameters[parameter_value_idx][parameter_name]}"
 
             for parameter_value_idx in range(0, len(parsed_parameters)):
-                df[indicator_column_names[parameter_value_idx]] = function(df, **parsed_parameters[parameter_value_idx])
-                all_indicator_columns_names.append(indicator_column_names[parameter_value_idx])
+                indicators.append((indicator_name,
+                                   indicator_column_names[parameter_value_idx],
+                                   parsed_parameters[parameter_value_idx]))
 
-        df.fillna(0.0, inplace=True)
+        return indicators
 
-        if self.indicator_column_names is None:
-            self.indicator_column_names = all_indicator_columns_names
+    def _retrieve_ohlcvs(self, scenarios: list):
+        if len(scenarios) <= 1:
+            return {}
 
-        logging.info(f"The following indicators were calculated: {self.indicator_column_names}")
+        # Total latency stays close to the slowest fetch instead of the sum of all of them
+        with ThreadPoolExecutor(max_workers=min(len(scenarios), self._data_source.max_concurrency)) as executor:
+            ohlcv_dfs = list(executor.map(self._retrieve_ohlcv, scenarios))
 
-    def _fetch_data(self, scenario):
-        ticker = yf.Ticker(scenario.symbol)
-        df = ticker.history(start=scenario.start_date,
-                            end=scenario.end_date,
-                            interval=scenario.interval)
-        return df
+        return {scenario.symbol: ohlcv_df for scenario, ohlcv_df in zip(scenarios, ohlcv_dfs)}
+
+    def _calculate_indicators_in_workers(self, scenarios: list, ohlcv_df_per_symbol: dict):
+        if self._indicator_workers <= 1 or len(scenarios) <= 1:
+            return {}
+
+        indicators = self._parse_indicators()
+        indicator_values_per_symbol = {}
+
+        # Symbols with every indicator cached don't need a worker
+        if self._feature_cache is not None:
+            for scenario in scenarios:
+                values_per_column_name = self._feature_cache.load(scenario,
+                                                                  ohlcv_df_per_symbol[scenario.symbol],
+                                                                  indicators)
+                if len(values_per_column_name) == len(indicators):
+                    indicator_values_per_symbol[scenario.symbol] = DataProvider._stack_columns(
+                        values_per_column_name, indicators, len(ohlcv_df_per_symbol[scenario.symbol].index))
+
+            scenarios = [scenario for scenario in scenarios if scenario.symbol not in indicator_values_per_symbol]
+
+        if len(scenarios) > 1:
+            if self._indicator_pool is None:
+                self._indicator_pool = IndicatorWorkerPool(self._indicator_workers,
+                                                           self._indicator_registry,
+                                                           indicators)
+
+            logging.info(f"Calculating indicators of {len(scenarios)} symbols on {self._indicator_workers} workers")
+            indicator_values = self._indicator_pool.calculate([ohlcv_df_per_symbol[scenario.symbol]
+                                                               for scenario in scenarios])
+
+            for scenario, values in zip(scenarios, indicator_values):
+                indicator_values_per_symbol[scenario.symbol] = values
+                if self._feature_cache is not None:
+                    self._feature_cache.save(scenario, ohlcv_df_per_symbol[scenario.symbol], indicators, values)
+
+        return indicator_values_per_symbol
 
     @staticmethod
-    def _extract_column(function, column_name):
-        def _extract(df, **kwargs):
-            return function(df, **kwargs)[column_name]
+    def _stack_columns(values_per_column_name: dict, indicators: list, length: int) -> np.ndarray:
+        values = np.empty((length, len(indicators)))
+        for column_idx, (_, indicator_column_name, _) in enumerate(indicators):
+            values[:, column_idx] = values_per_column_name[indicator_column_name]
+
+        return values
+
+    def _retrieve_ohlcv(self, scenario: Scenario):
+        fetched_scenario = self._fetched_scenario(scenario)
+        if fetched_scenario.interval != scenario.interval:
+            logging.info(f"Resampling {self._base_interval} bars to {scenario.interval} for scenario {scenario}")
+            return resample_ohlcv(self._retrieve_interval_ohlcv(fetched_scenario), scenario.interval)
+
+        return self._retrieve_interval_ohlcv(scenario)
+
+    def _fetched_scenario(self, scenario: Scenario):
+        # Coarser intervals are resampled from the base interval bars, so every interval of a symbol shares the
+        # same fetched (and, with a store, stored) bars
+        if self._base_interval is not None and can_resample(self._base_interval, scenario.interval):
+            return scenario.copy_with_interval(self._base_interval)
+
+        return scenario
+
+    def _retrieve_interval_ohlcv(self, scenario: Scenario):
+        if self._store is None:
+            return self._fetch_data(scenario)
+
+        return self._store.retrieve(scenario, self._fetch_data)
+
+    def _fetch_data(self, scenario):
+        return self._data_source.fetch(scenario)
+
+
+class LazyIndicatorsFrame:
+    """
+    Raw OHLCV bars of a scenario plus every indicator column requested so far. Columns (and the intermediates
+    they depend on) are memoized, so later requests only calculate what's still missing. Materialized frames hold
+    every column materialized so far and are never modified, requests for columns already there return the same
+    frame without copying it.
+    """
+    def __init__(self,
+                 df: pd.DataFrame,
+                 indicator_context: IndicatorContext,
+                 feature_cache: FeatureCache = None,
+                 scenario: Scenario = None):
+        self._df = df
+        self._indicator_context = indicator_context
+        self._feature_cache = feature_cache
+        self._scenario = scenario
+        self._materialized_df = df.fillna(0.0)
+
+    @property
+    def nbytes(self):
+        return int(self._df.memory_usage(index=True, deep=True).sum()) + \
+            int(self._materialized_df.memory_usage(index=True, deep=True).sum()) + \
+            self._indicator_context.nbytes()
+
+    def materialize(self, indicators: list) -> pd.DataFrame:
+        indicators = [indicator for indicator in indicators if indicator[1] not in self._materialized_df.columns]
+        if len(indicators) == 0:
+            return self._materialized_df
+
+        calculated_indicators = []
+        if self._feature_cache is not None:
+            calculated_indicators = self._load_cached_indicators(indicators)
+
+        indicator_values = self._indicator_context.compute_indicators(indicators)
+
+        if len(calculated_indicators) > 0:
+            calculated_column_idxs = [indicators.index(indicator) for indicator in calculated_indicators]
+            self._feature_cache.save(self._scenario, self._df, calculated_indicators,
+                                     indicator_values[:, calculated_column_idxs])
+
+        indicators_df = pd.DataFrame(indicator_values,
+                                     index=self._df.index,
+                                     columns=[indicator_column_name for _, indicator_column_name, _ in indicators])
+        self._materialized_df = pd.concat([self._materialized_df, indicators_df.fillna(0.0)], axis=1)
+        return self._materialized_df
+
+    def _load_cached_indicators(self, indicators: list) -> list:
+        # Cached columns are preloaded into the context, returns the indicators that still need to be calculated
+        missing_indicators = [indicator for indicator in indicators
+                              if not self._indicator_context.contains(indicator[0], indicator[2])]
+        if len(missing_indicators) == 0:
+            return []
+
+        values_per_column_name = self._feature_cache.load(self._scenario, self._df, missing_indicators)
+        for indicator_name, indicator_column_name, parameters in missing_indicators:
+            if indicator_column_name in values_per_column_name:
+                self._indicator_context.preload(indicator_name,
+                                                parameters,
+                                                values_per_column_name[indicator_column_name])
 
-        return _extract
+        return [indicator for indicator in missing_indicators if indicator[1] not in values_per_column_name]
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from drltrader.data.indicator_registry import IndicatorRegistry
+from drltrader.data.scenario import Scenario
+
+logging.basicConfig(format='%(asctime)s %(message)s',
+                    filename='logs/training.log',
+                    encoding='utf-8',
+                    level=logging.DEBUG)
+
+
+class FeatureCache:
+    """
+    Content-addressed disk cache of computed indicator columns, one .npy file per column.
+
+    A column is addressed by the scenario (symbol, interval and dates), a digest of the raw bars it was
+    calculated from, the indicator name and parameters, and the definition hash of the indicator node. Changing
+    an indicator (or anything it depends on) changes its address, so stale columns are simply never read again.
+    """
+    def __init__(self, directory: str, indicator_registry: IndicatorRegistry):
+        self._directory = directory
+        self._indicator_registry = indicator_registry
+
+    def retrieve(self, scenario: Scenario, df: pd.DataFrame, indicators: list, calculate_function) -> dict:
+        """
+        Values of every indicator by column name. Only the ones not cached yet are calculated, through
+        `calculate_function(indicators) -> (N, K) array`, and saved.
+        """
+        values_per_column_name = self.load(scenario, df, indicators)
+
+        missing_indicators = [indicator for indicator in indicators if indicator[1] not in values_per_column_name]
+        if len(missing_indicators) > 0:
+            missing_indicator_values = calculate_function(missing_indicators)
+            self.save(scenario, df, missing_indicators, missing_indicator_values)
+
+            for column_idx, (_, indicator_column_name, _) in enumerate(missing_indicators):
+                values_per_column_name[indicator_column_name] = missing_indicator_values[:, column_idx]
+
+        return values_per_column_name
+
+    def load(self, scenario: Scenario, df: pd.DataFrame, indicators: list) -> dict:
+        data_digest = FeatureCache._data_digest(df)
+
+        values_per_column_name = {}
+        for indicator in indicators:
+            path = self._path(scenario, data_digest, indicator)
+            if os.path.exists(path):
+                values_per_column_name[indicator[1]] = np.load(path)
+
+        logging.info(f"{len(values_per_column_name)} of {len(indicators)} indicators of {scenario} loaded from cache")
+        return values_per_column_name
+
+    def save(self, scenario: Scenario, df: pd.DataFrame, indicators: list, indicator_values: np.ndarray):
+        data_digest = FeatureCache._data_digest(df)
+        os.makedirs(self._directory, exist_ok=True)
+
+        for column_idx, indicator in enumerate(indicators):
+            path = self._path(scenario, data_digest, indicator)
+
+            # Written to a temporary file first, so readers never see half written columns
+            with open(f"{path}.{os.getpid()}.tmp", 'wb') as column_file:
+                np.save(column_file, indicator_values[:, column_idx])
+            os.replace(f"{path}.{os.getpid()}.tmp", path)
+
+    def _path(self, scenario: Scenario, data_digest: str, indicator) -> str:
+        indicator_name, _, parameters = indicator
+        address = json.dumps([scenario.symbol,
+                              scenario.interval,
+                              scenario.start_date.isoformat(),
+                              scenario.end_date.isoformat(),
+                              data_digest,
+                              indicator_name,
+                              sorted(parameters.items()),
+                              self._indicator_registry.definition_hash(indicator_name)])
+
+        return os.path.join(self._directory, f"{hashlib.sha1(address.encode()).hexdigest()}.npy")
+
+    @staticmethod
+    def _data_digest(df: pd.DataFrame) -> str:
+        digest = hashlib.sha1()
+        digest.update(np.ascontiguousarray(df.index.asi8).tobytes())
+        for column_name in df.columns:
+            digest.update(column_name.encode())
+            digest.update(np.ascontiguousarray(df[column_name].to_numpy(dtype=np.float64)).tobytes())
+
+        return digest.hexdigest()
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from drltrader.data.panel import Panel
+
+logging.basicConfig(format='%(asctime)s %(message)s',
+                    filename='logs/training.log',
+                    encoding='utf-8',
+                    level=logging.DEBUG)
+
+
+class MappedPanel(Panel):
+    """
+    Panel whose values are a read-only memory map of a FeatureStore entry. Only the pages actually read are
+    resident, and processes mapping the same entry share them. Pickling it only sends the entry path.
+    """
+    def __init__(self, path: str):
+        with open(os.path.join(path, FeatureStore.METADATA_FILE_NAME)) as metadata_file:
+            metadata = json.load(metadata_file)
+
+        timestamps = pd.DatetimeIndex(np.load(os.path.join(path, FeatureStore.TIMESTAMPS_FILE_NAME)))
+        if metadata['timezone'] is not None:
+            timestamps = timestamps.tz_localize('UTC').tz_convert(metadata['timezone'])
+
+        super().__init__(np.load(os.path.join(path, FeatureStore.VALUES_FILE_NAME), mmap_mode='r'),
+                         timestamps,
+                         metadata['symbols'],
+                         metadata['feature_names'],
+                         np.load(os.path.join(path, FeatureStore.MASK_FILE_NAME), mmap_mode='r'),
+                         np.load(os.path.join(path, FeatureStore.PRICES_FILE_NAME), mmap_mode='r'))
+        self.path = path
+
+    def __reduce__(self):
+        return MappedPanel, (self.path,)
+
+
+class FeatureStore:
+    """
+    On-disk panels, one directory per key with the values stored as a .npy file so they can be memory mapped.
+    Entries are written once and never modified, so any number of processes can map them read-only.
+    """
+    # Part of the keys, bumped whenever the layout of the entries changes so older ones are never read
+    VERSION = 2
+
+    VALUES_FILE_NAME = 'values.npy'
+    PRICES_FILE_NAME = 'prices.npy'
+    MASK_FILE_NAME = 'mask.npy'
+    TIMESTAMPS_FILE_NAME = 'timestamps.npy'
+    METADATA_FILE_NAME = 'metadata.json'
+
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def contains(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self._path(key), FeatureStore.METADATA_FILE_NAME))
+
+    def read(self, key: str) -> MappedPanel:
+        if not self.contains(key):
+            raise KeyError(f"There's no panel {key} in the feature store")
+
+        return MappedPanel(self._path(key))
+
+    def write(self, key: str, panel: Panel) -> MappedPanel:
+        if self.contains(key):
+            return self.read(key)
+
+        logging.info(f"Writing panel {key} of {panel.nbytes} bytes to the feature store")
+        os.makedirs(self._directory, exist_ok=True)
+        temporary_path = tempfile.mkdtemp(dir=self._directory, prefix='.tmp_')
+
+        try:
+            values = np.lib.format.open_memmap(os.path.join(temporary_path, FeatureStore.VALUES_FILE_NAME),
+                                               mode='w+',
+                                               dtype=Panel.DTYPE,
+                                               shape=panel.values.shape)
+            values[:] = panel.values
+            values.flush()
+            del values
+
+            np.save(os.path.join(temporary_path, FeatureStore.PRICES_FILE_NAME), panel.prices)
+            np.save(os.path.join(temporary_path, FeatureStore.MASK_FILE_NAME), panel.mask)
+            utc_timestamps = panel.timestamps.tz_convert(None) if panel.timestamps.tz is not None \
+                else panel.timestamps
+            np.save(os.path.join(temporary_path, FeatureStore.TIMESTAMPS_FILE_NAME),
+                    utc_timestamps.to_numpy(dtype='datetime64[ns]'))
+            with open(os.path.join(temporary_path, FeatureStore.METADATA_FILE_NAME), 'w') as metadata_file:
+                json.dump({'symbols': panel.symbols,
+                           'feature_names': panel.feature_names,
+                           'timezone': str(panel.timestamps.tz) if panel.timestamps.tz is not None else None},
+                          metadata_file)
+
+            # Renaming is atomic, a concurrent writer of the same key simply loses the race
+            os.rename(temporary_path, self._path(key))
+        except OSError:
+            if not self.contains(key):
+                raise
+        finally:
+            shutil.rmtree(temporary_path, ignore_errors=True)
+
+        return self.read(key)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key)
@@ -0,0 +1,251 @@
+import numpy as np
+
+# Largest d ** -j allowed inside an EWM block, keeps the scaled cumulative sums far from overflowing
+EWM_MAX_BLOCK_SCALE = 1e150
+
+
+def ewm_mean(values: np.ndarray, alphas: np.ndarray) -> np.ndarray:
+    """
+    Same result as pandas' ewm(alpha=alpha, adjust=True, ignore_na=False).mean() for every alpha at once.
+
+    `values` is either (N,) and shared by every alpha, or (N, K) with one column per alpha. The weighted sums
+    are computed as block-wise scaled cumulative sums, so the only Python loop is over blocks of rows.
+    """
+    alphas = np.atleast_1d(np.asarray(alphas, dtype=np.float64))
+    values = np.asarray(values, dtype=np.float64)
+    values = values[:, np.newaxis] if values.ndim == 1 else values
+    values = np.broadcast_to(values, (values.shape[0], len(alphas)))
+
+    decays = 1.0 - alphas
+    observed = ~np.isnan(values)
+    observed_values = np.where(observed, values, 0.0)
+    weights = observed.astype(np.float64)
+
+    block_size = 1
+    if decays.min() > 0.0:
+        block_size = max(1, int(np.log(EWM_MAX_BLOCK_SCALE) / -np.log(decays.min())))
+
+    result = np.empty(values.shape)
+    previous_numerator = np.zeros(len(alphas))
+    previous_denominator = np.zeros(len(alphas))
+
+    # Every block reuses the same decay powers, only the last one might be shorter
+    powers = decays ** np.arange(0, min(block_size, values.shape[0]))[:, np.newaxis]
+    inverse_powers = 1.0 / powers
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for block_start in range(0, values.shape[0], block_size):
+            block_end = min(values.shape[0], block_start + block_size)
+            block_length = block_end - block_start
+
+            numerator = powers[:block_length] * (decays * previous_numerator +
+                                                 np.cumsum(observed_values[block_start:block_end] *
+                                                           inverse_powers[:block_length], axis=0))
+            denominator = powers[:block_length] * (decays * previous_denominator +
+                                                   np.cumsum(weights[block_start:block_end] *
+                                                             inverse_powers[:block_length], axis=0))
+
+            result[block_start:block_end] = np.where(denominator > 0.0, numerator / denominator, np.nan)
+            previous_numerator = numerator[-1]
+            previous_denominator = denominator[-1]
+
+    return result
+
+
+def rolling_mean(values: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """
+    Same result as pandas' rolling(window=period).mean() for every period at once, as differences of one
+    cumulative sum. Windows containing NaN are NaN.
+    """
+    periods = np.atleast_1d(np.asarray(periods))
+    values = np.asarray(values, dtype=np.float64)
+    observed = ~np.isnan(values)
+
+    # Centering keeps the cumulative sum small, so long histories don't lose precision
+    offset = values[observed][0] if observed.any() else 0.0
+    cumulative_sums = np.concatenate([[0.0], np.cumsum(np.where(observed, values - offset, 0.0))])
+    cumulative_counts = np.concatenate([[0], np.cumsum(observed)])
+
+    ends = np.arange(1, len(values) + 1)[:, np.newaxis]
+    starts = np.clip(ends - periods, 0, None)
+
+    sums = cumulative_sums[ends] - cumulative_sums[starts]
+    counts = cumulative_counts[ends] - cumulative_counts[starts]
+    return np.where(counts == periods, sums / periods + offset, np.nan)
+
+
+def lag(values: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """
+    Same result as pandas' shift(period) for every period at once.
+    """
+    periods = np.atleast_1d(np.asarray(periods))
+    values = np.asarray(values, dtype=np.float64)
+
+    idxs = np.arange(0, len(values))[:, np.newaxis] - periods
+    return np.where(idxs >= 0, values[np.clip(idxs, 0, None)], np.nan)
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    previous_close = lag(close, 1)[:, 0]
+
+    with np.errstate(invalid='ignore'):
+        return np.fmax(np.abs(high - low), np.fmax(np.abs(high - previous_close), np.abs(previous_close - low)))
+
+
+# Intermediate nodes, shared by several indicators
+
+def delta(context, parameters_list: list) -> np.ndarray:
+    close = context.series('Close')
+    return (close - lag(close, 1)[:, 0])[:, np.newaxis]
+
+
+def volume_price(context, parameters_list: list) -> np.ndarray:
+    return (context.series('Volume') * context.series('Close'))[:, np.newaxis]
+
+
+def true_range_node(context, parameters_list: list) -> np.ndarray:
+    return true_range(context.series('High'), context.series('Low'), context.series('Close'))[:, np.newaxis]
+
+
+def ema(context, parameters_list: list) -> np.ndarray:
+    result = np.empty((context.length(), len(parameters_list)))
+
+    for column in set(parameters['column'] for parameters in parameters_list):
+        column_idxs = [idx for idx, parameters in enumerate(parameters_list) if parameters['column'] == column]
+        spans = _parameter([parameters_list[idx] for idx in column_idxs], 'span')
+        result[:, column_idxs] = ewm_mean(context.series(column), 2.0 / (spans + 1.0))
+
+    return result
+
+
+def volume_weighted_ema(context, parameters_list: list) -> np.ndarray:
+    spans = _values(parameters_list, 'span')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return context.compute('EMA', [{'column': 'VOLUME_PRICE', 'span': span} for span in spans]) / \
+            context.compute('EMA', [{'column': 'Volume', 'span': span} for span in spans])
+
+
+def average_gain(context, parameters_list: list) -> np.ndarray:
+    delta_values = context.series('DELTA')
+    return ewm_mean(np.where(delta_values < 0, 0.0, delta_values), 1.0 / _parameter(parameters_list, 'period'))
+
+
+def average_loss(context, parameters_list: list) -> np.ndarray:
+    delta_values = context.series('DELTA')
+    return ewm_mean(np.abs(np.where(delta_values > 0, 0.0, delta_values)), 1.0 / _parameter(parameters_list, 'period'))
+
+
+def average_true_range(context, parameters_list: list) -> np.ndarray:
+    return rolling_mean(context.series('TRUE_RANGE'), _parameter(parameters_list, 'period'))
+
+
+def lagged(context, parameters_list: list) -> np.ndarray:
+    result = np.empty((context.length(), len(parameters_list)))
+
+    for column in set(parameters['column'] for parameters in parameters_list):
+        column_idxs = [idx for idx, parameters in enumerate(parameters_list) if parameters['column'] == column]
+        result[:, column_idxs] = lag(context.series(column), _parameter([parameters_list[idx] for idx in column_idxs],
+                                                                        'period'))
+
+    return result
+
+
+# Indicators, one column per parameter set
+
+def sma(context, parameters_list: list) -> np.ndarray:
+    return rolling_mean(context.series('Close'), _parameter(parameters_list, 'period'))
+
+
+def vwap(context, parameters_list: list) -> np.ndarray:
+    volume = context.series('Volume')
+    typical_price = (context.series('High') + context.series('Low') + context.series('Close')) / 3
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (_cumsum(volume * typical_price) / _cumsum(volume))[:, np.newaxis]
+
+
+def macd(context, parameters_list: list) -> np.ndarray:
+    fast = context.compute('EMA', _close_spans(parameters_list, 'period_fast'))
+    slow = context.compute('EMA', _close_spans(parameters_list, 'period_slow'))
+
+    return ewm_mean(fast - slow, _span_alphas(parameters_list, 'signal'))
+
+
+def ppo(context, parameters_list: list) -> np.ndarray:
+    fast = context.compute('EMA', _close_spans(parameters_list, 'period_fast'))
+    slow = context.compute('EMA', _close_spans(parameters_list, 'period_slow'))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        line = (fast - slow) / slow * 100
+    return line - ewm_mean(line, _span_alphas(parameters_list, 'signal'))
+
+
+def vw_macd(context, parameters_list: list) -> np.ndarray:
+    fast = context.compute('VW_EMA', [{'span': span} for span in _values(parameters_list, 'period_fast')])
+    slow = context.compute('VW_EMA', [{'span': span} for span in _values(parameters_list, 'period_slow')])
+
+    return ewm_mean(fast - slow, _span_alphas(parameters_list, 'signal'))
+
+
+def rsi(context, parameters_list: list) -> np.ndarray:
+    periods = [{'period': period} for period in _values(parameters_list, 'period')]
+    gain = context.compute('AVERAGE_GAIN', periods)
+    loss = context.compute('AVERAGE_LOSS', periods)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 100 - (100 / (1 + gain / loss))
+
+
+def obv(context, parameters_list: list) -> np.ndarray:
+    close = context.series('Close')
+    volume = context.series('Volume')
+    previous_close = close - context.series('DELTA')
+
+    with np.errstate(invalid='ignore'):
+        signed_volume = np.where(close > previous_close, volume, np.where(close < previous_close, -volume, np.nan))
+    return _cumsum(signed_volume)[:, np.newaxis]
+
+
+def mom(context, parameters_list: list) -> np.ndarray:
+    return context.series('Close')[:, np.newaxis] - context.compute('LAG', _close_lags(parameters_list, 'period'))
+
+
+def roc(context, parameters_list: list) -> np.ndarray:
+    previous_closes = context.compute('LAG', _close_lags(parameters_list, 'period'))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (context.series('Close')[:, np.newaxis] - previous_closes) / previous_closes * 100
+
+
+def vbm(context, parameters_list: list) -> np.ndarray:
+    previous_closes = context.compute('LAG', _close_lags(parameters_list, 'roc_period'))
+    atr = context.compute('ATR', [{'period': period} for period in _values(parameters_list, 'atr_period')])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (context.series('Close')[:, np.newaxis] - 2 * previous_closes) / atr
+
+
+def _cumsum(values: np.ndarray) -> np.ndarray:
+    # Same as pandas' cumsum: NaN rows stay NaN and are skipped by the running sum
+    return np.where(np.isnan(values), np.nan, np.nancumsum(values))
+
+
+def _values(parameters_list: list, parameter_name: str) -> list:
+    return [parameters[parameter_name] for parameters in parameters_list]
+
+
+def _parameter(parameters_list: list, parameter_name: str) -> np.ndarray:
+    return np.array(_values(parameters_list, parameter_name))
+
+
+def _span_alphas(parameters_list: list, parameter_name: str) -> np.ndarray:
+    return 2.0 / (_parameter(parameters_list, parameter_name) + 1.0)
+
+
+def _close_spans(parameters_list: list, parameter_name: str) -> list:
+    return [{'column': 'Close', 'span': span} for span in _values(parameters_list, parameter_name)]
+
+
+def _close_lags(parameters_list: list, parameter_name: str) -> list:
+    return [{'column': 'Close', 'period': period} for period in _values(parameters_list, parameter_name)]
@@ -0,0 +1,221 @@
+import hashlib
+import inspect
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from drltrader.data import indicator_bank
+
+
+class IndicatorNode:
+    def __init__(self,
+                 name: str,
+                 function,
+                 dependencies: tuple,
+                 parameters: dict = None):
+        self.name = name
+        self.function = function
+        self.dependencies = dependencies
+        self.parameters = parameters
+
+    def is_indicator(self):
+        return self.parameters is not None
+
+
+class IndicatorRegistry:
+    """
+    DAG of indicator computations. Intermediate nodes (e.g. EMA of Close, true range) are shared building blocks,
+    indicator nodes are the ones materialized as DataFrame columns, one per parameter set.
+
+    Node functions receive an IndicatorContext and a list of parameter dicts and return an (N, K) array. They
+    read their dependencies through the context, which memoizes every (node, parameters) result per DataFrame.
+    """
+    def __init__(self):
+        self._nodes = OrderedDict()
+        self._definition_hashes = {}
+
+    def register_intermediate(self, name: str, function, dependencies: list = ()):
+        self._register(IndicatorNode(name, function, tuple(dependencies)))
+
+    def register_indicator(self, name: str, function, parameters: dict, dependencies: list = ()):
+        self._register(IndicatorNode(name, function, tuple(dependencies), parameters))
+
+    def node(self, name: str) -> IndicatorNode:
+        if name not in self._nodes:
+            raise ValueError(f"Indicator node {name} is not registered")
+
+        return self._nodes[name]
+
+    def indicators_parameters(self) -> dict:
+        return OrderedDict((node.name, node.parameters) for node in self._nodes.values() if node.is_indicator())
+
+    def transitive_dependencies(self, name: str) -> list:
+        dependencies = []
+        for dependency in self.node(name).dependencies:
+            for transitive_dependency in self.transitive_dependencies(dependency) + [dependency]:
+                if transitive_dependency not in dependencies:
+                    dependencies.append(transitive_dependency)
+
+        return dependencies
+
+    def definition_hash(self, name: str) -> str:
+        """
+        Hash of everything a node's values depend on: its function, the source of the module defining it (so
+        helper kernels are covered too) and the definition hashes of its dependencies.
+        """
+        if name not in self._definition_hashes:
+            node = self.node(name)
+            definition = hashlib.sha1()
+            definition.update(f"{node.name}:{node.function.__module__}.{node.function.__qualname__}".encode())
+            definition.update(inspect.getsource(inspect.getmodule(node.function)).encode())
+
+            for dependency in node.dependencies:
+                definition.update(self.definition_hash(dependency).encode())
+
+            self._definition_hashes[name] = definition.hexdigest()
+
+        return self._definition_hashes[name]
+
+    def _register(self, node: IndicatorNode):
+        if node.name in self._nodes:
+            raise ValueError(f"Indicator node {node.name} is already registered")
+
+        # Dependencies must be registered first, so the graph can never have cycles
+        for dependency in node.dependencies:
+            if dependency not in self._nodes:
+                raise ValueError(f"Indicator node {node.name} depends on unknown node {dependency}")
+
+        self._nodes[node.name] = node
+
+
+class IndicatorContext:
+    def __init__(self, registry: IndicatorRegistry, df: pd.DataFrame):
+        self._registry = registry
+        self._df = df
+        self._columns = {}
+        self._memo = {}
+        self._evaluation_stack = []
+
+    def length(self):
+        return len(self._df.index)
+
+    def nbytes(self):
+        return sum(values.nbytes for values in self._memo.values())
+
+    def contains(self, name: str, parameters: dict) -> bool:
+        return IndicatorContext._key(name, parameters) in self._memo
+
+    def preload(self, name: str, parameters: dict, values: np.ndarray):
+        # Values computed somewhere else (e.g. loaded from a cache), later computations reuse them
+        self._memo[IndicatorContext._key(name, parameters)] = values
+
+    def series(self, name: str) -> np.ndarray:
+        if name in self._df.columns:
+            if name not in self._columns:
+                self._columns[name] = self._df[name].to_numpy(dtype=np.float64)
+
+            return self._columns[name]
+
+        return self.compute(name, [{}])[:, 0]
+
+    def compute(self, name: str, parameters_list: list) -> np.ndarray:
+        node = self._registry.node(name)
+        if len(self._evaluation_stack) > 0 and name not in self._registry.node(self._evaluation_stack[-1]).dependencies:
+            raise ValueError(f"Indicator node {self._evaluation_stack[-1]} uses undeclared dependency {name}")
+
+        keys = [IndicatorContext._key(name, parameters) for parameters in parameters_list]
+        missing_parameters_list = []
+        for key, parameters in zip(keys, parameters_list):
+            if key not in self._memo and parameters not in missing_parameters_list:
+                missing_parameters_list.append(parameters)
+
+        # Everything not computed yet is computed in a single call, so families stay vectorized
+        if len(missing_parameters_list) > 0:
+            self._evaluation_stack.append(name)
+            try:
+                values = node.function(self, missing_parameters_list)
+            finally:
+                self._evaluation_stack.pop()
+
+            for column_idx, parameters in enumerate(missing_parameters_list):
+                self._memo[IndicatorContext._key(name, parameters)] = values[:, column_idx]
+
+        if len(keys) == 0:
+            return np.empty((self.length(), 0))
+
+        return np.stack([self._memo[key] for key in keys], axis=1)
+
+    def compute_indicators(self, indicators: list) -> np.ndarray:
+        """
+        (N, K) values of a list of (indicator_name, column_name, parameters) tuples, in the same order. Every
+        indicator family is computed in a single call for all its parameters.
+        """
+        parameters_list_per_indicator = {}
+        column_idxs_per_indicator = {}
+        for column_idx, (indicator_name, _, parameters) in enumerate(indicators):
+            parameters_list_per_indicator.setdefault(indicator_name, []).append(parameters)
+            column_idxs_per_indicator.setdefault(indicator_name, []).append(column_idx)
+
+        values = np.empty((self.length(), len(indicators)))
+        for indicator_name in parameters_list_per_indicator:
+            values[:, column_idxs_per_indicator[indicator_name]] = \
+                self.compute(indicator_name, parameters_list_per_indicator[indicator_name])
+
+        return values
+
+    @staticmethod
+    def _key(name: str, parameters: dict):
+        return name, tuple(sorted(parameters.items()))
+
+
+def build_default_indicator_registry() -> IndicatorRegistry:
+    registry = IndicatorRegistry()
+
+    # Intermediates
+    registry.register_intermediate('DELTA', indicator_bank.delta)
+    registry.register_intermediate('VOLUME_PRICE', indicator_bank.volume_price)
+    registry.register_intermediate('TRUE_RANGE', indicator_bank.true_range_node)
+    registry.register_intermediate('EMA', indicator_bank.ema, dependencies=['VOLUME_PRICE'])
+    registry.register_intermediate('VW_EMA', indicator_bank.volume_weighted_ema, dependencies=['EMA'])
+    registry.register_intermediate('AVERAGE_GAIN', indicator_bank.average_gain, dependencies=['DELTA'])
+    registry.register_intermediate('AVERAGE_LOSS', indicator_bank.average_loss, dependencies=['DELTA'])
+    registry.register_intermediate('ATR', indicator_bank.average_true_range, dependencies=['TRUE_RANGE'])
+    registry.register_intermediate('LAG', indicator_bank.lagged)
+
+    # Indicators
+    registry.register_indicator('SMA', indicator_bank.sma, parameters={
+        "period": [4, 6, 8, 10, 12, 14, 16, 18]
+    })
+    registry.register_indicator('VWAP', indicator_bank.vwap, parameters={})
+    registry.register_indicator('MACD', indicator_bank.macd, dependencies=['EMA'], parameters={
+        "period_fast": [4, 8, 12, 16],
+        "period_slow": [8, 16, 24, 32],
+        "signal": [3, 6, 9, 12]
+    })
+    registry.register_indicator('PPO', indicator_bank.ppo, dependencies=['EMA'], parameters={
+        "period_fast": [4, 8, 12, 16],
+        "period_slow": [8, 16, 24, 32],
+        "signal": [3, 6, 9, 12]
+    })
+    registry.register_indicator('VW_MACD', indicator_bank.vw_macd, dependencies=['VW_EMA'], parameters={
+        "period_fast": [4, 8, 12, 16],
+        "period_slow": [8, 16, 24, 32],
+        "signal": [3, 6, 9, 12]
+    })
+    registry.register_indicator('RSI', indicator_bank.rsi, dependencies=['AVERAGE_GAIN', 'AVERAGE_LOSS'], parameters={
+        "period": [4, 6, 8, 10, 12, 14, 16, 18]
+    })
+    registry.register_indicator('OBV', indicator_bank.obv, dependencies=['DELTA'], parameters={})
+    registry.register_indicator('MOM', indicator_bank.mom, dependencies=['LAG'], parameters={
+        "period": [4, 6, 8, 10, 12, 14, 16, 18]
+    })
+    registry.register_indicator('ROC', indicator_bank.roc, dependencies=['LAG'], parameters={
+        "period": [4, 6, 8, 10, 12, 14, 16, 18]
+    })
+    registry.register_indicator('VBM', indicator_bank.vbm, dependencies=['LAG', 'ATR'], parameters={
+        "roc_period": [6, 8, 10, 12, 14],
+        "atr_period": [12, 16, 20, 24, 28]
+    })
+
+    return registry
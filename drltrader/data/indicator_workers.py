@@ -0,0 +1,105 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from drltrader.data.indicator_registry import IndicatorContext
+from drltrader.data.indicator_registry import IndicatorRegistry
+
+logging.basicConfig(format='%(asctime)s %(message)s',
+                    filename='logs/training.log',
+                    encoding='utf-8',
+                    level=logging.DEBUG)
+
+_worker_indicator_registry = None
+_worker_indicators = None
+
+
+def _initialize_worker(indicator_registry: IndicatorRegistry, indicators: list):
+    # The registry and the indicators list are sent once per worker, not once per task
+    global _worker_indicator_registry, _worker_indicators
+    _worker_indicator_registry = indicator_registry
+    _worker_indicators = indicators
+
+
+def _calculate_indicators(input_name: str, output_name: str, length: int, column_names: list):
+    # Workers share the parent's resource tracker, so blocks are only unlinked once, by the parent
+    input_block = shared_memory.SharedMemory(name=input_name)
+    output_block = shared_memory.SharedMemory(name=output_name)
+
+    try:
+        input_values = np.ndarray((length, len(column_names)), dtype=np.float64, buffer=input_block.buf)
+        output_values = np.ndarray((length, len(_worker_indicators)), dtype=np.float64, buffer=output_block.buf)
+
+        df = pd.DataFrame(input_values, columns=column_names, copy=False)
+        output_values[:] = IndicatorContext(_worker_indicator_registry, df).compute_indicators(_worker_indicators)
+        del input_values, output_values, df
+    finally:
+        input_block.close()
+        output_block.close()
+
+
+class IndicatorWorkerPool:
+    """
+    Process pool calculating the indicators of several DataFrames in parallel. Raw columns are written to a
+    shared memory block and the workers write the (N, K) indicator values to another one, so only block names
+    are pickled.
+
+    The registry is pickled once per worker, so its node functions need to be importable module functions.
+    """
+    def __init__(self, workers: int, indicator_registry: IndicatorRegistry, indicators: list):
+        self._indicators = indicators
+
+        # Workers are spawned, forking a process that already ran torch can deadlock
+        self._executor = ProcessPoolExecutor(max_workers=workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_initialize_worker,
+                                             initargs=(indicator_registry, indicators))
+
+    def calculate(self, dfs: list) -> list:
+        blocks = []
+        futures = []
+
+        try:
+            for df in dfs:
+                column_names = [column_name for column_name in df.columns
+                                if pd.api.types.is_numeric_dtype(df[column_name])]
+                input_values = df[column_names].to_numpy(dtype=np.float64)
+
+                input_block = IndicatorWorkerPool._create_block(input_values.nbytes)
+                output_block = IndicatorWorkerPool._create_block(len(df.index) * len(self._indicators) * 8)
+                blocks.append((input_block, output_block))
+
+                np.ndarray(input_values.shape, dtype=np.float64, buffer=input_block.buf)[:] = input_values
+                futures.append(self._executor.submit(_calculate_indicators,
+                                                     input_block.name,
+                                                     output_block.name,
+                                                     len(df.index),
+                                                     column_names))
+
+            indicator_values = []
+            for df, future, (_, output_block) in zip(dfs, futures, blocks):
+                future.result()
+                indicator_values.append(np.ndarray((len(df.index), len(self._indicators)),
+                                                   dtype=np.float64,
+                                                   buffer=output_block.buf).copy())
+
+            return indicator_values
+        finally:
+            for future in futures:
+                future.cancel()
+            for input_block, output_block in blocks:
+                for block in [input_block, output_block]:
+                    block.close()
+                    block.unlink()
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+    @staticmethod
+    def _create_block(nbytes: int) -> shared_memory.SharedMemory:
+        # Zero-sized blocks aren't allowed
+        return shared_memory.SharedMemory(create=True, size=max(1, nbytes))
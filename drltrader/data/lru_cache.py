@@ -0,0 +1,74 @@
+from collections import OrderedDict
+
+import pandas as pd
+
+
+class LRUCache:
+    """
+    Least-recently-used cache bounded by number of entries and/or by the memory used by the cached DataFrames.
+    """
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._entry_bytes = {}
+        self._current_bytes = 0
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def current_bytes(self):
+        return self._current_bytes
+
+    def get(self, key):
+        if key not in self._entries:
+            return None
+
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, value):
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = value
+        self._entry_bytes[key] = LRUCache._size_of(value)
+        self._current_bytes += self._entry_bytes[key]
+
+        self._evict()
+
+    def clear(self):
+        self._entries.clear()
+        self._entry_bytes.clear()
+        self._current_bytes = 0
+
+    def _evict(self):
+        # The newest entry is always kept, even if it doesn't fit the budget on its own
+        while len(self._entries) > 1 and self._over_budget():
+            self._remove(next(iter(self._entries)))
+
+    def _over_budget(self):
+        if self._max_entries is not None and len(self._entries) > self._max_entries:
+            return True
+        if self._max_bytes is not None and self._current_bytes > self._max_bytes:
+            return True
+
+        return False
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._current_bytes -= self._entry_bytes.pop(key)
+
+    @staticmethod
+    def _size_of(value):
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True, deep=True).sum())
+        if hasattr(value, 'nbytes'):
+            return int(value.nbytes)
+
+        return 0
@@ -0,0 +1,137 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from drltrader.data.scenario import Scenario
+from drltrader.data.scenario import interval_to_timedelta
+from drltrader.data.scenario import to_naive_local
+
+logging.basicConfig(format='%(asctime)s %(message)s',
+                    filename='logs/training.log',
+                    encoding='utf-8',
+                    level=logging.DEBUG)
+
+
+class OHLCVStore:
+    """
+    Persistent store of raw OHLCV bars, one Parquet file per (interval, symbol).
+
+    Every file is paired with a JSON sidecar holding the contiguous date range already fetched, so a
+    request only goes to the data source for the head/tail gaps not covered yet. Requests not touching the
+    covered range also fetch the dates in between, so it stays contiguous.
+    """
+    DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+    def __init__(self, directory: str):
+        self._directory = directory
+
+    def retrieve(self, scenario: Scenario, fetch_function) -> pd.DataFrame:
+        stored_df = self._read_bars(scenario)
+        coverage = self._read_coverage(scenario)
+
+        fetched_dfs = []
+        for gap_start_date, gap_end_date in self._missing_ranges(scenario, coverage):
+            logging.info(f"Fetching gap {gap_start_date} - {gap_end_date} of {scenario.interval}_{scenario.symbol}")
+            fetched_dfs.append(fetch_function(scenario.copy_with_dates(gap_start_date, gap_end_date)))
+
+        if len(fetched_dfs) > 0:
+            stored_df = self._merge(stored_df, fetched_dfs)
+            coverage = self._updated_coverage(scenario, coverage, stored_df)
+            self._write(scenario, stored_df, coverage)
+        else:
+            logging.info(f"Scenario {scenario} fully covered by the store")
+
+        return self.slice(stored_df, scenario.start_date, scenario.end_date)
+
+    def _missing_ranges(self, scenario: Scenario, coverage):
+        if coverage is None:
+            return [(scenario.start_date, scenario.end_date)]
+
+        covered_scenario = scenario.copy_with_dates(*coverage)
+        bridged_scenario = scenario.copy_with_dates(min(scenario.start_date, coverage[0]),
+                                                    max(scenario.end_date, coverage[1]))
+        return [(missing_scenario.start_date, missing_scenario.end_date)
+                for missing_scenario in bridged_scenario.difference(covered_scenario)]
+
+    def _updated_coverage(self, scenario: Scenario, coverage, df: pd.DataFrame):
+        start_date = scenario.start_date if coverage is None else min(scenario.start_date, coverage[0])
+        end_date = scenario.end_date if coverage is None else max(scenario.end_date, coverage[1])
+
+        # The last bar of a range that reaches the present might still be in progress, so it's kept out of the
+        # coverage and fetched again on the next request
+        if end_date > datetime.now() - interval_to_timedelta(scenario.interval) and len(df.index) > 0:
+            last_bar_date = to_naive_local(df.index[-1])
+            end_date = max(start_date, min(end_date, last_bar_date))
+
+        return start_date, end_date
+
+    def _write(self, scenario: Scenario, df: pd.DataFrame, coverage):
+        os.makedirs(self._interval_directory(scenario), exist_ok=True)
+
+        bars_path = self._bars_path(scenario)
+        df.to_parquet(f"{bars_path}.tmp")
+        os.replace(f"{bars_path}.tmp", bars_path)
+
+        coverage_path = self._coverage_path(scenario)
+        with open(f"{coverage_path}.tmp", 'w') as coverage_file:
+            json.dump({'start_date': coverage[0].strftime(OHLCVStore.DATE_FORMAT),
+                       'end_date': coverage[1].strftime(OHLCVStore.DATE_FORMAT)}, coverage_file)
+        os.replace(f"{coverage_path}.tmp", coverage_path)
+
+    def _read_bars(self, scenario: Scenario):
+        bars_path = self._bars_path(scenario)
+        if not os.path.exists(bars_path) or not os.path.exists(self._coverage_path(scenario)):
+            return None
+
+        return pd.read_parquet(bars_path)
+
+    def _read_coverage(self, scenario: Scenario):
+        coverage_path = self._coverage_path(scenario)
+        if not os.path.exists(coverage_path) or not os.path.exists(self._bars_path(scenario)):
+            return None
+
+        with open(coverage_path) as coverage_file:
+            coverage = json.load(coverage_file)
+
+        return (datetime.strptime(coverage['start_date'], OHLCVStore.DATE_FORMAT),
+                datetime.strptime(coverage['end_date'], OHLCVStore.DATE_FORMAT))
+
+    def _interval_directory(self, scenario: Scenario):
+        return os.path.join(self._directory, scenario.interval)
+
+    def _bars_path(self, scenario: Scenario):
+        return os.path.join(self._interval_directory(scenario), f"{scenario.symbol}.parquet")
+
+    def _coverage_path(self, scenario: Scenario):
+        return os.path.join(self._interval_directory(scenario), f"{scenario.symbol}.json")
+
+    @staticmethod
+    def _merge(stored_df: pd.DataFrame, fetched_dfs: list):
+        dfs = [df for df in ([stored_df] + fetched_dfs) if df is not None and len(df.index) > 0]
+        if len(dfs) == 0:
+            return fetched_dfs[0]
+
+        # Bars fetched later replace stored ones, which might have been incomplete when they were fetched
+        merged_df = pd.concat(dfs)
+        merged_df = merged_df[~merged_df.index.duplicated(keep='last')]
+        return merged_df.sort_index()
+
+    @staticmethod
+    def slice(df: pd.DataFrame, start_date: datetime, end_date: datetime):
+        if df is None or len(df.index) == 0:
+            return df.copy() if df is not None else pd.DataFrame()
+
+        start = OHLCVStore._to_index_time(start_date, df.index)
+        end = OHLCVStore._to_index_time(end_date, df.index)
+        return df.loc[(df.index >= start) & (df.index < end)].copy()
+
+    @staticmethod
+    def _to_index_time(date: datetime, index: pd.DatetimeIndex):
+        # Naive dates are interpreted in local time, the same way the data source interprets them
+        if index.tz is None:
+            return pd.Timestamp(date)
+
+        return pd.Timestamp(date.astimezone()).tz_convert(index.tz)
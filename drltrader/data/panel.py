@@ -0,0 +1,223 @@
+import numpy as np
+import pandas as pd
+
+
+class Alignments:
+    Union = 'union'
+    Intersection = 'intersection'
+
+
+class FillPolicies:
+    # Missing bars take the last bar of the symbol, timestamps before the first bar of some symbol are dropped
+    ForwardFill = 'ffill'
+    # Timestamps where some symbol is missing are dropped
+    Drop = 'drop'
+    # Missing bars are left as NaN
+    Keep = 'keep'
+
+
+class Panel:
+    """
+    Bars of several symbols as a single contiguous (timestamps, symbols, features) float32 array, plus the
+    labels of every axis. `mask` is True where the symbol had an actual bar at the timestamp, not a filled one.
+
+    Price features are also kept in float64 in `prices`, a (timestamps, symbols, price features) array, so
+    portfolios are valued as precisely as with the bars themselves. `feature` returns them from there.
+    """
+    DTYPE = np.float32
+    PRICES_DTYPE = np.float64
+    PRICE_FEATURE_NAMES = ['Open', 'High', 'Low', 'Close']
+
+    def __init__(self,
+                 values: np.ndarray,
+                 timestamps: pd.DatetimeIndex,
+                 symbols: list,
+                 feature_names: list,
+                 mask: np.ndarray = None,
+                 prices: np.ndarray = None):
+        if values.shape != (len(timestamps), len(symbols), len(feature_names)):
+            raise ValueError(f"Panel values of shape {values.shape} don't match "
+                             f"{len(timestamps)} timestamps, {len(symbols)} symbols and {len(feature_names)} features")
+
+        self.timestamps = timestamps
+        self.symbols = list(symbols)
+        self.feature_names = list(feature_names)
+        self.price_feature_names = [name for name in self.feature_names if name in Panel.PRICE_FEATURE_NAMES]
+        if prices is None:
+            # Taken before values are cast, so float64 values keep their precision
+            prices = values[:, :, self.feature_idxs(self.price_feature_names)]
+        self.prices = np.ascontiguousarray(prices, dtype=Panel.PRICES_DTYPE)
+        self.values = np.ascontiguousarray(values, dtype=Panel.DTYPE)
+        self.mask = np.ones(values.shape[:2], dtype=bool) if mask is None else mask
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.prices.nbytes + self.mask.nbytes
+
+    def symbol_idx(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def feature_idxs(self, feature_names: list) -> list:
+        missing_feature_names = [name for name in feature_names if name not in self.feature_names]
+        if len(missing_feature_names) > 0:
+            raise ValueError(f"Features {missing_feature_names} are not part of the panel")
+
+        return [self.feature_names.index(name) for name in feature_names]
+
+    def feature(self, feature_name: str) -> np.ndarray:
+        # (timestamps, symbols) view of a single feature, in float64 for price features
+        if feature_name in self.price_feature_names:
+            return self.prices[:, :, self.price_feature_names.index(feature_name)]
+
+        return self.values[:, :, self.feature_idxs([feature_name])[0]]
+
+    def feature_values(self, feature_names: list) -> np.ndarray:
+        # (timestamps, symbols, features) array of some features, a view when they're next to each other in panel
+        # order
+        feature_idxs = self.feature_idxs(feature_names)
+        first_feature_idx = feature_idxs[0] if len(feature_idxs) > 0 else 0
+        if feature_idxs == list(range(first_feature_idx, first_feature_idx + len(feature_idxs))):
+            return self.values[:, :, first_feature_idx:first_feature_idx + len(feature_idxs)]
+
+        return self.values[:, :, feature_idxs]
+
+    def features(self, feature_names: list) -> np.ndarray:
+        # (timestamps, symbols * features) array, features of each symbol next to each other. It's a view when
+        # all the features are requested in panel order
+        feature_idxs = self.feature_idxs(feature_names)
+        if feature_idxs == list(range(len(self.feature_names))):
+            return self.values.reshape(len(self.timestamps), len(self.symbols) * len(feature_names))
+
+        values = self.values[:, :, feature_idxs]
+        return values.reshape(len(self.timestamps), len(self.symbols) * len(feature_names))
+
+    def append(self, panel) -> 'Panel':
+        """
+        Panel with the timestamps of `panel` newer than the last one of this panel appended.
+        """
+        if panel.symbols != self.symbols or panel.feature_names != self.feature_names:
+            raise ValueError("Only panels with the same symbols and features can be appended")
+
+        new_timestamps = panel.timestamps > self.timestamps[-1] if len(self.timestamps) > 0 \
+            else np.ones(len(panel.timestamps), dtype=bool)
+
+        return Panel(np.concatenate([self.values, panel.values[new_timestamps]]),
+                     self.timestamps.append(panel.timestamps[new_timestamps]),
+                     self.symbols,
+                     self.feature_names,
+                     np.concatenate([self.mask, panel.mask[new_timestamps]]),
+                     np.concatenate([self.prices, panel.prices[new_timestamps]]))
+
+    def to_dataframes(self) -> dict:
+        dataframe_per_symbol = {}
+        for symbol_idx, symbol in enumerate(self.symbols):
+            df = pd.DataFrame(self.values[:, symbol_idx, :], index=self.timestamps, columns=self.feature_names)
+            df[self.price_feature_names] = self.prices[:, symbol_idx, :]
+            dataframe_per_symbol[symbol] = df
+
+        return dataframe_per_symbol
+
+    @staticmethod
+    def from_dataframes(dataframe_per_symbol: dict,
+                        feature_names: list = None,
+                        alignment: str = Alignments.Union,
+                        fill_policy: str = FillPolicies.ForwardFill) -> 'Panel':
+        """
+        Aligns the bars of every symbol on the union (or intersection) of their timestamps, in a single pass
+        that scatters the bars of every symbol to their aligned positions, without any per-symbol reindexing.
+        """
+        symbols = list(dataframe_per_symbol.keys())
+        first_df = dataframe_per_symbol[symbols[0]]
+
+        if feature_names is None:
+            feature_names = list(first_df.columns)
+        feature_names = list(dict.fromkeys(feature_names))
+
+        # Symbols usually share a handful of distinct indexes, each one is only searched once
+        distinct_timestamps = []
+        distinct_index_idx_per_timestamps = {}
+        distinct_index_idx_per_symbol = []
+        for symbol in symbols:
+            symbol_timestamps = Panel._utc_timestamps(dataframe_per_symbol[symbol].index)
+            distinct_index_idx = distinct_index_idx_per_timestamps.setdefault(symbol_timestamps.tobytes(),
+                                                                              len(distinct_timestamps))
+            if distinct_index_idx == len(distinct_timestamps):
+                distinct_timestamps.append(symbol_timestamps)
+            distinct_index_idx_per_symbol.append(distinct_index_idx)
+
+        timestamps = Panel._sorted_union(distinct_timestamps)
+        if alignment == Alignments.Intersection:
+            symbols_per_distinct_index = np.bincount(distinct_index_idx_per_symbol)
+            counts = np.zeros(len(timestamps), dtype=int)
+            for symbols_count, symbol_timestamps in zip(symbols_per_distinct_index, distinct_timestamps):
+                counts[np.searchsorted(timestamps, np.unique(symbol_timestamps))] += symbols_count
+            timestamps = timestamps[counts == len(symbols)]
+        elif alignment != Alignments.Union:
+            raise ValueError(f"Unknown alignment {alignment}")
+
+        # Position of every bar on the aligned timestamps, or -1 when it's not part of them
+        distinct_positions = []
+        for symbol_timestamps in distinct_timestamps:
+            positions = np.clip(np.searchsorted(timestamps, symbol_timestamps), 0, max(0, len(timestamps) - 1))
+            found = len(timestamps) > 0 and timestamps[positions] == symbol_timestamps
+            distinct_positions.append(np.where(found, positions, -1))
+
+        price_feature_names = [name for name in feature_names if name in Panel.PRICE_FEATURE_NAMES]
+        values = np.full((len(timestamps), len(symbols), len(feature_names)), np.nan, dtype=Panel.DTYPE)
+        prices = np.full((len(timestamps), len(symbols), len(price_feature_names)), np.nan, dtype=Panel.PRICES_DTYPE)
+        mask = np.zeros((len(timestamps), len(symbols)), dtype=bool)
+        for symbol_idx, symbol in enumerate(symbols):
+            positions = distinct_positions[distinct_index_idx_per_symbol[symbol_idx]]
+            symbol_values = dataframe_per_symbol[symbol].loc[:, feature_names].to_numpy()
+            symbol_prices = dataframe_per_symbol[symbol].loc[:, price_feature_names].to_numpy()
+
+            if len(positions) == len(timestamps) and (positions >= 0).all():
+                # Symbols with every timestamp are copied without scattering
+                values[:, symbol_idx] = symbol_values
+                prices[:, symbol_idx] = symbol_prices
+                mask[:, symbol_idx] = True
+            else:
+                found = positions >= 0
+                values[positions[found], symbol_idx] = symbol_values[found]
+                prices[positions[found], symbol_idx] = symbol_prices[found]
+                mask[positions[found], symbol_idx] = True
+
+        if fill_policy == FillPolicies.ForwardFill:
+            # Index of the last actual bar of every symbol at every timestamp, -1 before its first one
+            last_bar_idxs = np.maximum.accumulate(np.where(mask, np.arange(len(timestamps))[:, np.newaxis], -1),
+                                                  axis=0)
+            missing_timestamp_idxs, missing_symbol_idxs = np.nonzero(~mask & (last_bar_idxs >= 0))
+            last_bar_timestamp_idxs = last_bar_idxs[missing_timestamp_idxs, missing_symbol_idxs]
+            values[missing_timestamp_idxs, missing_symbol_idxs] = values[last_bar_timestamp_idxs, missing_symbol_idxs]
+            prices[missing_timestamp_idxs, missing_symbol_idxs] = prices[last_bar_timestamp_idxs, missing_symbol_idxs]
+            kept_timestamps = (last_bar_idxs >= 0).all(axis=1)
+        elif fill_policy == FillPolicies.Drop:
+            kept_timestamps = mask.all(axis=1)
+        elif fill_policy == FillPolicies.Keep:
+            kept_timestamps = np.ones(len(timestamps), dtype=bool)
+        else:
+            raise ValueError(f"Unknown fill policy {fill_policy}")
+
+        if not kept_timestamps.all():
+            values, prices, mask, timestamps = \
+                values[kept_timestamps], prices[kept_timestamps], mask[kept_timestamps], timestamps[kept_timestamps]
+
+        return Panel(values, Panel._to_index(timestamps, first_df.index), symbols, feature_names, mask, prices)
+
+    @staticmethod
+    def _sorted_union(sorted_arrays: list) -> np.ndarray:
+        # A stable sort only merges the already sorted runs, much cheaper than np.unique's quicksort
+        values = np.sort(np.concatenate(sorted_arrays), kind='stable')
+        return values[np.concatenate([[True], values[1:] != values[:-1]])] if len(values) > 0 else values
+
+    @staticmethod
+    def _utc_timestamps(index: pd.DatetimeIndex) -> np.ndarray:
+        return (index.tz_convert(None) if index.tz is not None else index).to_numpy(dtype='datetime64[ns]')
+
+    @staticmethod
+    def _to_index(timestamps: np.ndarray, reference_index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        index = pd.DatetimeIndex(timestamps, name=reference_index.name)
+        if reference_index.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(reference_index.tz)
+
+        return index
@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from drltrader.data.scenario import interval_to_timedelta
+
+# How every column is aggregated into a coarser bar, unknown columns take the last value
+AGGREGATIONS = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+    'Dividends': 'sum',
+    'Stock Splits': 'max',
+}
+
+
+CALENDAR_INTERVALS = ['1d', '1wk', '1mo']
+
+
+def can_resample(base_interval: str, interval: str) -> bool:
+    """
+    Whether bars of `interval` can be built from bars of `base_interval`: calendar intervals can be built from
+    any intraday one, intraday intervals only from intervals dividing them.
+    """
+    base_timedelta = interval_to_timedelta(base_interval)
+    interval_timedelta = interval_to_timedelta(interval)
+    if interval_timedelta <= base_timedelta:
+        return False
+
+    if interval in CALENDAR_INTERVALS:
+        return base_timedelta < interval_to_timedelta('1d') or (base_interval == '1d' and interval != '1d')
+
+    return (interval.endswith('m') or interval.endswith('h')) and interval_timedelta % base_timedelta == timedelta(0)
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregates bars into bars of `interval`. Intraday bars are anchored at the first bar of every day (e.g.
+    09:30 for US stocks, same as Yahoo's hourly bars), daily bars on calendar days, weekly bars on Mondays and
+    monthly bars on the first day of the month.
+
+    Every aggregation is a single reduceat over the bucket boundaries, no per-bucket Python code runs.
+    """
+    if len(df.index) == 0:
+        return df.copy()
+
+    bucket_starts = _bucket_starts(df.index, interval)
+    bucket_values = bucket_starts.asi8
+    first_idxs = np.flatnonzero(np.concatenate([[True], bucket_values[1:] != bucket_values[:-1]]))
+    last_idxs = np.concatenate([first_idxs[1:], [len(df.index)]]) - 1
+
+    columns = {}
+    for column_name in df.columns:
+        values = df[column_name].to_numpy()
+        aggregation = AGGREGATIONS.get(column_name, 'last')
+
+        if aggregation == 'first':
+            columns[column_name] = values[first_idxs]
+        elif aggregation == 'last':
+            columns[column_name] = values[last_idxs]
+        elif aggregation == 'max':
+            columns[column_name] = np.maximum.reduceat(values, first_idxs)
+        elif aggregation == 'min':
+            columns[column_name] = np.minimum.reduceat(values, first_idxs)
+        else:
+            columns[column_name] = np.add.reduceat(values, first_idxs)
+
+    return pd.DataFrame(columns, index=bucket_starts[first_idxs])
+
+
+def _bucket_starts(index: pd.DatetimeIndex, interval: str) -> pd.DatetimeIndex:
+    # Days, weeks and months are calendar (wall time) buckets, so they're computed on naive local timestamps
+    local_days = index.tz_localize(None).normalize() if index.tz is not None else index.normalize()
+
+    if interval in CALENDAR_INTERVALS:
+        if interval == '1wk':
+            local_days = local_days - pd.to_timedelta(local_days.dayofweek, unit='D')
+        elif interval == '1mo':
+            local_days = local_days - pd.to_timedelta(local_days.day - 1, unit='D')
+
+        return local_days.tz_localize(index.tz) if index.tz is not None else local_days
+
+    if not interval.endswith('m') and not interval.endswith('h'):
+        raise ValueError(f"Can't resample to interval {interval}")
+
+    # Intraday buckets start at the first bar of each day
+    day_values = local_days.asi8
+    day_firsts = np.concatenate([[True], day_values[1:] != day_values[:-1]])
+    day_first_bars = index[np.flatnonzero(day_firsts)][np.cumsum(day_firsts) - 1]
+
+    interval_timedelta = pd.Timedelta(interval_to_timedelta(interval))
+    return day_first_bars + ((index - day_first_bars) // interval_timedelta) * interval_timedelta
@@ -1,7 +1,57 @@
 from datetime import datetime
+from datetime import timedelta
+
+INTERVAL_TIMEDELTAS = {
+    'm': timedelta(minutes=1),
+    'h': timedelta(hours=1),
+    'd': timedelta(days=1),
+    'wk': timedelta(weeks=1),
+    'mo': timedelta(days=30),
+}
+
+
+def interval_to_timedelta(interval: str) -> timedelta:
+    for unit in sorted(INTERVAL_TIMEDELTAS, key=len, reverse=True):
+        if interval.endswith(unit) and interval[:-len(unit)].isdigit():
+            return int(interval[:-len(unit)]) * INTERVAL_TIMEDELTAS[unit]
+
+    raise ValueError(f"Unknown interval {interval}")
+
+
+def floor_to_interval(date: datetime, interval: str) -> datetime:
+    interval_timedelta = interval_to_timedelta(interval)
+    day_start = date.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if interval_timedelta >= timedelta(days=1):
+        return day_start
+
+    return day_start + ((date - day_start) // interval_timedelta) * interval_timedelta
+
+
+def ceil_to_interval(date: datetime, interval: str) -> datetime:
+    floored_date = floor_to_interval(date, interval)
+    if floored_date == date:
+        return date
+
+    return floored_date + min(interval_to_timedelta(interval), timedelta(days=1))
+
+
+def to_naive_local(timestamp) -> datetime:
+    # Bar timestamps to the naive local dates of scenarios
+    if timestamp.tzinfo is None:
+        return timestamp.to_pydatetime()
+
+    return timestamp.to_pydatetime().astimezone().replace(tzinfo=None)
 
 
 class Scenario:
+    """
+    Immutable value type: scenarios with the same symbols, interval and dates are equal and hash the same, so
+    they can be used directly as cache keys. Dates are floored to the interval, so dates falling within the same
+    bar give the same scenario.
+    """
+    __slots__ = ('start_date', 'end_date', 'interval', 'symbol', 'symbols', '_key', '_hash', '_clones')
+
     def __init__(self,
                  start_date: datetime,
                  end_date: datetime = None,
@@ -13,32 +63,113 @@ class Scenario:
         if symbol is not None and symbols is not None:
             raise ValueError("Either symbol or symbols needs to be provided, not both")
 
-        self.symbol = symbol
-        self.symbols = symbols
-        self.start_date = start_date
-        self.end_date = end_date
-        self.interval = interval
+        object.__setattr__(self, 'symbol', symbol)
+        object.__setattr__(self, 'symbols', tuple(symbols) if symbols is not None else None)
+        object.__setattr__(self, 'start_date', floor_to_interval(start_date, interval))
+        object.__setattr__(self, 'end_date', floor_to_interval(end_date, interval) if end_date is not None else None)
+        object.__setattr__(self, 'interval', interval)
+        object.__setattr__(self, '_clones', {})
+
+        symbols_space = symbol if symbol is not None else "_".join(self.symbols)
+        end_date_space = self.end_date.strftime('%Y-%m-%d-%H-%M-%S') if self.end_date is not None else 'None'
+        object.__setattr__(self, '_key', f"{interval}"
+                                         f"_{symbols_space}"
+                                         f"_{self.start_date.strftime('%Y-%m-%d-%H-%M-%S')}"
+                                         f"_{end_date_space}")
+        object.__setattr__(self, '_hash', hash((self.start_date, self.end_date, interval, symbol, self.symbols)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Scenario is immutable, use one of its copy methods instead")
+
+    def __delattr__(self, name):
+        raise AttributeError("Scenario is immutable, use one of its copy methods instead")
+
+    def __reduce__(self):
+        return Scenario, (self.start_date, self.end_date, self.interval, self.symbol, self.symbols)
+
+    def __eq__(self, other):
+        if not isinstance(other, Scenario):
+            return NotImplemented
+
+        return self._hash == other._hash and \
+            (self.start_date, self.end_date, self.interval, self.symbol, self.symbols) == \
+            (other.start_date, other.end_date, other.interval, other.symbol, other.symbols)
+
+    def __hash__(self):
+        return self._hash
 
     def __str__(self):
-        if self.symbol is not None:
-            symbols_space = f"{self.symbol}"
-        else:
-            symbols_space = "_".join(self.symbols)
+        return self._key
 
-        return f"{self.interval}" \
-               f"_{symbols_space}" \
-               f"_{self.start_date.strftime('%Y-%m-%d-%H-%M-%S')}" \
-               f"_{self.end_date.strftime('%Y-%m-%d-%H-%M-%S')}"
+    def __repr__(self):
+        return f"Scenario({self._key})"
 
     def clone_with_symbol(self, symbol):
-        return Scenario(start_date=self.start_date,
-                        end_date=self.end_date,
-                        interval=self.interval,
-                        symbol=symbol)
+        return self._clone(('symbol', symbol),
+                           lambda: Scenario(start_date=self.start_date,
+                                            end_date=self.end_date,
+                                            interval=self.interval,
+                                            symbol=symbol))
 
     def copy_with_end_date(self, end_date: datetime):
-        return Scenario(start_date=self.start_date,
+        return self.copy_with_dates(self.start_date, end_date)
+
+    def copy_with_dates(self, start_date: datetime, end_date: datetime):
+        return Scenario(start_date=start_date,
                         end_date=end_date,
                         interval=self.interval,
                         symbol=self.symbol,
                         symbols=self.symbols)
+
+    def copy_with_interval(self, interval: str):
+        return self._clone(('interval', interval),
+                           lambda: Scenario(start_date=self.start_date,
+                                            end_date=self.end_date,
+                                            interval=interval,
+                                            symbol=self.symbol,
+                                            symbols=self.symbols))
+
+    def overlap(self, other):
+        """
+        Scenario covering the dates shared with `other`, or None when they don't share any. Both scenarios need
+        the same symbols and interval.
+        """
+        self._validate_comparable(other)
+
+        start_date = max(self.start_date, other.start_date)
+        end_date = min(self.end_date, other.end_date)
+        if start_date >= end_date:
+            return None
+
+        return self.copy_with_dates(start_date, end_date)
+
+    def difference(self, other) -> list:
+        """
+        Scenarios covering the dates of this scenario not covered by `other`: none, the head and/or the tail.
+        """
+        self._validate_comparable(other)
+
+        if self.overlap(other) is None:
+            return [self]
+
+        differences = []
+        if self.start_date < other.start_date:
+            differences.append(self.copy_with_dates(self.start_date, other.start_date))
+        if self.end_date > other.end_date:
+            differences.append(self.copy_with_dates(other.end_date, self.end_date))
+
+        return differences
+
+    def _validate_comparable(self, other):
+        if self.end_date is None or other.end_date is None:
+            raise ValueError("Only scenarios with end dates can be compared")
+        if (self.interval, self.symbol, self.symbols) != (other.interval, other.symbol, other.symbols):
+            raise ValueError("Only scenarios with the same symbols and interval can be compared")
+
+    def _clone(self, clone_key, build_function):
+        # Clones are immutable too, so the same one can be returned every time. Only the symbol and interval
+        # clones are kept, there's a bounded number of them
+        if clone_key not in self._clones:
+            self._clones[clone_key] = build_function()
+
+        return self._clones[clone_key]
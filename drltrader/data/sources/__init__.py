@@ -0,0 +1,42 @@
+import abc
+import threading
+
+import pandas as pd
+
+from drltrader.data.scenario import Scenario
+
+
+class DataSource(abc.ABC):
+    """
+    Where DataProvider gets raw OHLCV bars from. At most `max_concurrency` fetches run at the same time on a
+    source, no matter how many threads (or DataProviders) share it.
+    """
+    def __init__(self, max_concurrency: int = 1):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency needs to be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    def __getstate__(self):
+        # Semaphores can't be pickled, every process limits its own fetches
+        state = self.__dict__.copy()
+        del state['_semaphore']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+
+    def fetch(self, scenario: Scenario) -> pd.DataFrame:
+        with self._semaphore:
+            return self._fetch(scenario)
+
+    def digest(self, scenario: Scenario) -> str:
+        # Identifies the bars fetched for a single symbol scenario, data derived from them is keyed on it. Past
+        # bars of remote sources aren't expected to change, so by default it's just the source
+        return type(self).__name__
+
+    @abc.abstractmethod
+    def _fetch(self, scenario: Scenario) -> pd.DataFrame:
+        pass
@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from drltrader.data.ohlcv_store import OHLCVStore
+from drltrader.data.scenario import Scenario
+from drltrader.data.sources import DataSource
+
+logging.basicConfig(format='%(asctime)s %(message)s',
+                    filename='logs/training.log',
+                    encoding='utf-8',
+                    level=logging.DEBUG)
+
+
+class FileDataSource(DataSource):
+    """
+    Offline source reading bars from a local directory, either `{directory}/{interval}/{symbol}.{parquet,csv}`
+    (the same layout as OHLCVStore, so a store directory can be replayed offline) or `{directory}/{symbol}.{...}`.
+
+    CSV files need the dates on the first column. When `timezone` is given, CSV dates are parsed as UTC and
+    converted to it, otherwise they're kept as written.
+    """
+    EXTENSIONS = ['parquet', 'csv']
+
+    def __init__(self, directory: str, timezone: str = None, max_concurrency: int = 4):
+        super().__init__(max_concurrency=max_concurrency)
+        self._directory = directory
+        self._timezone = timezone
+        self._dfs = {}
+        self._dfs_lock = threading.Lock()
+
+    def __getstate__(self):
+        # Read files stay in this process, other processes read their own
+        state = super().__getstate__()
+        del state['_dfs']
+        del state['_dfs_lock']
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._dfs = {}
+        self._dfs_lock = threading.Lock()
+
+    def digest(self, scenario: Scenario) -> str:
+        # Rewriting a file changes its modification time, so the digest changes without reading it
+        path = self._path(scenario)
+        file_stat = os.stat(path) if path is not None else None
+        return json.dumps([type(self).__name__,
+                           os.path.abspath(path) if path is not None else os.path.abspath(self._directory),
+                           self._timezone,
+                           [file_stat.st_mtime_ns, file_stat.st_size] if file_stat is not None else None])
+
+    def _fetch(self, scenario: Scenario) -> pd.DataFrame:
+        path = self._path(scenario)
+        if path is None:
+            raise ValueError(f"There's no file for {scenario.interval}_{scenario.symbol} in {self._directory}")
+
+        return OHLCVStore.slice(self._read(path), scenario.start_date, scenario.end_date)
+
+    def _path(self, scenario: Scenario):
+        for directory in [os.path.join(self._directory, scenario.interval), self._directory]:
+            for extension in FileDataSource.EXTENSIONS:
+                path = os.path.join(directory, f"{scenario.symbol}.{extension}")
+                if os.path.exists(path):
+                    return path
+
+        return None
+
+    def _read(self, path: str) -> pd.DataFrame:
+        # Files are read once and kept until they change, scenarios are usually slices of the same file
+        modification_time = os.path.getmtime(path)
+        with self._dfs_lock:
+            cached_modification_time, df = self._dfs.get(path, (None, None))
+
+        if cached_modification_time != modification_time:
+            logging.info(f"Reading bars from {path}")
+            df = pd.read_parquet(path) if path.endswith('.parquet') else self._read_csv(path)
+            df = df.sort_index()
+
+            with self._dfs_lock:
+                self._dfs[path] = (modification_time, df)
+
+        return df
+
+    def _read_csv(self, path: str) -> pd.DataFrame:
+        df = pd.read_csv(path, index_col=0)
+
+        if self._timezone is not None:
+            df.index = pd.to_datetime(df.index, utc=True).tz_convert(self._timezone)
+        else:
+            df.index = pd.to_datetime(df.index)
+
+        return df
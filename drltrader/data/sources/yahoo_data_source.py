@@ -0,0 +1,17 @@
+import yfinance as yf
+import pandas as pd
+
+from drltrader.data.scenario import Scenario
+from drltrader.data.sources import DataSource
+
+
+class YahooDataSource(DataSource):
+    def __init__(self, max_concurrency: int = 4):
+        super().__init__(max_concurrency=max_concurrency)
+
+    def _fetch(self, scenario: Scenario) -> pd.DataFrame:
+        ticker = yf.Ticker(scenario.symbol)
+        df = ticker.history(start=scenario.start_date,
+                            end=scenario.end_date,
+                            interval=scenario.interval)
+        return df
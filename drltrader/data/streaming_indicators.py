@@ -0,0 +1,258 @@
+import abc
+
+import numpy as np
+import pandas as pd
+
+
+class _StreamingEWM:
+    # Same recurrence as pandas' ewm(adjust=True, ignore_na=False).mean(), vectorized over several alphas
+    def __init__(self, alphas):
+        self._decays = 1.0 - np.asarray(alphas, dtype=np.float64)
+        self._averages = np.full(self._decays.shape, np.nan)
+        self._old_weights = np.ones(self._decays.shape)
+
+    def update(self, values):
+        values = np.broadcast_to(np.asarray(values, dtype=np.float64), self._decays.shape)
+        observed = ~np.isnan(values)
+        has_average = ~np.isnan(self._averages)
+
+        old_weights = np.where(has_average, self._old_weights * self._decays, self._old_weights)
+        updating = has_average & observed
+
+        averages = np.where(updating & (self._averages != values),
+                            (old_weights * self._averages + values) / (old_weights + 1.0),
+                            self._averages)
+        averages = np.where(~has_average & observed, values, averages)
+
+        self._old_weights = np.where(updating, old_weights + 1.0, old_weights)
+        self._averages = averages
+
+        return averages
+
+
+class _StreamingWindow:
+    # Keeps the last `size` values, oldest first, padded with NaN until enough values arrived
+    def __init__(self, size):
+        self._values = np.full(size, np.nan)
+
+    def update(self, value):
+        self._values[:-1] = self._values[1:]
+        self._values[-1] = value
+
+    def lag(self, lags):
+        return self._values[-1 - np.asarray(lags)]
+
+    def means(self, periods):
+        cumulative_sums = np.cumsum(self._values[::-1])
+        return cumulative_sums[np.asarray(periods) - 1] / np.asarray(periods)
+
+
+class _StreamingIndicator(abc.ABC):
+    def __init__(self, parameters_list: list):
+        self._parameters_list = parameters_list
+
+    def _parameter(self, parameter_name):
+        return np.array([parameters[parameter_name] for parameters in self._parameters_list])
+
+    @abc.abstractmethod
+    def update(self, bar):
+        pass
+
+
+class _StreamingSMA(_StreamingIndicator):
+    def __init__(self, parameters_list: list):
+        super().__init__(parameters_list)
+        self._periods = self._parameter('period')
+        self._closes = _StreamingWindow(self._periods.max())
+
+    def update(self, bar):
+        self._closes.update(bar['close'])
+        return self._closes.means(self._periods)
+
+
+class _StreamingMOM(_StreamingIndicator):
+    def __init__(self, parameters_list: list):
+        super().__init__(parameters_list)
+        self._periods = self._parameter('period')
+        self._closes = _StreamingWindow(self._periods.max() + 1)
+
+    def update(self, bar):
+        self._closes.update(bar['close'])
+        return bar['close'] - self._closes.lag(self._periods)
+
+
+class _StreamingROC(_StreamingMOM):
+    def update(self, bar):
+        self._closes.update(bar['close'])
+        previous_closes = self._closes.lag(self._periods)
+        return (bar['close'] - previous_closes) / previous_closes * 100
+
+
+class _StreamingRSI(_StreamingIndicator):
+    def __init__(self, parameters_list: list):
+        super().__init__(parameters_list)
+        alphas = 1.0 / self._parameter('period')
+        self._gains = _StreamingEWM(alphas)
+        self._losses = _StreamingEWM(alphas)
+        self._last_close = np.nan
+
+    def update(self, bar):
+        delta = bar['close'] - self._last_close
+        self._last_close = bar['close']
+
+        gain = self._gains.update(delta if not delta < 0 else 0.0)
+        loss = self._losses.update(abs(delta) if not delta > 0 else 0.0)
+        return 100 - (100 / (1 + gain / loss))
+
+
+class _StreamingMACD(_StreamingIndicator):
+    def __init__(self, parameters_list: list):
+        super().__init__(parameters_list)
+        self._fast = _StreamingEWM(2.0 / (self._parameter('period_fast') + 1))
+        self._slow = _StreamingEWM(2.0 / (self._parameter('period_slow') + 1))
+        self._signal = _StreamingEWM(2.0 / (self._parameter('signal') + 1))
+
+    def update(self, bar):
+        macd = self._fast.update(bar['close']) - self._slow.update(bar['close'])
+        return self._signal.update(macd)
+
+
+class _StreamingPPO(_StreamingMACD):
+    def update(self, bar):
+        slow = self._slow.update(bar['close'])
+        ppo = (self._fast.update(bar['close']) - slow) / slow * 100
+        return ppo - self._signal.update(ppo)
+
+
+class _StreamingVWMACD(_StreamingMACD):
+    def __init__(self, parameters_list: list):
+        super().__init__(parameters_list)
+        self._fast_volume = _StreamingEWM(2.0 / (self._parameter('period_fast') + 1))
+        self._slow_volume = _StreamingEWM(2.0 / (self._parameter('period_slow') + 1))
+
+    def update(self, bar):
+        volume_price = bar['volume'] * bar['close']
+        fast = self._fast.update(volume_price) / self._fast_volume.update(bar['volume'])
+        slow = self._slow.update(volume_price) / self._slow_volume.update(bar['volume'])
+        return self._signal.update(fast - slow)
+
+
+class _StreamingVWAP(_StreamingIndicator):
+    def __init__(self, parameters_list: list):
+        super().__init__(parameters_list)
+        self._volume_price_sum = 0.0
+        self._volume_sum = 0.0
+
+    def update(self, bar):
+        typical_price = (bar['high'] + bar['low'] + bar['close']) / 3
+        self._volume_price_sum += bar['volume'] * typical_price
+        self._volume_sum += bar['volume']
+        return np.array([self._volume_price_sum / self._volume_sum])
+
+
+class _StreamingOBV(_StreamingIndicator):
+    def __init__(self, parameters_list: list):
+        super().__init__(parameters_list)
+        self._obv = 0.0
+        self._last_close = np.nan
+
+    def update(self, bar):
+        close, last_close = bar['close'], self._last_close
+        self._last_close = close
+
+        if close > last_close:
+            self._obv += bar['volume']
+        elif close < last_close:
+            self._obv -= bar['volume']
+        else:
+            return np.array([np.nan])
+
+        return np.array([self._obv])
+
+
+class _StreamingVBM(_StreamingIndicator):
+    def __init__(self, parameters_list: list):
+        super().__init__(parameters_list)
+        self._roc_periods = self._parameter('roc_period')
+        self._atr_periods = self._parameter('atr_period')
+        self._closes = _StreamingWindow(self._roc_periods.max() + 1)
+        self._true_ranges = _StreamingWindow(self._atr_periods.max())
+
+    def update(self, bar):
+        previous_close = self._closes.lag(0)
+        self._closes.update(bar['close'])
+
+        true_range = np.nanmax([abs(bar['high'] - bar['low']),
+                                abs(bar['high'] - previous_close),
+                                abs(previous_close - bar['low'])])
+        self._true_ranges.update(true_range)
+
+        previous_closes = self._closes.lag(self._roc_periods)
+        return (bar['close'] - 2 * previous_closes) / self._true_ranges.means(self._atr_periods)
+
+
+class StreamingIndicatorEngine:
+    """
+    Keeps rolling state for every indicator column so appended bars are processed in O(new bars).
+
+    `indicators` is a list of (indicator_name, column_name, parameters) tuples, in the same order as the
+    columns produced by DataProvider._calculate_indicators, which this engine reproduces within float tolerance.
+    """
+    STREAMING_INDICATORS = {
+        'SMA': _StreamingSMA,
+        'VWAP': _StreamingVWAP,
+        'MACD': _StreamingMACD,
+        'PPO': _StreamingPPO,
+        'VW_MACD': _StreamingVWMACD,
+        'RSI': _StreamingRSI,
+        'OBV': _StreamingOBV,
+        'MOM': _StreamingMOM,
+        'ROC': _StreamingROC,
+        'VBM': _StreamingVBM,
+    }
+
+    def __init__(self, indicators: list):
+        self.column_names = [column_name for _, column_name, _ in indicators]
+
+        # Bars the longest indicator looks back, the most any consumer of the stream needs to keep
+        self.lookback = 1 + max([parameter_value for _, _, parameters in indicators
+                                 for parameter_value in parameters.values()
+                                 if isinstance(parameter_value, (int, float))], default=0)
+        self._streaming_indicators = []
+
+        parameters_list_per_indicator = {}
+        column_idxs_per_indicator = {}
+        for column_idx, (indicator_name, _, parameters) in enumerate(indicators):
+            if indicator_name not in StreamingIndicatorEngine.STREAMING_INDICATORS:
+                raise ValueError(f"Indicator {indicator_name} doesn't support streaming")
+
+            parameters_list_per_indicator.setdefault(indicator_name, []).append(parameters)
+            column_idxs_per_indicator.setdefault(indicator_name, []).append(column_idx)
+
+        for indicator_name in parameters_list_per_indicator:
+            streaming_indicator_class = StreamingIndicatorEngine.STREAMING_INDICATORS[indicator_name]
+            self._streaming_indicators.append((streaming_indicator_class(parameters_list_per_indicator[indicator_name]),
+                                               np.array(column_idxs_per_indicator[indicator_name])))
+
+    @staticmethod
+    def supports(indicator_names):
+        return all(indicator_name in StreamingIndicatorEngine.STREAMING_INDICATORS
+                   for indicator_name in indicator_names)
+
+    def update(self, df: pd.DataFrame) -> pd.DataFrame:
+        bars = {
+            'high': df['High'].to_numpy(dtype=np.float64),
+            'low': df['Low'].to_numpy(dtype=np.float64),
+            'close': df['Close'].to_numpy(dtype=np.float64),
+            'volume': df['Volume'].to_numpy(dtype=np.float64),
+        }
+        values = np.empty((len(df.index), len(self.column_names)))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for row_idx in range(0, len(df.index)):
+                bar = {name: bars[name][row_idx] for name in bars}
+                for streaming_indicator, column_idxs in self._streaming_indicators:
+                    values[row_idx, column_idxs] = streaming_indicator.update(bar)
+
+        values[np.isnan(values)] = 0.0
+        return pd.DataFrame(values, index=df.index, columns=self.column_names)
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+class AllocationHistory:
+    """
+    Allocations of an episode as a structured array, preallocated and grown by doubling, so recording one is a
+    single row assignment. Iterating or indexing it still gives the allocation details dicts.
+    """
+    DTYPE = np.dtype([
+        ('allocation_tick', np.int64),
+        ('source_symbol_idx', np.int32),
+        ('source_symbol_price', np.float64),
+        ('source_symbol_shares', np.float64),
+        ('target_symbol_idx', np.int32),
+        ('target_symbol_price', np.float64),
+        ('target_symbol_original_shares', np.float64),
+        ('target_symbol_new_shares', np.float64),
+    ])
+
+    def __init__(self, symbols: list, initial_capacity: int = 64):
+        self._symbols = symbols
+        self._records = np.empty(max(1, initial_capacity), dtype=AllocationHistory.DTYPE)
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self._to_details(record) for record in self.records()[idx]]
+
+        return self._to_details(self.records()[idx])
+
+    def __iter__(self):
+        for record in self.records():
+            yield self._to_details(record)
+
+    def append(self,
+               allocation_tick: int,
+               source_symbol_idx: int,
+               source_symbol_price: float,
+               source_symbol_shares: float,
+               target_symbol_idx: int,
+               target_symbol_price: float,
+               target_symbol_original_shares: float,
+               target_symbol_new_shares: float):
+        if self._length == len(self._records):
+            records = np.empty(2 * len(self._records), dtype=AllocationHistory.DTYPE)
+            records[:self._length] = self._records
+            self._records = records
+
+        self._records[self._length] = (allocation_tick,
+                                       source_symbol_idx,
+                                       source_symbol_price,
+                                       source_symbol_shares,
+                                       target_symbol_idx,
+                                       target_symbol_price,
+                                       target_symbol_original_shares,
+                                       target_symbol_new_shares)
+        self._length += 1
+
+    def records(self) -> np.ndarray:
+        # View of the recorded allocations, every field is a column, e.g. records()['allocation_tick']
+        return self._records[:self._length]
+
+    def _to_details(self, record) -> dict:
+        return {
+            'allocation_tick': int(record['allocation_tick']),
+
+            'source_symbol': self._symbols[record['source_symbol_idx']],
+            'source_symbol_price': float(record['source_symbol_price']),
+            'source_symbol_shares': float(record['source_symbol_shares']),
+
+            'target_symbol': self._symbols[record['target_symbol_idx']],
+            'target_symbol_price': float(record['target_symbol_price']),
+            'target_symbol_original_shares': float(record['target_symbol_original_shares']),
+            'target_symbol_new_shares': float(record['target_symbol_new_shares']),
+        }
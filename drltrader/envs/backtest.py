@@ -0,0 +1,71 @@
+import numpy as np
+
+from drltrader.envs.allocation_history import AllocationHistory
+from drltrader.envs.portfolio_stocks_env import PortfolioStocksEnv
+
+
+def backtest(actions: np.ndarray,
+             prices: np.ndarray,
+             start_tick: int,
+             initial_symbol_idx: int = 0,
+             initial_shares: float = 1.0,
+             allocation_penalty: float = PortfolioStocksEnv.ALLOCATION_PENALTY):
+    """
+    Same accounting as stepping PortfolioStocksEnv with `actions` from `start_tick` on, starting with
+    `initial_shares` of the symbol at `initial_symbol_idx`, without any per-tick Python code. The whole allocation
+    follows the selected symbol, so the portfolio value is the initial value times the cumulative product of the
+    price ratios of the held symbol, with the penalty applied at every switch.
+
+    `prices` is (ticks, symbols) and `actions` are the selected symbol indexes for the ticks after `start_tick`,
+    either (steps,) for a single sequence or (sequences, steps) for several at once. Returns the portfolio value
+    from `start_tick` on, the final profit and the trades, as AllocationHistory records, of every sequence.
+    """
+    actions = np.asarray(actions, dtype=np.int64)
+    single_sequence = actions.ndim == 1
+    actions = np.atleast_2d(actions)
+    steps = actions.shape[1]
+
+    if start_tick < 0 or start_tick + steps >= len(prices):
+        raise ValueError(f"{steps} steps from tick {start_tick} don't fit {len(prices)} ticks of prices")
+    if actions.size > 0 and (actions.min() < 0 or actions.max() >= prices.shape[1]):
+        raise ValueError(f"Actions need to be symbol indexes between 0 and {prices.shape[1] - 1}")
+    if initial_shares <= 0.0:
+        raise ValueError("There are no allocated symbols")
+
+    prices = np.asarray(prices[start_tick:start_tick + steps + 1], dtype=np.float64)
+    ticks = np.arange(steps)
+
+    # Symbol held before every step, the previous action or the initial symbol
+    held_symbol_idxs = np.concatenate([np.full((len(actions), 1), initial_symbol_idx), actions[:, :-1]], axis=1)
+    switches = actions != held_symbol_idxs
+
+    growths = (prices[1:] / prices[:-1])[ticks, held_symbol_idxs]
+    growths = np.where(switches, growths * (1.0 - allocation_penalty), growths)
+
+    portfolio_values = np.empty((len(actions), steps + 1))
+    portfolio_values[:, 0] = initial_shares * prices[0, initial_symbol_idx]
+    portfolio_values[:, 1:] = portfolio_values[:, :1] * np.cumprod(growths, axis=1)
+    final_profits = portfolio_values[:, -1] / portfolio_values[:, 0]
+
+    # Trades of every sequence, in order, split afterwards
+    sequence_idxs, switch_steps = np.nonzero(switches)
+    source_symbol_idxs = held_symbol_idxs[sequence_idxs, switch_steps]
+    target_symbol_idxs = actions[sequence_idxs, switch_steps]
+
+    trades = np.empty(len(sequence_idxs), dtype=AllocationHistory.DTYPE)
+    trades['allocation_tick'] = start_tick + switch_steps + 1
+    trades['source_symbol_idx'] = source_symbol_idxs
+    trades['source_symbol_price'] = prices[switch_steps + 1, source_symbol_idxs]
+    trades['source_symbol_shares'] = portfolio_values[sequence_idxs, switch_steps] / \
+        prices[switch_steps, source_symbol_idxs]
+    trades['target_symbol_idx'] = target_symbol_idxs
+    trades['target_symbol_price'] = prices[switch_steps + 1, target_symbol_idxs]
+    trades['target_symbol_original_shares'] = 0.0
+    trades['target_symbol_new_shares'] = portfolio_values[sequence_idxs, switch_steps + 1] / \
+        trades['target_symbol_price']
+    trades_per_sequence = np.split(trades, np.searchsorted(sequence_idxs, np.arange(1, len(actions))))
+
+    if single_sequence:
+        return portfolio_values[0], float(final_profits[0]), trades_per_sequence[0]
+
+    return portfolio_values, final_profits, trades_per_sequence
@@ -2,11 +2,21 @@ import gym
 import numpy as np
 import pandas as pd
 from gym import spaces
+from numpy.lib.stride_tricks import sliding_window_view
 import matplotlib.pyplot as plt
 
+from drltrader.data.panel import Panel
+from drltrader.envs.allocation_history import AllocationHistory
 from drltrader.observers import Order, Sides
 
 
+class InfoModes:
+    # Every step returns the portfolio allocation and the allocations history
+    Full = 'full'
+    # Steps only return scalars, the allocation and the history are returned once the episode is done
+    Scalars = 'scalars'
+
+
 class PortfolioStocksEnv(gym.Env):
     ALLOCATION_PENALTY = 0.002
 
@@ -14,28 +24,52 @@ class PortfolioStocksEnv(gym.Env):
 
     def __init__(self,
                  window_size: int,
-                 dataframe_per_symbol: dict,
-                 initial_portfolio_allocation: dict,
+                 dataframe_per_symbol: dict = None,
+                 initial_portfolio_allocation: dict = None,
                  prices_feature_name: str = 'Close',
-                 signal_feature_names: list = ['RSI_4', 'RSI_16']):
+                 signal_feature_names: list = ['RSI_4', 'RSI_16'],
+                 panel: Panel = None,
+                 copy_observations: bool = True,
+                 info_mode: str = InfoModes.Full,
+                 random_start_offsets: bool = False,
+                 seed: int = None):
+        """
+        Observations are read-only views of the signal features (copies of the window only, when the panel has
+        other features too) unless `copy_observations` is set, which is only needed by consumers modifying them
+        in place (VecEnvs already copy them into their own buffers). See InfoModes for `info_mode`. With
+        `random_start_offsets` every episode starts at a random tick instead of the first one.
+        """
         super(PortfolioStocksEnv, self).__init__()
 
+        if (dataframe_per_symbol is None) == (panel is None):
+            raise ValueError("Either dataframe_per_symbol or panel needs to be provided")
+        if info_mode not in [InfoModes.Full, InfoModes.Scalars]:
+            raise ValueError(f"Unknown info mode {info_mode}")
+
         # Save Configurations
         self._window_size = window_size
         self._initial_portfolio_allocation = initial_portfolio_allocation
-        self._dataframe_per_symbol = dataframe_per_symbol
         self._prices_feature_name = prices_feature_name
         self._signal_feature_names = signal_feature_names
+        self._copy_observations = copy_observations
+        self._info_mode = info_mode
+        self._random_start_offsets = random_start_offsets
+        self._random_generator = np.random.default_rng(seed)
+        self._panel = panel if panel is not None else self._build_panel(dataframe_per_symbol)
+        if len(self._panel.timestamps) <= window_size:
+            raise ValueError(f"A panel of {len(self._panel.timestamps)} timestamps is too short "
+                             f"for a window of {window_size}")
 
         # Initialize Custom Configurations
         self._reset_enabled = True
-        self._process_dataframe_per_symbol()
+        self._live_capacity = None
+        self._process_panel()
         self._action_to_symbol = {}
-        for symbol in dataframe_per_symbol:
+        for symbol in self._panel.symbols:
             self._action_to_symbol[len(self._action_to_symbol)] = symbol
 
         # Initialize Gym Configurations
-        self.action_space = spaces.Discrete(len(self._dataframe_per_symbol))
+        self.action_space = spaces.Discrete(len(self._panel.symbols))
         self.shape = self._get_observation(self._window_size).shape
         self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=self.shape, dtype=np.float32)
 
@@ -43,21 +77,22 @@ class PortfolioStocksEnv(gym.Env):
         self.observer = None
         self._done = None
         self._current_tick = None
-        self._portfolio_allocation = None
+        self._shares = None
+        self._initial_portfolio_value = None
         self._allocations_history = None
 
         self.reset()
 
-    def append_data(self, dataframe_per_symbol: dict):
-        new_dataframe_per_symbol = {}
+    def append_data(self, dataframe_per_symbol: dict = None, panel: Panel = None):
+        if (dataframe_per_symbol is None) == (panel is None):
+            raise ValueError("Either dataframe_per_symbol or panel needs to be provided")
 
-        for symbol in dataframe_per_symbol:
-            old_data_for_symbol = self._dataframe_per_symbol[symbol]
-            new_data_for_symbol = dataframe_per_symbol[symbol].loc[self._timestamps[-1]:, ].iloc[1:, :]
-            new_dataframe_per_symbol[symbol] = pd.concat([old_data_for_symbol, new_data_for_symbol])
-
-        self._dataframe_per_symbol = new_dataframe_per_symbol
-        self._process_dataframe_per_symbol()
+        panel = panel if panel is not None else self._build_panel(dataframe_per_symbol)
+        if self._live_capacity is not None:
+            self._append_live_panel(panel)
+        else:
+            self._panel = self._panel.append(panel)
+            self._process_panel()
 
         self._done = self._current_tick >= self._frame_bound[1]
 
@@ -80,9 +115,10 @@ class PortfolioStocksEnv(gym.Env):
     def get_step_outputs(self):
         self._done = self._current_tick == self._frame_bound[1]
         observation = self._get_observation(self._current_tick)
-        reward = self.current_profit()
+        current_portfolio_value = self.current_portfolio_value()
+        reward = current_portfolio_value / self._initial_portfolio_value
 
-        return observation, reward, self._done, self._get_info()
+        return observation, reward, self._done, self._get_info(current_portfolio_value)
 
     def reset(self):
         self._done = False
@@ -90,20 +126,56 @@ class PortfolioStocksEnv(gym.Env):
             return
 
         self._current_tick = self._frame_bound[0]
-        self._portfolio_allocation = {}
-        self._allocations_history = []
-
-        for symbol in self._dataframe_per_symbol:
-            self._portfolio_allocation[symbol] = 0.0
+        if self._random_start_offsets:
+            self._current_tick = int(self._random_generator.integers(self._frame_bound[0],
+                                                                     max(self._frame_bound[0] + 1,
+                                                                         self._frame_bound[1])))
+        self._allocations_history = AllocationHistory(self._panel.symbols)
 
+        self._shares = np.zeros(len(self._panel.symbols))
         for symbol in self._initial_portfolio_allocation:
-            self._portfolio_allocation[symbol] = self._initial_portfolio_allocation[symbol]
+            self._shares[self._symbol_idxs[symbol]] = self._initial_portfolio_allocation[symbol]
+        self._initial_portfolio_value = self._portfolio_value(self._shares, self._current_tick)
 
         return self._get_observation(self._current_tick)
 
+    def seed(self, seed: int = None):
+        self._random_generator = np.random.default_rng(seed)
+        return [seed]
+
     def disable_reset(self):
         self._reset_enabled = False
 
+    def enable_live_mode(self, lookback: int):
+        """
+        From now on only the last `window_size + lookback` bars are kept, in ring buffers, so appending data costs
+        as much as the appended bars and memory stays bounded. `lookback` needs to cover the bars appended
+        between steps. Live environments keep going from the current tick, so reset gets disabled.
+        """
+        if lookback < 1:
+            raise ValueError("Live mode needs a lookback of at least one bar")
+
+        self.disable_reset()
+        self._live_capacity = self._window_size + lookback
+
+        # Every bar is written twice, at its position and one capacity later, so any window is a contiguous slice
+        # of the buffer, even when it wraps around
+        prices = self._prices
+        signal_features = self._panel.feature_values(self._signal_feature_names)
+        self._prices = np.empty((2 * self._live_capacity, prices.shape[1]), dtype=Panel.PRICES_DTYPE)
+        self._signal_features = np.empty((2 * self._live_capacity,) + signal_features.shape[1:], dtype=Panel.DTYPE)
+        self._observation_windows = PortfolioStocksEnv.observation_windows(self._signal_features, self._window_size)
+        self._write_live_bars(prices, signal_features, 0)
+
+        # Only the labels of the panel are kept
+        self._last_timestamp = self._panel.timestamps[-1]
+        self._panel = Panel(np.empty((0,) + self._panel.values.shape[1:]),
+                            self._panel.timestamps[:0],
+                            self._panel.symbols,
+                            self._panel.feature_names)
+        self._timestamps = None
+        self._prices_per_symbol = {}
+
     def render(self, mode='human'):
         # TODO: Stub-method
         pass
@@ -112,19 +184,9 @@ class PortfolioStocksEnv(gym.Env):
         for symbol in self._prices_per_symbol:
             plt.plot(self._prices_per_symbol[symbol], label=symbol)
 
-        allocated = []
-        allocated_prices = []
-
-        deallocated = []
-        deallocated_prices = []
-        for allocation_details in self._allocations_history:
-            deallocated.append(allocation_details['allocation_tick'])
-            deallocated_prices.append(allocation_details['source_symbol_price'])
-            allocated.append(allocation_details['allocation_tick'])
-            allocated_prices.append(allocation_details['target_symbol_price'])
-
-        plt.plot(allocated, allocated_prices, 'go')
-        plt.plot(deallocated, deallocated_prices, 'ro')
+        allocations = self._allocations_history.records()
+        plt.plot(allocations['allocation_tick'], allocations['target_symbol_price'], 'go')
+        plt.plot(allocations['allocation_tick'], allocations['source_symbol_price'], 'ro')
 
         plt.suptitle(
             "Total Profit: %.6f" % self.current_profit()
@@ -136,53 +198,120 @@ class PortfolioStocksEnv(gym.Env):
         pass
 
     def initial_portfolio_value(self):
-        return self._portfolio_value(self._initial_portfolio_allocation, self._frame_bound[0])
+        return self._initial_portfolio_value
 
     def current_portfolio_value(self):
-        return self._portfolio_value(self._portfolio_allocation, self._current_tick)
+        return self._portfolio_value(self._shares, self._current_tick)
 
     def current_profit(self):
-        return self.current_portfolio_value() / self.initial_portfolio_value()
-
-    def _process_dataframe_per_symbol(self):
-        timestamps = self._dataframe_per_symbol[list(self._dataframe_per_symbol.keys())[0]].index.tolist()
+        return self.current_portfolio_value() / self._initial_portfolio_value
+
+    def observations(self) -> np.ndarray:
+        """
+        (ticks, window_size, symbols, features) view of the observations of every tick left to decide on, from the
+        current one to the one before the last, flattening the last two axes gives the observations. They only
+        depend on the market, never on the actions taken.
+        """
+        first_position = self._position(self._current_tick - self._window_size)
+        return self._observation_windows[first_position:first_position + self._frame_bound[1] - self._current_tick]
+
+    def prices(self) -> np.ndarray:
+        """
+        (ticks, symbols) view of the prices of every tick left, from the current one to the last, the ones
+        observations() are scored with.
+        """
+        first_position = self._position(self._current_tick)
+        return self._prices[first_position:first_position + self._frame_bound[1] - self._current_tick + 1]
+
+    def last_timestamp(self) -> pd.Timestamp:
+        # Timestamp of the last bar, appended data is only taken from the bars after it
+        return self._last_timestamp if self._live_capacity is not None else self._panel.timestamps[-1]
+
+    def portfolio_allocation(self) -> dict:
+        return dict(zip(self._panel.symbols, self._shares.tolist()))
+
+    @staticmethod
+    def observation_windows(signal_features: np.ndarray, window_size: int) -> np.ndarray:
+        # (ticks, window_size, symbols, features) strided view of the window ending at every tick of the
+        # (timestamps, symbols, features) signals
+        return sliding_window_view(signal_features, window_size, axis=0).transpose(0, 3, 1, 2)
+
+    def _build_panel(self, dataframe_per_symbol: dict) -> Panel:
+        return Panel.from_dataframes(dataframe_per_symbol,
+                                     feature_names=[self._prices_feature_name] + self._signal_feature_names)
+
+    def _process_panel(self):
+        self._frame_bound = (self._window_size, len(self._panel.timestamps) - 1)
+
+        # Prices are views of the panel, so with a memory mapped panel only the pages of the visited ticks are
+        # ever read
+        self._prices = self._panel.feature(self._prices_feature_name)
+
+        self._timestamps = self._panel.timestamps
+        self._symbol_idxs = {symbol: symbol_idx for symbol_idx, symbol in enumerate(self._panel.symbols)}
+        self._prices_per_symbol = {symbol: self._prices[:, symbol_idx]
+                                   for symbol_idx, symbol in enumerate(self._panel.symbols)}
+
+        # Windows of the signals are strided views of the panel too, as long as the signal features are next to
+        # each other in it (as Brain lays them out), so the signals are never copied as a whole
+        self._observation_windows = PortfolioStocksEnv.observation_windows(
+            self._panel.feature_values(self._signal_feature_names), self._window_size)
+
+    def _append_live_panel(self, panel: Panel):
+        if panel.symbols != self._panel.symbols:
+            raise ValueError("Only panels with the same symbols can be appended")
+
+        # Timestamps are sorted, only the bars after the last one are ever read
+        first_new_idx = panel.timestamps.searchsorted(self._last_timestamp, side='right')
+        if first_new_idx == len(panel.timestamps):
+            return
 
-        first_symbol = list(self._dataframe_per_symbol.keys())[0]
-        self._frame_bound = (self._window_size, len(self._dataframe_per_symbol[first_symbol].index) - 1)
+        first_tick = self._frame_bound[1] + 1
+        last_tick = first_tick + len(panel.timestamps) - first_new_idx - 1
+        if self._current_tick - self._window_size <= last_tick - self._live_capacity:
+            raise ValueError(f"Appending {last_tick - first_tick + 1} bars would drop bars still needed at tick "
+                             f"{self._current_tick}, the live mode lookback needs to be larger")
 
-        start = self._frame_bound[0] - self._window_size
-        end = self._frame_bound[1]
+        self._write_live_bars(panel.feature(self._prices_feature_name)[first_new_idx:],
+                              panel.feature_values(self._signal_feature_names)[first_new_idx:],
+                              first_tick)
+        self._last_timestamp = panel.timestamps[-1]
+        self._frame_bound = (self._window_size, last_tick)
 
-        prices_per_symbol = {}
-        signal_features_per_symbol = {}
+    def _write_live_bars(self, prices: np.ndarray, signal_features: np.ndarray, first_tick: int):
+        # Only the last bars fit, older ones would be overwritten anyway
+        skipped_bars = max(0, len(prices) - self._live_capacity)
+        positions = (first_tick + np.arange(skipped_bars, len(prices))) % self._live_capacity
 
-        for symbol in self._dataframe_per_symbol:
-            symbol_dataframe = self._dataframe_per_symbol[symbol]
-            prices_per_symbol[symbol] = symbol_dataframe[self._prices_feature_name].to_numpy()
-            signal_features_per_symbol[symbol] = symbol_dataframe.loc[:, self._signal_feature_names].to_numpy()[start:end]
+        for buffer, values in [(self._prices, prices), (self._signal_features, signal_features)]:
+            buffer[positions] = values[skipped_bars:]
+            buffer[positions + self._live_capacity] = values[skipped_bars:]
 
-        self._timestamps = timestamps
-        self._prices_per_symbol = prices_per_symbol
-        self._signal_features_per_symbol = signal_features_per_symbol
+    def _position(self, tick: int) -> int:
+        # Row of a tick in the price and signal buffers
+        return tick if self._live_capacity is None else tick % self._live_capacity
 
     def _transfer_allocations(self, source_symbol, target_symbol, allocation_tick):
         # Temporary Variables
-        source_symbol_shares = self._portfolio_allocation[source_symbol]
-        source_symbol_price = self._prices_per_symbol[source_symbol][allocation_tick]
+        source_symbol_idx = self._symbol_idxs[source_symbol]
+        target_symbol_idx = self._symbol_idxs[target_symbol]
+
+        source_symbol_shares = self._shares[source_symbol_idx]
+        source_symbol_price = self._prices[self._position(allocation_tick), source_symbol_idx]
 
-        target_symbol_original_shares = self._portfolio_allocation[target_symbol]
-        target_symbol_price = self._prices_per_symbol[target_symbol][allocation_tick]
+        target_symbol_original_shares = self._shares[target_symbol_idx]
+        target_symbol_price = self._prices[self._position(allocation_tick), target_symbol_idx]
 
         # Deallocation
         deallocated_funds = source_symbol_shares * source_symbol_price
-        self._portfolio_allocation[source_symbol] = 0.0
+        self._shares[source_symbol_idx] = 0.0
 
         # Penalty
         deallocated_funds = deallocated_funds * (1.0 - PortfolioStocksEnv.ALLOCATION_PENALTY)
 
         # Reallocation
         target_symbol_new_shares = deallocated_funds / target_symbol_price
-        self._portfolio_allocation[target_symbol] = target_symbol_original_shares + target_symbol_new_shares
+        self._shares[target_symbol_idx] = target_symbol_original_shares + target_symbol_new_shares
 
         # Notify Observer
         if self.observer is not None:
@@ -196,53 +325,49 @@ class PortfolioStocksEnv(gym.Env):
                                              side=Sides.Sell))
 
         # Statistics
-        allocation_details = {
-            'allocation_tick': allocation_tick,
-
-            'source_symbol': source_symbol,
-            'source_symbol_price': source_symbol_price,
-            'source_symbol_shares': source_symbol_shares,
-
-            'target_symbol': target_symbol,
-            'target_symbol_price': target_symbol_price,
-            'target_symbol_original_shares': target_symbol_original_shares,
-            'target_symbol_new_shares': target_symbol_new_shares,
+        self._allocations_history.append(allocation_tick,
+                                         source_symbol_idx,
+                                         source_symbol_price,
+                                         source_symbol_shares,
+                                         target_symbol_idx,
+                                         target_symbol_price,
+                                         target_symbol_original_shares,
+                                         target_symbol_new_shares)
+
+    def _portfolio_value(self, shares, current_tick):
+        return float(np.dot(shares, self._prices[self._position(current_tick)]))
+
+    def _get_info(self, current_portfolio_value=None):
+        if current_portfolio_value is None:
+            current_portfolio_value = self.current_portfolio_value()
+
+        info = {
+            'current_profit': current_portfolio_value / self._initial_portfolio_value,
+            'current_portfolio_value': current_portfolio_value
         }
-        self._allocations_history.append(allocation_details)
-
-    def _portfolio_value(self, portfolio_allocation, current_tick):
-        portfolio_value = 0.0
 
-        for symbol in portfolio_allocation:
-            symbol_shares = portfolio_allocation[symbol]
-            symbol_price = self._prices_per_symbol[symbol][current_tick]
+        if self._info_mode == InfoModes.Full or self._done:
+            info['portfolio_allocation'] = self.portfolio_allocation()
+            info['allocations_history'] = self._allocations_history
 
-            portfolio_value += symbol_shares * symbol_price
-
-        return portfolio_value
-
-    def _get_info(self):
-        return {
-            'current_profit': self.current_profit(),
-            'current_portfolio_value': self.current_portfolio_value(),
-            'portfolio_allocation': self._portfolio_allocation,
-            'allocations_history': self._allocations_history
-        }
+        return info
 
     def _get_observation(self, current_tick):
-        result = None
-
-        for symbol in self._signal_features_per_symbol:
-            signals_for_symbol = self._signal_features_per_symbol[symbol]
-            signals_for_symbol_for_tick = signals_for_symbol[(current_tick - self._window_size):current_tick]
-            result = signals_for_symbol_for_tick if result is None else np.hstack([result, signals_for_symbol_for_tick])
+        window = self._observation_windows[self._position(current_tick - self._window_size)]
+        if window.flags.c_contiguous:
+            observation = window.reshape(self._window_size, -1)
+            return observation.copy() if self._copy_observations else observation
 
-        return np.array(result)
+        # Windows of signals not next to each other in the panel are already copied by the reshape, they're
+        # read-only all the same unless copies are requested
+        observation = window.reshape(self._window_size, -1)
+        observation.flags.writeable = self._copy_observations
+        return observation
 
     def _get_allocated_symbol(self):
         # FIXME: This function will go away once multiple allocations are allowed
-        for symbol in self._portfolio_allocation:
-            if self._portfolio_allocation[symbol] > 0.0:
-                return symbol
+        allocated_symbol_idxs = np.flatnonzero(self._shares > 0.0)
+        if len(allocated_symbol_idxs) == 0:
+            raise ValueError("There are no allocated symbols")
 
-        raise ValueError("There are no allocated symbols")
+        return self._panel.symbols[allocated_symbol_idxs[0]]
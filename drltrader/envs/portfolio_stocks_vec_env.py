@@ -0,0 +1,149 @@
+import numpy as np
+from gym import spaces
+from stable_baselines3.common.vec_env import VecEnv
+
+from drltrader.data.panel import Panel
+from drltrader.envs.portfolio_stocks_env import PortfolioStocksEnv
+
+
+class PortfolioStocksVecEnv(VecEnv):
+    """
+    `num_envs` independent PortfolioStocksEnv instances over the same panel, stepped together as NumPy operations
+    over (num_envs, symbols) state instead of one Python env at a time. Every instance starts its episodes at its
+    own random tick (unless `random_start_offsets` is unset) and is reset automatically when done, like any other
+    VecEnv.
+
+    Infos only hold scalars, plus the portfolio allocation once an episode is done. The allocations history isn't
+    recorded, PortfolioStocksEnv is still the one to use for evaluation.
+    """
+    def __init__(self,
+                 panel: Panel,
+                 window_size: int,
+                 num_envs: int,
+                 initial_portfolio_allocation: dict,
+                 prices_feature_name: str = 'Close',
+                 signal_feature_names: list = ['RSI_4', 'RSI_16'],
+                 random_start_offsets: bool = True,
+                 seed: int = None):
+        if len(panel.timestamps) <= window_size + 1:
+            raise ValueError(f"A panel of {len(panel.timestamps)} timestamps is too short "
+                             f"for a window of {window_size}")
+
+        # Save Configurations
+        self._panel = panel
+        self._window_size = window_size
+        self._random_start_offsets = random_start_offsets
+        self._random_generator = np.random.default_rng(seed)
+
+        self._frame_bound = (window_size, len(panel.timestamps) - 1)
+        self._prices = panel.feature(prices_feature_name)
+        self._observation_windows = PortfolioStocksEnv.observation_windows(panel.feature_values(signal_feature_names),
+                                                                           window_size)
+        self._observation_shape = (window_size, int(np.prod(self._observation_windows.shape[2:])))
+
+        self._initial_shares = np.zeros(len(panel.symbols))
+        for symbol in initial_portfolio_allocation:
+            self._initial_shares[panel.symbol_idx(symbol)] = initial_portfolio_allocation[symbol]
+
+        # Initialize VecEnv Configurations
+        super(PortfolioStocksVecEnv, self).__init__(num_envs,
+                                                    spaces.Box(low=-np.inf,
+                                                               high=np.inf,
+                                                               shape=self._observation_shape,
+                                                               dtype=np.float32),
+                                                    spaces.Discrete(len(panel.symbols)))
+
+        # Initialize Runtime Variables
+        self._actions = None
+        self._current_ticks = np.zeros(num_envs, dtype=np.int64)
+        self._shares = np.zeros((num_envs, len(panel.symbols)))
+        self._initial_portfolio_values = np.zeros(num_envs)
+
+    def reset(self):
+        self._reset_envs(np.arange(self.num_envs))
+        return self._get_observations(self._current_ticks)
+
+    def step_async(self, actions: np.ndarray):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        self._current_ticks += 1
+        prices = self._prices[self._current_ticks]
+
+        # Process Actions, the whole allocated symbol is transferred to the selected one
+        env_idxs = np.arange(self.num_envs)
+        allocated_symbol_idxs = self._allocated_symbol_idxs()
+        transferring_env_idxs = env_idxs[self._actions != allocated_symbol_idxs]
+        source_symbol_idxs = allocated_symbol_idxs[transferring_env_idxs]
+        target_symbol_idxs = self._actions[transferring_env_idxs]
+
+        deallocated_funds = self._shares[transferring_env_idxs, source_symbol_idxs] * \
+            prices[transferring_env_idxs, source_symbol_idxs]
+        self._shares[transferring_env_idxs, source_symbol_idxs] = 0.0
+        deallocated_funds = deallocated_funds * (1.0 - PortfolioStocksEnv.ALLOCATION_PENALTY)
+        self._shares[transferring_env_idxs, target_symbol_idxs] += \
+            deallocated_funds / prices[transferring_env_idxs, target_symbol_idxs]
+
+        # Calculate Gym Responses
+        portfolio_values = np.einsum('ij,ij->i', self._shares, prices)
+        rewards = portfolio_values / self._initial_portfolio_values
+        dones = self._current_ticks == self._frame_bound[1]
+        observations = self._get_observations(self._current_ticks)
+        infos = [{'current_profit': reward, 'current_portfolio_value': portfolio_value}
+                 for reward, portfolio_value in zip(rewards.tolist(), portfolio_values.tolist())]
+
+        done_env_idxs = np.flatnonzero(dones)
+        for env_idx in done_env_idxs:
+            infos[env_idx]['portfolio_allocation'] = dict(zip(self._panel.symbols, self._shares[env_idx].tolist()))
+            infos[env_idx]['terminal_observation'] = observations[env_idx].copy()
+
+        if len(done_env_idxs) > 0:
+            self._reset_envs(done_env_idxs)
+            observations[done_env_idxs] = self._get_observations(self._current_ticks[done_env_idxs])
+
+        return observations, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def seed(self, seed: int = None):
+        self._random_generator = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def get_attr(self, attr_name: str, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs):
+        return [getattr(self, method_name)(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+    def current_ticks(self) -> np.ndarray:
+        return self._current_ticks.copy()
+
+    def _reset_envs(self, env_idxs: np.ndarray):
+        if self._random_start_offsets:
+            self._current_ticks[env_idxs] = self._random_generator.integers(self._frame_bound[0],
+                                                                            self._frame_bound[1],
+                                                                            size=len(env_idxs))
+        else:
+            self._current_ticks[env_idxs] = self._frame_bound[0]
+
+        self._shares[env_idxs] = self._initial_shares
+        self._initial_portfolio_values[env_idxs] = self._prices[self._current_ticks[env_idxs]] @ self._initial_shares
+
+    def _get_observations(self, ticks: np.ndarray) -> np.ndarray:
+        # Indexing the windows copies them into a new (envs, window_size, symbols, features) array, flattened for free
+        return self._observation_windows[ticks - self._window_size].reshape((len(ticks),) + self._observation_shape)
+
+    def _allocated_symbol_idxs(self) -> np.ndarray:
+        # FIXME: Same as PortfolioStocksEnv, this will go away once multiple allocations are allowed
+        allocated = self._shares > 0.0
+        if not allocated.any(axis=1).all():
+            raise ValueError("There are no allocated symbols")
+
+        return np.argmax(allocated, axis=1)
@@ -1,81 +1,171 @@
-from gym_anytrading.envs import StocksEnv, Positions, Actions
+import gym
+import numpy as np
+import pandas as pd
+from gym import spaces
+from numpy.lib.stride_tricks import sliding_window_view
+import matplotlib.pyplot as plt
 
 
-class SingleStockEnv(StocksEnv):
-    def __init__(self,
-                 df,
-                 window_size,
-                 frame_bound,
-                 prices_feature_name,
-                 signal_feature_names,
-                 reset_enabled: bool = True):
-        self._prices_feature_name = prices_feature_name
-        self._signal_feature_names = signal_feature_names
-        self._reset_enabled = reset_enabled
+class Actions:
+    Sell = 0
+    Buy = 1
 
-        super().__init__(df, window_size, frame_bound)
 
-        self.trade_fee_bid_percent = 0.001  # unit
-        self.trade_fee_ask_percent = 0.001  # unit
+class Positions:
+    Short = 0
+    Long = 1
 
-    def _process_data(self):
-        # FIXME: Probably there's a better way to do this
-        self.df.insert(0, "current_profit", 0.0, allow_duplicates=False)
-        self.df.insert(0, "position_start_time", 0.0, allow_duplicates=False)
 
-        start = self.frame_bound[0] - self.window_size
-        end = self.frame_bound[1]
-        prices = self.df.loc[:, self._prices_feature_name].to_numpy()[start:end]
-        signal_features = self.df.loc[:, ['current_profit', 'position_start_time'] + self._signal_feature_names].to_numpy()[start:end]
-        return prices, signal_features
+class SingleStockEnv(gym.Env):
+    """
+    Long/short trading of a single stock, same rules as gym_anytrading's StocksEnv: the whole capital goes long on
+    Buy and back to cash on Sell, paying the fees on every round trip.
 
-    def _calculate_reward(self, action):
-        step_reward = 0
+    The prices and signal features are read once into arrays owned by the env, so the DataFrame is never modified
+    and any number of envs can share it. Observations are windows of the signal features, ending at the current
+    tick, next to the profit and the ticks since the last trade while long. With `random_start_offsets` every
+    episode starts at a random tick instead of the first one.
+    """
+    TRADE_FEE_BID_PERCENT = 0.001
+    TRADE_FEE_ASK_PERCENT = 0.001
+    PROFIT_FEATURES = 2
 
-        trade = False
-        if ((action == Actions.Buy.value and self._position == Positions.Short) or
-            (action == Actions.Sell.value and self._position == Positions.Long)):
-            trade = True
+    metadata = {'render.modes': ['human']}
 
-        if trade:
-            current_price = self.prices[self._current_tick]
-            last_trade_price = self.prices[self._last_trade_tick]
+    def __init__(self,
+                 df: pd.DataFrame,
+                 window_size: int,
+                 frame_bound: tuple,
+                 prices_feature_name: str,
+                 signal_feature_names: list,
+                 reset_enabled: bool = True,
+                 random_start_offsets: bool = False,
+                 seed: int = None):
+        super(SingleStockEnv, self).__init__()
+
+        start = frame_bound[0] - window_size
+        end = frame_bound[1]
+        if start < 0 or end > len(df.index) or end - start <= window_size:
+            raise ValueError(f"Frame bound {frame_bound} with a window of {window_size} doesn't fit "
+                             f"{len(df.index)} bars")
+
+        # Save Configurations
+        self.window_size = window_size
+        self.frame_bound = frame_bound
+        self._reset_enabled = reset_enabled
+        self._random_start_offsets = random_start_offsets
+        self._random_generator = np.random.default_rng(seed)
+
+        self.prices = df[prices_feature_name].to_numpy(dtype=np.float64)[start:end]
+        self.signal_features = np.zeros((end - start, SingleStockEnv.PROFIT_FEATURES + len(signal_feature_names)),
+                                        dtype=np.float32)
+        self.signal_features[:, SingleStockEnv.PROFIT_FEATURES:] = df[signal_feature_names].to_numpy()[start:end]
+        self._observation_windows = sliding_window_view(self.signal_features,
+                                                        (window_size, self.signal_features.shape[1]))[:, 0]
+
+        # Initialize Gym Configurations
+        self.shape = (window_size, self.signal_features.shape[1])
+        self.action_space = spaces.Discrete(2)
+        self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=self.shape, dtype=np.float32)
+
+        # Initialize Runtime Variables
+        self._start_tick = window_size
+        self._end_tick = len(self.prices) - 1
+        self._done = None
+        self._current_tick = None
+        self._last_trade_tick = None
+        self._position = None
+        self._positions = None
+        self._total_reward = None
+        self._total_profit = None
 
-            original_profit = self._total_profit
-            shares = (self._total_profit * (1 - self.trade_fee_ask_percent)) / last_trade_price
-            new_profit = (shares * (1 - self.trade_fee_bid_percent)) * current_price
+    def reset(self):
+        if not self._reset_enabled:
+            return self._get_observation()
+
+        self._done = False
+        self._current_tick = self._start_tick
+        if self._random_start_offsets:
+            self._current_tick = int(self._random_generator.integers(self._start_tick, self._end_tick))
+        self._last_trade_tick = self._current_tick - 1
+        self._position = Positions.Short
+        self._total_reward = 0.0
+        self._total_profit = 1.0
 
-            if self._position == Positions.Long:
-                step_reward += new_profit - original_profit
+        # Position at every tick, -1 for the ones not visited
+        self._positions = np.full(len(self.prices), -1, dtype=np.int8)
+        self._positions[self._current_tick] = self._position
+        self.signal_features[:, :SingleStockEnv.PROFIT_FEATURES] = 0.0
 
-        return step_reward
+        return self._get_observation()
 
-    def _update_profit(self, action):
-        trade = False
-        if ((action == Actions.Buy.value and self._position == Positions.Short) or
-            (action == Actions.Sell.value and self._position == Positions.Long)):
-            trade = True
+    def step(self, action):
+        self._done = False
+        self._current_tick += 1
 
-        if trade or self._done:
+        if self._current_tick == self._end_tick:
+            self._done = True
 
-            if self._position == Positions.Long:
-                self._total_profit = self._calculate_current_profit()
+        trade = (action == Actions.Buy and self._position == Positions.Short) or \
+                (action == Actions.Sell and self._position == Positions.Long)
 
+        step_reward = 0.0
         if self._position == Positions.Long:
-            self.signal_features[self._current_tick][0] = 1.0 - self._calculate_current_profit()
-            self.signal_features[self._current_tick][1] = self._current_tick - self._last_trade_tick
+            if trade:
+                step_reward = self._current_profit() - self._total_profit
+            if trade or self._done:
+                self._total_profit = self._current_profit()
+
+            self.signal_features[self._current_tick, 0] = 1.0 - self._current_profit()
+            self.signal_features[self._current_tick, 1] = self._current_tick - self._last_trade_tick
+        self._total_reward += step_reward
+
+        if trade:
+            self._position = Positions.Long if self._position == Positions.Short else Positions.Short
+            self._last_trade_tick = self._current_tick
+        self._positions[self._current_tick] = self._position
 
-    def _calculate_current_profit(self):
-        current_price = self.prices[self._current_tick]
-        last_trade_price = self.prices[self._last_trade_tick]
-        shares = (self._total_profit * (1 - self.trade_fee_ask_percent)) / last_trade_price
-        return (shares * (1 - self.trade_fee_bid_percent)) * current_price
+        info = {
+            'total_reward': self._total_reward,
+            'total_profit': self._total_profit,
+            'position': self._position
+        }
+
+        return self._get_observation(), step_reward, self._done, info
+
+    def seed(self, seed: int = None):
+        self._random_generator = np.random.default_rng(seed)
+        return [seed]
 
     def disable_reset(self):
         self._reset_enabled = False
 
-    def reset(self):
-        if self._reset_enabled:
-            return super().reset()
-        else:
-            return self._get_observation()
+    def render(self, mode='human'):
+        # TODO: Stub-method
+        pass
+
+    def render_all(self, mode='human'):
+        plt.plot(self.prices)
+
+        ticks = np.arange(len(self.prices))
+        short_ticks = ticks[self._positions == Positions.Short]
+        long_ticks = ticks[self._positions == Positions.Long]
+        plt.plot(short_ticks, self.prices[short_ticks], 'ro')
+        plt.plot(long_ticks, self.prices[long_ticks], 'go')
+
+        plt.suptitle(
+            "Total Reward: %.6f" % self._total_reward + ' ~ ' +
+            "Total Profit: %.6f" % self._total_profit
+        )
+
+    def close(self):
+        # TODO: Stub-method
+        pass
+
+    def _current_profit(self):
+        # Profit if the position was closed at the current tick
+        shares = (self._total_profit * (1 - SingleStockEnv.TRADE_FEE_ASK_PERCENT)) / self.prices[self._last_trade_tick]
+        return (shares * (1 - SingleStockEnv.TRADE_FEE_BID_PERCENT)) * self.prices[self._current_tick]
+
+    def _get_observation(self):
+        return self._observation_windows[self._current_tick - self.window_size + 1]
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from gym import spaces
+from numpy.lib.stride_tricks import sliding_window_view
+from stable_baselines3.common.vec_env import VecEnv
+
+from drltrader.envs.single_stock_env import Actions
+from drltrader.envs.single_stock_env import Positions
+from drltrader.envs.single_stock_env import SingleStockEnv
+
+
+class SingleStockVecEnv(VecEnv):
+    """
+    `num_envs` independent SingleStockEnv episodes over the same stock, stepped together as NumPy operations over
+    per-episode state vectors. The profit features of every episode are kept in a ring buffer next to the shared
+    signal features, so a step only writes the profit features of its own tick. Every episode starts at its own
+    random tick (unless `random_start_offsets` is unset) and is reset automatically when done, like any other
+    VecEnv.
+    """
+    def __init__(self,
+                 df: pd.DataFrame,
+                 window_size: int,
+                 frame_bound: tuple,
+                 prices_feature_name: str,
+                 signal_feature_names: list,
+                 num_envs: int,
+                 random_start_offsets: bool = True,
+                 seed: int = None):
+        start = frame_bound[0] - window_size
+        end = frame_bound[1]
+        if start < 0 or end > len(df.index) or end - start <= window_size:
+            raise ValueError(f"Frame bound {frame_bound} with a window of {window_size} doesn't fit "
+                             f"{len(df.index)} bars")
+
+        # Save Configurations
+        self._window_size = window_size
+        self._random_start_offsets = random_start_offsets
+        self._random_generator = np.random.default_rng(seed)
+
+        self._prices = df[prices_feature_name].to_numpy(dtype=np.float64)[start:end]
+        signal_features = np.ascontiguousarray(df[signal_feature_names].to_numpy(dtype=np.float32)[start:end])
+        self._signal_windows = sliding_window_view(signal_features, (window_size, signal_features.shape[1]))[:, 0]
+        self._start_tick = window_size
+        self._end_tick = len(self._prices) - 1
+
+        # Initialize VecEnv Configurations
+        super(SingleStockVecEnv, self).__init__(num_envs,
+                                                spaces.Box(low=-np.inf,
+                                                           high=np.inf,
+                                                           shape=(window_size, SingleStockEnv.PROFIT_FEATURES +
+                                                                  len(signal_feature_names)),
+                                                           dtype=np.float32),
+                                                spaces.Discrete(2))
+
+        # Initialize Runtime Variables
+        self._actions = None
+        self._current_ticks = np.zeros(num_envs, dtype=np.int64)
+        self._last_trade_ticks = np.zeros(num_envs, dtype=np.int64)
+        self._positions = np.zeros(num_envs, dtype=np.int64)
+        self._total_rewards = np.zeros(num_envs)
+        self._total_profits = np.zeros(num_envs)
+
+        # Every tick is written twice, at its position and one window later, so the window ending at any tick is a
+        # contiguous slice of the ring, even when it wraps around
+        self._profit_features = np.zeros((num_envs, 2 * window_size, SingleStockEnv.PROFIT_FEATURES),
+                                         dtype=np.float32)
+        self._profit_windows = sliding_window_view(self._profit_features, window_size, axis=1).transpose(0, 1, 3, 2)
+
+    def reset(self):
+        self._reset_envs(np.arange(self.num_envs))
+        return self._get_observations()
+
+    def step_async(self, actions: np.ndarray):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        self._current_ticks += 1
+        dones = self._current_ticks == self._end_tick
+
+        longs = self._positions == Positions.Long
+        trades = ((self._actions == Actions.Buy) & ~longs) | ((self._actions == Actions.Sell) & longs)
+
+        # Same accounting as SingleStockEnv, only long positions make or lose money
+        current_profits = self._current_profits()
+        rewards = np.where(trades & longs, current_profits - self._total_profits, 0.0)
+        self._total_rewards += rewards
+        self._total_profits = np.where((trades | dones) & longs, current_profits, self._total_profits)
+
+        env_idxs = np.arange(self.num_envs)
+        positions = self._current_ticks % self._window_size
+        profit_features = np.stack([np.where(longs, 1.0 - self._current_profits(), 0.0),
+                                    np.where(longs, self._current_ticks - self._last_trade_ticks, 0)], axis=1)
+        self._profit_features[env_idxs, positions] = profit_features
+        self._profit_features[env_idxs, positions + self._window_size] = profit_features
+
+        self._positions = np.where(trades, 1 - self._positions, self._positions)
+        self._last_trade_ticks = np.where(trades, self._current_ticks, self._last_trade_ticks)
+
+        # Calculate Gym Responses
+        observations = self._get_observations()
+        infos = [{'total_reward': total_reward, 'total_profit': total_profit, 'position': position}
+                 for total_reward, total_profit, position in zip(self._total_rewards.tolist(),
+                                                                 self._total_profits.tolist(),
+                                                                 self._positions.tolist())]
+
+        done_env_idxs = np.flatnonzero(dones)
+        for env_idx in done_env_idxs:
+            infos[env_idx]['terminal_observation'] = observations[env_idx].copy()
+
+        if len(done_env_idxs) > 0:
+            self._reset_envs(done_env_idxs)
+            observations[done_env_idxs] = self._get_observations()[done_env_idxs]
+
+        return observations, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def seed(self, seed: int = None):
+        self._random_generator = np.random.default_rng(seed)
+        return [seed] * self.num_envs
+
+    def get_attr(self, attr_name: str, indices=None):
+        return [getattr(self, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name: str, value, indices=None):
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name: str, *method_args, indices=None, **method_kwargs):
+        return [getattr(self, method_name)(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+    def current_ticks(self) -> np.ndarray:
+        return self._current_ticks.copy()
+
+    def _reset_envs(self, env_idxs: np.ndarray):
+        if self._random_start_offsets:
+            self._current_ticks[env_idxs] = self._random_generator.integers(self._start_tick,
+                                                                            self._end_tick,
+                                                                            size=len(env_idxs))
+        else:
+            self._current_ticks[env_idxs] = self._start_tick
+
+        self._last_trade_ticks[env_idxs] = self._current_ticks[env_idxs] - 1
+        self._positions[env_idxs] = Positions.Short
+        self._total_rewards[env_idxs] = 0.0
+        self._total_profits[env_idxs] = 1.0
+        self._profit_features[env_idxs] = 0.0
+
+    def _current_profits(self) -> np.ndarray:
+        shares = (self._total_profits * (1 - SingleStockEnv.TRADE_FEE_ASK_PERCENT)) / \
+            self._prices[self._last_trade_ticks]
+        return (shares * (1 - SingleStockEnv.TRADE_FEE_BID_PERCENT)) * self._prices[self._current_ticks]
+
+    def _get_observations(self) -> np.ndarray:
+        profit_windows = self._profit_windows[np.arange(self.num_envs), (self._current_ticks + 1) % self._window_size]
+        return np.concatenate([profit_windows,
+                               self._signal_windows[self._current_ticks - self._window_size + 1]], axis=2)
@@ -1,5 +1,11 @@
+import os
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import pygad
+import torch
 import logging
 
 from drltrader.brain.brain import BrainConfiguration
@@ -11,6 +17,29 @@ logging.basicConfig(format='%(asctime)s %(message)s',
                     encoding='utf-8',
                     level=logging.DEBUG)
 
+_worker_data_provider = None
+
+
+def _initialize_worker(data_provider: DataProvider, torch_threads: int):
+    # The data provider is pickled once per worker, without its caches, and torch only uses the worker's share of
+    # the cores so the workers don't fight over them
+    global _worker_data_provider
+    _worker_data_provider = data_provider
+    torch.set_num_threads(torch_threads)
+
+
+def _train_and_evaluate(solution_names: list,
+                        brain_configurations: list,
+                        training_scenarios: list,
+                        testing_scenarios: list,
+                        timesteps: int) -> list:
+    return EvolutionaryTrainer._train_and_evaluate(_worker_data_provider,
+                                                   solution_names,
+                                                   brain_configurations,
+                                                   training_scenarios,
+                                                   testing_scenarios,
+                                                   timesteps)
+
 
 # FIXME: parents_per_generation can be set using 50% of the population per generation
 class TrainingConfiguration:
@@ -25,7 +54,8 @@ class TrainingConfiguration:
                  start_timesteps: int = 1000,
                  stop_timesteps: int = 1500,
                  step_timesteps: int = 500,
-                 solutions_statistics_filename: str = None):
+                 solutions_statistics_filename: str = None,
+                 workers: int = 1):
         self.training_scenarios = training_scenarios
         self.testing_scenarios = testing_scenarios
 
@@ -42,6 +72,9 @@ class TrainingConfiguration:
 
         self.solutions_statistics_filename = solutions_statistics_filename
 
+        # With more than one worker, the solutions of every generation are trained and evaluated in parallel
+        self.workers = workers
+
 
 class EvolutionaryTrainer:
     MAX_LAYER_SIZE = 1024
@@ -72,6 +105,8 @@ class EvolutionaryTrainer:
         self.solutions_statistics: pd.DataFrame = None
         self.current_population = None
         self.current_timestep = None
+        self.pool = None
+        self._temporary_store_directory = None
 
     def train(self, training_configuration: TrainingConfiguration) -> BrainConfiguration:
         self.fitness_cache = {}
@@ -80,10 +115,43 @@ class EvolutionaryTrainer:
         self.current_population = self.training_configuration.start_population
         self.current_timesteps = self.training_configuration.start_timesteps
         self._initialize_genetic_algorithm()
+        self._initialize_pool()
+
+        try:
+            self.genetic_algorithm.run()
+        finally:
+            if self.pool is not None:
+                self.pool.shutdown()
+                self.pool = None
+            if self._temporary_store_directory is not None:
+                self._temporary_store_directory.cleanup()
+                self._temporary_store_directory = None
+            self.data_provider.close()
 
-        self.genetic_algorithm.run()
         return EvolutionaryTrainer._get_brain_configuration_from_dna(self, self.genetic_algorithm.best_solutions[0])
 
+    def _initialize_pool(self):
+        workers = self.training_configuration.workers
+        if workers <= 1:
+            return
+
+        # Workers don't get any DataFrame, they read the bars from the on-disk store of the data provider, so only
+        # the bars are retrieved once here first. Without a store, the workers get a temporary one for the training
+        worker_data_provider = self.data_provider
+        if not self.data_provider.has_store():
+            self._temporary_store_directory = tempfile.TemporaryDirectory(prefix='drltrader_store_')
+            worker_data_provider = self.data_provider.with_store_directory(self._temporary_store_directory.name)
+
+        for scenario in self.training_configuration.training_scenarios + self.training_configuration.testing_scenarios:
+            worker_data_provider.warm_store(scenario)
+
+        # Workers are spawned, forking a process that already ran torch can deadlock
+        logging.info(f"Starting {workers} training workers")
+        self.pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context('spawn'),
+                                        initializer=_initialize_worker,
+                                        initargs=(worker_data_provider, max(1, (os.cpu_count() or 1) // workers)))
+
     def _initialize_genetic_algorithm(self):
         genes = len(self.data_provider.indicator_column_names) + EvolutionaryTrainer.FIRST_INDICATOR_GENE_IDX
         self.genetic_algorithm = pygad.GA(num_generations=self.training_configuration.generations,
@@ -135,47 +203,90 @@ class EvolutionaryTrainer:
     @staticmethod
     def _evaluate_fitness(solution, solution_idx):
         trainer: EvolutionaryTrainer = EvolutionaryTrainer.INSTANCE
-        brain_configuration = EvolutionaryTrainer._get_brain_configuration_from_dna(trainer, solution)
         solution_name = f"{trainer.genetic_algorithm.generations_completed}_{solution_idx}"
 
         logging.info(f"Solution {solution_name}")
-        logging.info(f"Brain Configuration: {brain_configuration}")
 
         if solution_name not in trainer.fitness_cache:
-            logging.info("Fitness not in cache, calculating fitness...")
+            # The first solution of a generation evaluates the whole population, the others are then cached
+            logging.info("Fitness not in cache, calculating fitness of the whole generation...")
+            EvolutionaryTrainer._evaluate_population(trainer)
+        else:
+            logging.info("Fitness in cache, returning saved fitness...")
 
-            brain: Brain = Brain(data_provider=trainer.data_provider,
-                                 brain_configuration=brain_configuration)
+        return trainer.fitness_cache[solution_name]
 
-            for training_scenario in trainer.training_configuration.training_scenarios:
-                logging.info(f"Training on scenario {training_scenario} with {trainer.current_timesteps} timesteps")
-                brain.learn(training_scenario=training_scenario,
-                            total_timesteps=trainer.current_timesteps)
-                logging.info(f"Training finished")
+    @staticmethod
+    def _evaluate_population(trainer):
+        solution_names = []
+        brain_configurations = []
+        for solution_idx, solution in enumerate(trainer.genetic_algorithm.population):
+            solution_names.append(f"{trainer.genetic_algorithm.generations_completed}_{solution_idx}")
+            brain_configurations.append(EvolutionaryTrainer._get_brain_configuration_from_dna(trainer, solution))
+
+        if trainer.pool is None:
+            mean_testing_profits = EvolutionaryTrainer._train_and_evaluate(
+                trainer.data_provider,
+                solution_names,
+                brain_configurations,
+                trainer.training_configuration.training_scenarios,
+                trainer.training_configuration.testing_scenarios,
+                trainer.current_timesteps)
+        else:
+            # Every worker gets a contiguous chunk of the population, results are merged back in solution order
+            # no matter which worker finishes first
+            chunks = np.array_split(np.arange(len(solution_names)),
+                                    min(trainer.training_configuration.workers, len(solution_names)))
+            futures = [trainer.pool.submit(_train_and_evaluate,
+                                           [solution_names[solution_idx] for solution_idx in chunk],
+                                           [brain_configurations[solution_idx] for solution_idx in chunk],
+                                           trainer.training_configuration.training_scenarios,
+                                           trainer.training_configuration.testing_scenarios,
+                                           trainer.current_timesteps)
+                       for chunk in chunks]
+            mean_testing_profits = [profit for future in futures for profit in future.result()]
+
+        for solution_name, brain_configuration, mean_testing_profit in zip(solution_names,
+                                                                           brain_configurations,
+                                                                           mean_testing_profits):
+            trainer.solutions_statistics.at[solution_name, 'Profit'] = mean_testing_profit
+            trainer.solutions_statistics.at[solution_name, 'Brain Configuration'] = brain_configuration
+            logging.info(f"Solution {solution_name} Evaluation Profit: {mean_testing_profit}")
+            trainer.fitness_cache[solution_name] = mean_testing_profit
 
-            mean_testing_profit = 0.0
-            for testing_scenario in trainer.training_configuration.testing_scenarios:
-                logging.info(f"Testing on scenario {testing_scenario}")
-                info = brain.evaluate(testing_scenario=testing_scenario)
-                profit = info['total_profit'] if 'total_profit' in info else info['current_profit']
-                logging.info(f"Testing finished with profit {profit}")
-                mean_testing_profit += profit
+        trainer.solutions_statistics.sort_values(by='Profit', inplace=True, ascending=False, kind='stable')
+        if trainer.training_configuration.solutions_statistics_filename is not None:
+            trainer.solutions_statistics.to_csv(trainer.training_configuration.solutions_statistics_filename)
 
-            mean_testing_profit = mean_testing_profit / len(trainer.training_configuration.testing_scenarios)
+    @staticmethod
+    def _train_and_evaluate(data_provider: DataProvider,
+                            solution_names: list,
+                            brain_configurations: list,
+                            training_scenarios: list,
+                            testing_scenarios: list,
+                            timesteps: int) -> list:
+        # Every solution is trained on its own, then the testing scenarios are evaluated for all of them at once
+        brains = []
+        for solution_name, brain_configuration in zip(solution_names, brain_configurations):
+            logging.info(f"Solution {solution_name} Brain Configuration: {brain_configuration}")
+            brain: Brain = Brain(data_provider=data_provider,
+                                 brain_configuration=brain_configuration)
 
-            trainer.solutions_statistics.at[solution_name, 'Profit'] = mean_testing_profit
-            trainer.solutions_statistics.at[solution_name, 'Brain Configuration'] = brain_configuration
-            trainer.solutions_statistics.sort_values(by='Profit', inplace=True, ascending=False)
-            if trainer.training_configuration.solutions_statistics_filename is not None:
-                trainer.solutions_statistics.to_csv(trainer.training_configuration.solutions_statistics_filename)
+            for training_scenario in training_scenarios:
+                logging.info(f"Training on scenario {training_scenario} with {timesteps} timesteps")
+                brain.learn(training_scenario=training_scenario,
+                            total_timesteps=timesteps)
+                logging.info(f"Training finished")
+            brains.append(brain)
 
-            logging.info(f"Evaluation Profit: {mean_testing_profit}")
-            trainer.fitness_cache[solution_name] = mean_testing_profit
+        mean_testing_profits = np.zeros(len(brains))
+        for testing_scenario in testing_scenarios:
+            logging.info(f"Testing {len(brains)} solutions on scenario {testing_scenario}")
+            profits = Brain.evaluate_population(brains, testing_scenario)
+            logging.info(f"Testing finished with profits {profits}")
+            mean_testing_profits += profits
 
-            return mean_testing_profit
-        else:
-            logging.info("Fitness in cache, returning saved fitness...")
-            return trainer.fitness_cache[solution_name]
+        return (mean_testing_profits / len(testing_scenarios)).tolist()
 
     @staticmethod
     def _get_brain_configuration_from_dna(trainer, dna):
@@ -15,7 +15,7 @@ class BrainRunner:
     def run(self):
         # Load Brain
         print("Loading brain")
-        brain: Brain = Brain.load("temp/best_brain")
+        brain: Brain = Brain.load("temp/best_brain", data_provider=DataProvider(streaming_enabled=True))
 
         # Start Observing
         print("Starting observation")
@@ -12,7 +12,9 @@ class TrainingRunner:
         self._initiate_scenarios()
         self._initiate_training_configuration()
 
-        self._data_provider = DataProvider()
+        self._data_provider = DataProvider(store_directory='data/ohlcv',
+                                           lazy_indicators=True,
+                                           feature_cache_directory='data/features')
 
     def run(self):
         # Find best brain configuration
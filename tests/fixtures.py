@@ -0,0 +1,27 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+
+def build_bars(seed: int,
+               start_date: datetime = datetime(year=2022, month=1, day=1),
+               periods: int = 24 * 30,
+               freq: pd.Timedelta = pd.Timedelta(hours=1)) -> pd.DataFrame:
+    # Random walk OHLCV bars, the same for the same seed
+    index = pd.date_range(start_date, periods=periods, freq=freq)
+    return _random_walk(seed, index)
+
+
+def build_session_bars(seed: int, days: int) -> pd.DataFrame:
+    # Regular sessions of 5m bars, from 09:30 to 16:00 New York time
+    index = pd.DatetimeIndex([day + pd.Timedelta(hours=9, minutes=30) + bar * pd.Timedelta(minutes=5)
+                              for day in pd.bdate_range('2022-01-03', periods=days)
+                              for bar in range(78)]).tz_localize('America/New_York')
+    return _random_walk(seed, index)
+
+
+def _random_walk(seed: int, index: pd.DatetimeIndex) -> pd.DataFrame:
+    close = 100 + np.random.default_rng(seed).normal(size=len(index)).cumsum()
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.random.default_rng(seed).uniform(100, 1000, size=len(index))},
+                        index=index)
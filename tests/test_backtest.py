@@ -0,0 +1,65 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from drltrader.data.panel import Panel
+from drltrader.envs.backtest import backtest
+from drltrader.envs.portfolio_stocks_env import PortfolioStocksEnv
+
+
+class BacktestTestCase(unittest.TestCase):
+    def test_backtest_random_actions(self):
+        # Arrange
+        panel = self._build_testing_panel()
+        random_generator = np.random.default_rng(0)
+        actions = random_generator.integers(0, 3, size=(8, 55))
+        actions[0] = 1
+
+        # Act
+        portfolio_values, final_profits, trades = backtest(actions, panel.feature('Close'), start_tick=8)
+
+        # Assert
+        self.assertEqual((8, 56), portfolio_values.shape)
+        for sequence_idx in range(len(actions)):
+            env = PortfolioStocksEnv(window_size=8,
+                                     panel=panel,
+                                     initial_portfolio_allocation={'TSLA': 1.0},
+                                     signal_feature_names=['RSI_4', 'RSI_16'])
+            env_portfolio_values = [env.current_portfolio_value()]
+            for action in actions[sequence_idx]:
+                obs, reward, done, info = env.step(action)
+                env_portfolio_values.append(info['current_portfolio_value'])
+
+            self.assertTrue(done)
+            np.testing.assert_allclose(env_portfolio_values, portfolio_values[sequence_idx], rtol=1e-12)
+            self.assertAlmostEqual(info['current_profit'], final_profits[sequence_idx], places=12)
+
+            env_trades = info['allocations_history'].records()
+            self.assertEqual(len(env_trades), len(trades[sequence_idx]))
+            for field_name in env_trades.dtype.names:
+                np.testing.assert_allclose(env_trades[field_name], trades[sequence_idx][field_name], rtol=1e-12)
+
+    def test_backtest_single_sequence(self):
+        # Arrange
+        prices = np.array([[1.0, 2.0], [2.0, 2.0], [2.0, 4.0], [1.0, 8.0]])
+
+        # Act
+        portfolio_values, final_profit, trades = backtest(np.array([0, 1, 1]), prices, start_tick=0)
+
+        # Assert
+        np.testing.assert_allclose([1.0, 2.0, 1.996, 3.992], portfolio_values)
+        self.assertAlmostEqual(3.992, final_profit)
+        self.assertEqual([2], trades['allocation_tick'].tolist())
+        np.testing.assert_allclose([0.499], trades['target_symbol_new_shares'])
+        with self.assertRaises(ValueError):
+            backtest(np.array([0, 1, 1, 1]), prices, start_tick=0)
+
+    def _build_testing_panel(self) -> Panel:
+        values = np.random.default_rng(0).uniform(1.0, 2.0, size=(64, 3, 3))
+        timestamps = pd.date_range('2022-01-03 09:30', periods=64, freq=pd.Timedelta(minutes=5))
+
+        return Panel(values, timestamps, ['TSLA', 'MSFT', 'AAPL'], ['Close', 'RSI_4', 'RSI_16'])
+
+
+if __name__ == '__main__':
+    unittest.main()
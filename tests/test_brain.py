@@ -1,11 +1,20 @@
 import unittest
+import os
+import tempfile
 from datetime import datetime
 from datetime import timedelta
+import numpy as np
 
 from drltrader.brain.brain import Brain
+from drltrader.brain.brain import BrainConfiguration
+from drltrader.brain.brain import EnvironmentBackends
+from drltrader.data.data_provider import DataProvider
+from drltrader.data.feature_store import MappedPanel
 from drltrader.data.scenario import Scenario
+from drltrader.data.sources.file_data_source import FileDataSource
 from drltrader.observers import Order
 from drltrader.observers.simple_observer import CallbackObserver
+from fixtures import build_session_bars
 
 
 class BrainTestCase(unittest.TestCase):
@@ -64,6 +73,121 @@ class BrainTestCase(unittest.TestCase):
         # Assert
         self.assertIsNotNone(results)
 
+    def test_learn_evaluate_multi_stock_subprocess_environments(self):
+        # Arrange
+        brain_configuration = BrainConfiguration(environments=2, environments_backend=EnvironmentBackends.Subprocess)
+        brain: Brain = Brain(data_provider=DataProvider(feature_store_directory=tempfile.mkdtemp()),
+                             brain_configuration=brain_configuration)
+
+        # Act
+        brain.learn(training_scenario=self.training_scenario_multi_stock)
+        results = brain.evaluate(testing_scenario=self.testing_scenario_multi_stock)
+
+        # Assert
+        self.assertIsNotNone(results)
+
+    def test_subprocess_environments_share_panel_without_feature_store(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(directory, '5m'))
+        for seed, symbol in enumerate(['TSLA', 'AAPL', 'MSFT']):
+            build_session_bars(seed, days=5).to_parquet(os.path.join(directory, '5m', f"{symbol}.parquet"))
+        scenario = Scenario(symbols=['TSLA', 'AAPL', 'MSFT'],
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=8))
+        brain: Brain = Brain(data_provider=DataProvider(data_source=FileDataSource(directory)),
+                             brain_configuration=BrainConfiguration(
+                                 signal_feature_names=['RSI_4', 'Volume'],
+                                 environments_backend=EnvironmentBackends.Subprocess))
+
+        # Act
+        vec_env = brain._build_vec_environment(scenario, environments=2)
+        panels = vec_env.get_attr('_panel')
+        vec_env.close()
+
+        # Assert
+        for panel in panels:
+            self.assertIsInstance(panel, MappedPanel)
+
+    def test_evaluate_multi_stock_in_batch(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(directory, '5m'))
+        for seed, symbol in enumerate(['TSLA', 'AAPL', 'MSFT']):
+            build_session_bars(seed, days=5).to_parquet(os.path.join(directory, '5m', f"{symbol}.parquet"))
+        scenario = Scenario(symbols=['TSLA', 'AAPL', 'MSFT'],
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=8))
+        brain: Brain = Brain(data_provider=DataProvider(data_source=FileDataSource(directory)),
+                             brain_configuration=BrainConfiguration(signal_feature_names=['RSI_4', 'Volume']))
+        brain.learn(training_scenario=scenario, total_timesteps=100)
+
+        # Act
+        results = brain.evaluate(testing_scenario=scenario, render=False, deterministic=True)
+        _, _, step_by_step_results = brain._analyze_scenario(scenario, render=False, deterministic=True)
+
+        # Assert
+        self.assertEqual(step_by_step_results['current_profit'], results['current_profit'])
+        np.testing.assert_array_equal(step_by_step_results['allocations_history'].records(),
+                                      results['allocations_history'].records())
+
+    def test_evaluate_population(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(directory, '5m'))
+        for seed, symbol in enumerate(['TSLA', 'AAPL', 'MSFT']):
+            build_session_bars(seed, days=5).to_parquet(os.path.join(directory, '5m', f"{symbol}.parquet"))
+        scenario = Scenario(symbols=['TSLA', 'AAPL', 'MSFT'],
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=8))
+        data_provider = DataProvider(data_source=FileDataSource(directory))
+        brains = [Brain(data_provider=data_provider,
+                        brain_configuration=BrainConfiguration(window_size=window_size,
+                                                               signal_feature_names=['RSI_4', 'Volume'],
+                                                               use_normalized_observations=normalized))
+                  for window_size, normalized in [(3, True), (5, True), (3, False), (3, True)]]
+        for brain in brains:
+            brain.learn(training_scenario=scenario, total_timesteps=100)
+
+        # Act
+        profits = Brain.evaluate_population(brains, scenario, deterministic=True)
+
+        # Assert
+        for brain, profit in zip(brains, profits):
+            _, _, step_by_step_info = brain._analyze_scenario(scenario, render=False, deterministic=True)
+            self.assertAlmostEqual(step_by_step_info['current_profit'], profit, places=10)
+
+    def test_cycle_panels_match_full_history(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(directory, '5m'))
+        for seed, symbol in enumerate(['TSLA', 'AAPL', 'MSFT']):
+            build_session_bars(seed, days=10).to_parquet(os.path.join(directory, '5m', f"{symbol}.parquet"))
+        first_scenario = Scenario(symbols=['TSLA', 'AAPL', 'MSFT'],
+                                  start_date=datetime(year=2022, month=1, day=3),
+                                  end_date=datetime(year=2022, month=1, day=12))
+        second_scenario = first_scenario.copy_with_end_date(datetime(year=2022, month=1, day=15))
+        brain_configuration = BrainConfiguration(signal_feature_names=['OBV', 'VWAP', 'RSI_4', 'MACD_4_8_3'])
+        feature_names = [brain_configuration.prices_feature_name] + brain_configuration.signal_feature_names
+        full_history_panel = DataProvider(data_source=FileDataSource(directory)) \
+            .retrieve_panel(second_scenario, feature_names=feature_names)
+
+        for streaming_enabled in [False, True]:
+            brain: Brain = Brain(data_provider=DataProvider(data_source=FileDataSource(directory),
+                                                            streaming_enabled=streaming_enabled),
+                                 brain_configuration=brain_configuration)
+
+            # Act
+            brain._retrieve_cycle_panel(first_scenario)
+            cycle_panel = brain._retrieve_cycle_panel(second_scenario)
+
+            # Assert
+            self.assertEqual(full_history_panel.timestamps[-1], cycle_panel.timestamps[-1])
+            np.testing.assert_allclose(
+                full_history_panel.values[full_history_panel.timestamps.get_indexer(cycle_panel.timestamps)],
+                cycle_panel.values,
+                rtol=1e-5)
+
     def test_learn_observe_multi_stock(self):
         # Arrange
         brain: Brain = Brain()
@@ -46,6 +46,40 @@ class DataProviderTestCase(unittest.TestCase):
         self.assertIsNotNone(no_end_date_dataframe)
         self.assertIsNotNone(now_dataframe)
 
+    def test_retrieve_data_without_end_date_hits_cache(self):
+        # Arrange
+        data_provider: DataProvider = DataProvider()
+
+        no_end_date_scenario = Scenario(symbol='TSLA',
+                                        interval='1d',
+                                        start_date=datetime.now() - timedelta(days=30))
+
+        # Act
+        first_dataframe = data_provider.retrieve_data(no_end_date_scenario)
+        second_dataframe = data_provider.retrieve_data(no_end_date_scenario)
+
+        # Assert
+        self.assertIs(first_dataframe, second_dataframe)
+
+    def test_retrieve_data_with_lazy_indicators(self):
+        # Arrange
+        testing_scenario = Scenario(symbol='TSLA',
+                                    start_date=datetime.now() - timedelta(days=30),
+                                    end_date=datetime.now())
+        lazy_data_provider: DataProvider = DataProvider(lazy_indicators=True)
+        eager_data_provider: DataProvider = DataProvider()
+
+        # Act
+        lazy_dataframe = lazy_data_provider.retrieve_data(testing_scenario, feature_names=['RSI_4', 'MACD_4_8_3'])
+        other_lazy_dataframe = lazy_data_provider.retrieve_data(testing_scenario, feature_names=['SMA_4'])
+        eager_dataframe = eager_data_provider.retrieve_data(testing_scenario)
+
+        # Assert
+        self.assertIn('RSI_4', lazy_dataframe.columns)
+        self.assertNotIn('SMA_4', lazy_dataframe.columns)
+        self.assertIn('SMA_4', other_lazy_dataframe.columns)
+        pd.testing.assert_frame_equal(eager_dataframe[lazy_dataframe.columns], lazy_dataframe)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import unittest
+import tempfile
+import os
+import pickle
+import threading
+from datetime import datetime
+import pandas as pd
+
+from drltrader.data.data_provider import DataProvider
+from drltrader.data.scenario import Scenario
+from drltrader.data.sources import DataSource
+from drltrader.data.sources.file_data_source import FileDataSource
+from fixtures import build_bars
+
+
+class DataSourcesTestCase(unittest.TestCase):
+    def test_retrieve_datas_from_files(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(directory, '1h'))
+        build_bars(seed=1).to_parquet(os.path.join(directory, '1h', 'TSLA.parquet'))
+        build_bars(seed=2).to_csv(os.path.join(directory, 'AAPL.csv'))
+        data_provider: DataProvider = DataProvider(data_source=FileDataSource(directory))
+        scenario = Scenario(symbols=['TSLA', 'AAPL'],
+                            interval='1h',
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=10))
+
+        # Act
+        dataframe_per_symbol = data_provider.retrieve_datas(scenario)
+
+        # Assert
+        for symbol in ['TSLA', 'AAPL']:
+            self.assertEqual(7 * 24 - 1, len(dataframe_per_symbol[symbol].index))
+            self.assertEqual(pd.Timestamp(scenario.start_date), dataframe_per_symbol[symbol].index[0])
+            for indicator_column_name in data_provider.indicator_column_names:
+                self.assertIn(indicator_column_name, dataframe_per_symbol[symbol].columns)
+
+    def test_retrieve_datas_fetches_symbols_concurrently(self):
+        # Arrange
+        data_source = CountingDataSource(max_concurrency=4)
+        data_provider: DataProvider = DataProvider(data_source=data_source)
+        scenario = Scenario(symbols=['TSLA', 'AAPL', 'MSFT', 'AMZN'],
+                            interval='1h',
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=10))
+
+        # Act
+        dataframe_per_symbol = data_provider.retrieve_datas(scenario)
+
+        # Assert
+        self.assertEqual(4, len(dataframe_per_symbol))
+        self.assertEqual(4, data_source.max_fetches_in_flight)
+
+    def test_pickle_data_provider_without_caches(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        build_bars(seed=1).to_parquet(os.path.join(directory, 'TSLA.parquet'))
+        data_provider: DataProvider = DataProvider(data_source=FileDataSource(directory))
+        scenario = Scenario(symbol='TSLA',
+                            interval='1h',
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=10))
+        df = data_provider.retrieve_data(scenario)
+
+        # Act
+        unpickled_data_provider: DataProvider = pickle.loads(pickle.dumps(data_provider))
+
+        # Assert
+        self.assertEqual(0, len(unpickled_data_provider._cache))
+        self.assertEqual(0, len(unpickled_data_provider._data_source._dfs))
+        pd.testing.assert_frame_equal(df, unpickled_data_provider.retrieve_data(scenario))
+        self.assertEqual(1, len(unpickled_data_provider._cache))
+
+    def test_warm_store_only_fetches_bars(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        for seed, symbol in enumerate(['TSLA', 'AAPL']):
+            build_bars(seed).to_parquet(os.path.join(directory, f"{symbol}.parquet"))
+        store_directory = os.path.join(directory, 'store')
+        data_provider: DataProvider = DataProvider(data_source=FileDataSource(directory),
+                                                   store_directory=store_directory,
+                                                   lazy_indicators=True)
+        scenario = Scenario(symbols=['TSLA', 'AAPL'],
+                            interval='1h',
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=10))
+
+        # Act
+        data_provider.warm_store(scenario)
+
+        # Assert
+        self.assertEqual(0, len(data_provider._cache))
+        self.assertEqual(['AAPL.json', 'AAPL.parquet', 'TSLA.json', 'TSLA.parquet'],
+                         sorted(os.listdir(os.path.join(store_directory, '1h'))))
+
+    def test_data_provider_with_store_directory(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        build_bars(seed=1).to_parquet(os.path.join(directory, 'TSLA.parquet'))
+        data_provider: DataProvider = DataProvider(data_source=FileDataSource(directory))
+        scenario = Scenario(symbol='TSLA',
+                            interval='1h',
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=10))
+        df = data_provider.retrieve_data(scenario)
+        store_directory = os.path.join(directory, 'store')
+
+        # Act
+        stored_data_provider: DataProvider = data_provider.with_store_directory(store_directory)
+        stored_df = stored_data_provider.retrieve_data(scenario)
+
+        # Assert
+        self.assertFalse(data_provider.has_store())
+        self.assertTrue(stored_data_provider.has_store())
+        self.assertTrue(os.path.exists(os.path.join(store_directory, '1h', 'TSLA.parquet')))
+        pd.testing.assert_frame_equal(df, stored_df)
+
+
+class CountingDataSource(DataSource):
+    # Every fetch waits for `max_concurrency` fetches to be in flight, so fetching one at a time times out
+    BARRIER_TIMEOUT_SECONDS = 10.0
+
+    def __init__(self, max_concurrency: int):
+        super().__init__(max_concurrency=max_concurrency)
+        self.max_fetches_in_flight = 0
+        self._fetches_in_flight = 0
+        self._lock = threading.Lock()
+        self._barrier = threading.Barrier(max_concurrency, timeout=CountingDataSource.BARRIER_TIMEOUT_SECONDS)
+
+    def _fetch(self, scenario: Scenario) -> pd.DataFrame:
+        with self._lock:
+            self._fetches_in_flight += 1
+            self.max_fetches_in_flight = max(self.max_fetches_in_flight, self._fetches_in_flight)
+
+        self._barrier.wait()
+
+        with self._lock:
+            self._fetches_in_flight -= 1
+
+        return build_bars(seed=0).loc[scenario.start_date:scenario.end_date - pd.Timedelta(hours=1)]
+
+
+if __name__ == '__main__':
+    unittest.main()
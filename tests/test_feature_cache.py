@@ -0,0 +1,116 @@
+import unittest
+import tempfile
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from drltrader.data import indicator_bank
+from drltrader.data.data_provider import DataProvider
+from drltrader.data.feature_cache import FeatureCache
+from drltrader.data.indicator_registry import IndicatorRegistry
+from drltrader.data.indicator_registry import build_default_indicator_registry
+from drltrader.data.scenario import Scenario
+from drltrader.data.sources.file_data_source import FileDataSource
+from fixtures import build_bars
+
+
+class FeatureCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self._calculated_indicators = []
+
+    def test_retrieve_calculates_only_missing_indicators(self):
+        # Arrange
+        feature_cache = FeatureCache(tempfile.mkdtemp(), build_default_indicator_registry())
+        scenario = FeatureCacheTestCase._scenario()
+        df = build_bars(seed=1)
+        first_indicators = [('SMA', 'SMA_4', {'period': 4}), ('RSI', 'RSI_4', {'period': 4})]
+        second_indicators = [('SMA', 'SMA_4', {'period': 4}), ('SMA', 'SMA_6', {'period': 6})]
+
+        # Act
+        feature_cache.retrieve(scenario, df, first_indicators, self._calculate)
+        values_per_column_name = feature_cache.retrieve(scenario, df, second_indicators, self._calculate)
+        other_data_values_per_column_name = feature_cache.retrieve(scenario, build_bars(seed=2),
+                                                                   first_indicators, self._calculate)
+
+        # Assert
+        self.assertEqual([first_indicators, [second_indicators[1]], first_indicators], self._calculated_indicators)
+        np.testing.assert_array_equal(df['Close'].rolling(4).mean(), values_per_column_name['SMA_4'])
+        self.assertEqual(2, len(other_data_values_per_column_name))
+
+    def test_changed_indicator_definition_invalidates_cache(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        indicator_registry = IndicatorRegistry()
+        indicator_registry.register_indicator('SMA', indicator_bank.sma, parameters={'period': [4]})
+        changed_indicator_registry = IndicatorRegistry()
+        changed_indicator_registry.register_intermediate('LAG', indicator_bank.lagged)
+        changed_indicator_registry.register_indicator('SMA', indicator_bank.mom, dependencies=['LAG'],
+                                                      parameters={'period': [4]})
+        scenario = FeatureCacheTestCase._scenario()
+        df = build_bars(seed=1)
+        indicators = [('SMA', 'SMA_4', {'period': 4})]
+
+        # Act
+        FeatureCache(directory, indicator_registry).retrieve(scenario, df, indicators, self._calculate)
+        FeatureCache(directory, changed_indicator_registry).retrieve(scenario, df, indicators, self._calculate)
+
+        # Assert
+        self.assertEqual(2, len(self._calculated_indicators))
+
+    def test_retrieve_data_with_feature_cache(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        build_bars(seed=1).to_parquet(os.path.join(directory, 'TSLA.parquet'))
+        scenario = FeatureCacheTestCase._scenario()
+        feature_cache_directory = os.path.join(directory, 'features')
+
+        # Act
+        uncached_df = DataProvider(data_source=FileDataSource(directory)).retrieve_data(scenario)
+        first_df = DataProvider(data_source=FileDataSource(directory),
+                                feature_cache_directory=feature_cache_directory).retrieve_data(scenario)
+        second_df = DataProvider(data_source=FileDataSource(directory),
+                                 feature_cache_directory=feature_cache_directory).retrieve_data(scenario)
+        lazy_df = DataProvider(data_source=FileDataSource(directory),
+                               feature_cache_directory=feature_cache_directory,
+                               lazy_indicators=True).retrieve_data(scenario, feature_names=['RSI_4'])
+
+        # Assert
+        self.assertGreater(len(os.listdir(feature_cache_directory)), 0)
+        pd.testing.assert_frame_equal(uncached_df, first_df)
+        pd.testing.assert_frame_equal(uncached_df, second_df)
+        pd.testing.assert_frame_equal(uncached_df[lazy_df.columns], lazy_df)
+
+    def test_retrieve_data_with_lazy_indicators_reuses_materialized_frame(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        build_bars(seed=1).to_parquet(os.path.join(directory, 'TSLA.parquet'))
+        scenario = FeatureCacheTestCase._scenario()
+        uncached_df = DataProvider(data_source=FileDataSource(directory)).retrieve_data(scenario)
+        data_provider = DataProvider(data_source=FileDataSource(directory), lazy_indicators=True)
+
+        # Act
+        first_df = data_provider.retrieve_data(scenario, feature_names=['RSI_4'])
+        second_df = data_provider.retrieve_data(scenario, feature_names=['RSI_4'])
+        third_df = data_provider.retrieve_data(scenario, feature_names=['RSI_16'])
+
+        # Assert
+        self.assertIs(first_df, second_df)
+        self.assertIn('RSI_4', third_df.columns)
+        pd.testing.assert_frame_equal(uncached_df[third_df.columns], third_df)
+
+    def _calculate(self, indicators: list):
+        self._calculated_indicators.append(indicators)
+        return np.stack([build_bars(seed=1)['Close'].rolling(4).mean().to_numpy()] * len(indicators),
+                        axis=1)
+
+    @staticmethod
+    def _scenario():
+        return Scenario(symbol='TSLA',
+                        interval='1h',
+                        start_date=datetime(year=2022, month=1, day=3),
+                        end_date=datetime(year=2022, month=1, day=10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import tempfile
+import os
+import pickle
+from datetime import datetime
+import numpy as np
+
+from drltrader.data.data_provider import DataProvider
+from drltrader.data.feature_store import FeatureStore, MappedPanel
+from drltrader.data.panel import Panel
+from drltrader.data.scenario import Scenario
+from drltrader.data.sources.file_data_source import FileDataSource
+from drltrader.envs.portfolio_stocks_env import PortfolioStocksEnv
+from fixtures import build_bars
+
+
+class FeatureStoreTestCase(unittest.TestCase):
+    def test_write_and_read(self):
+        # Arrange
+        feature_store = FeatureStore(tempfile.mkdtemp())
+        panel = Panel.from_dataframes({'TSLA': build_bars(seed=1),
+                                       'AAPL': build_bars(seed=2)})
+
+        # Act
+        feature_store.write('panel', panel)
+        mapped_panel = feature_store.read('panel')
+
+        # Assert
+        self.assertIsInstance(mapped_panel.values.base, np.memmap)
+        self.assertFalse(mapped_panel.values.flags['WRITEABLE'])
+        self.assertTrue(panel.timestamps.equals(mapped_panel.timestamps))
+        self.assertEqual(panel.symbols, mapped_panel.symbols)
+        np.testing.assert_array_equal(panel.values, mapped_panel.values)
+        np.testing.assert_array_equal(panel.prices, mapped_panel.prices)
+        self.assertLess(len(pickle.dumps(mapped_panel)), 1024)
+        np.testing.assert_array_equal(panel.values, pickle.loads(pickle.dumps(mapped_panel)).values)
+
+    def test_retrieve_panel_from_feature_store(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        for seed, symbol in enumerate(['TSLA', 'AAPL']):
+            build_bars(seed).to_parquet(os.path.join(directory, f"{symbol}.parquet"))
+        scenario = Scenario(symbols=['TSLA', 'AAPL'],
+                            interval='1h',
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=10))
+        feature_store_directory = os.path.join(directory, 'features')
+        data_provider: DataProvider = DataProvider(data_source=FileDataSource(directory),
+                                                   feature_store_directory=feature_store_directory)
+
+        # Act
+        panel = data_provider.retrieve_panel(scenario, feature_names=['Close', 'RSI_4', 'SMA_4'])
+        other_panel = DataProvider(data_source=FileDataSource(directory),
+                                   feature_store_directory=feature_store_directory) \
+            .retrieve_panel(scenario, feature_names=['Close', 'RSI_4', 'SMA_4'])
+        stored_panels = len(os.listdir(feature_store_directory))
+        build_bars(seed=2).to_parquet(os.path.join(directory, 'TSLA.parquet'))
+        os.utime(os.path.join(directory, 'TSLA.parquet'), ns=(0, 0))
+        changed_panel = DataProvider(data_source=FileDataSource(directory),
+                                     feature_store_directory=feature_store_directory) \
+            .retrieve_panel(scenario, feature_names=['Close', 'RSI_4', 'SMA_4'])
+        environment = PortfolioStocksEnv(window_size=8,
+                                         panel=other_panel,
+                                         initial_portfolio_allocation={'TSLA': 1.0},
+                                         signal_feature_names=['RSI_4', 'SMA_4'])
+
+        # Assert
+        self.assertIsInstance(panel, MappedPanel)
+        np.testing.assert_array_equal(panel.values, other_panel.values)
+        self.assertEqual(1, stored_panels)
+        self.assertEqual(2, len(os.listdir(feature_store_directory)))
+        self.assertFalse(np.array_equal(panel.feature('Close'), changed_panel.feature('Close')))
+        self.assertEqual((8, 4), environment.step(1)[0].shape)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import numpy as np
+import pandas as pd
+from finta import TA
+
+from drltrader.data import indicator_bank
+from drltrader.data.data_provider import DataProvider
+
+
+class IndicatorBankTestCase(unittest.TestCase):
+    def test_calculate_indicators_matches_finta(self):
+        # Arrange
+        data_provider: DataProvider = DataProvider()
+        df = self._build_testing_dataframe()
+        finta_df = df.copy()
+        finta_functions = {
+            'SMA': TA.SMA,
+            'VWAP': TA.VWAP,
+            'MACD': lambda ohlcv, **kwargs: TA.MACD(ohlcv, **kwargs)['SIGNAL'],
+            'PPO': lambda ohlcv, **kwargs: TA.PPO(ohlcv, **kwargs)['HISTO'],
+            'VW_MACD': lambda ohlcv, **kwargs: TA.VW_MACD(ohlcv, **kwargs)['SIGNAL'],
+            'RSI': TA.RSI,
+            'OBV': TA.OBV,
+            'MOM': TA.MOM,
+            'ROC': TA.ROC,
+            'VBM': TA.VBM
+        }
+        for indicator_name, indicator_column_name, parameters in data_provider._parse_indicators():
+            finta_df[indicator_column_name] = finta_functions[indicator_name](finta_df, **parameters)
+        finta_df.fillna(0.0, inplace=True)
+
+        # Act
+        data_provider._calculate_indicators(df)
+
+        # Assert
+        self.assertListEqual(list(finta_df.columns), list(df.columns))
+        np.testing.assert_allclose(finta_df.to_numpy(), df.to_numpy(), rtol=1e-8, atol=1e-8)
+
+    def test_ewm_mean_long_series(self):
+        # Arrange
+        values = np.random.default_rng(0).normal(0.0, 1.0, 5000)
+        values[:3] = np.nan
+        values[1000] = np.nan
+        alphas = np.array([0.5, 0.1, 0.01])
+
+        # Act
+        result = indicator_bank.ewm_mean(values, alphas)
+
+        # Assert
+        for alpha_idx, alpha in enumerate(alphas):
+            expected = pd.Series(values).ewm(alpha=alpha, adjust=True, ignore_na=False).mean().to_numpy()
+            np.testing.assert_allclose(expected, result[:, alpha_idx], rtol=1e-9, atol=1e-12)
+
+    def _build_testing_dataframe(self):
+        random_generator = np.random.default_rng(0)
+        close = 100 * np.exp(np.cumsum(random_generator.normal(0.0, 0.01, 2000)))
+        close[10:14] = close[9]
+        volume = random_generator.integers(1000, 100000, 2000).astype(float)
+        volume[:3] = 0.0
+
+        return pd.DataFrame({
+            'Open': close * (1 + random_generator.normal(0.0, 0.003, 2000)),
+            'High': close * (1 + random_generator.uniform(0.0, 0.01, 2000)),
+            'Low': close * (1 - random_generator.uniform(0.0, 0.01, 2000)),
+            'Close': close,
+            'Volume': volume
+        }, index=pd.date_range('2022-03-01', periods=2000, freq='5min'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from drltrader.data.data_provider import DataProvider
+from drltrader.data.indicator_registry import IndicatorContext
+from drltrader.data.indicator_registry import build_default_indicator_registry
+
+
+class IndicatorRegistryTestCase(unittest.TestCase):
+    def test_shared_intermediates_are_computed_once(self):
+        # Arrange
+        registry = build_default_indicator_registry()
+        computed_spans = []
+        ema_function = registry.node('EMA').function
+
+        def counting_ema(context, parameters_list):
+            computed_spans.extend((parameters['column'], parameters['span']) for parameters in parameters_list)
+            return ema_function(context, parameters_list)
+
+        registry.node('EMA').function = counting_ema
+        data_provider: DataProvider = DataProvider(indicator_registry=registry)
+        computed_spans.clear()
+
+        # Act
+        data_provider._calculate_indicators(self._build_testing_dataframe())
+
+        # Assert
+        self.assertEqual(len(set(computed_spans)), len(computed_spans))
+        self.assertIn(('Close', 12), computed_spans)
+
+    def test_register_indicator(self):
+        # Arrange
+        registry = build_default_indicator_registry()
+        registry.register_indicator('NATR',
+                                    lambda context, parameters_list: context.compute('ATR', parameters_list) /
+                                    context.series('Close')[:, np.newaxis],
+                                    dependencies=['ATR'],
+                                    parameters={"period": [7, 14]})
+
+        # Act
+        data_provider: DataProvider = DataProvider(indicator_registry=registry)
+        df = self._build_testing_dataframe()
+        data_provider._calculate_indicators(df)
+
+        # Assert
+        self.assertIn('NATR_7', data_provider.indicator_column_names)
+        self.assertIn('NATR_14', df.columns)
+
+    def test_undeclared_dependency_fails(self):
+        # Arrange
+        registry = build_default_indicator_registry()
+        registry.register_indicator('BROKEN',
+                                    lambda context, parameters_list: context.compute('ATR', parameters_list),
+                                    parameters={"period": [7]})
+        context = IndicatorContext(registry, self._build_testing_dataframe())
+
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            context.compute('BROKEN', [{'period': 7}])
+
+    def _build_testing_dataframe(self):
+        random_generator = np.random.default_rng(0)
+        close = 100 * np.exp(np.cumsum(random_generator.normal(0.0, 0.01, 500)))
+
+        return pd.DataFrame({
+            'Open': close,
+            'High': close * (1 + random_generator.uniform(0.0, 0.01, 500)),
+            'Low': close * (1 - random_generator.uniform(0.0, 0.01, 500)),
+            'Close': close,
+            'Volume': random_generator.integers(1000, 100000, 500).astype(float)
+        }, index=pd.date_range('2022-03-01', periods=500, freq='5min'))
+
+
+if __name__ == '__main__':
+    unittest.main()
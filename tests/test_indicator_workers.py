@@ -0,0 +1,39 @@
+import unittest
+import tempfile
+import os
+from datetime import datetime
+import pandas as pd
+
+from drltrader.data.data_provider import DataProvider
+from drltrader.data.scenario import Scenario
+from drltrader.data.sources.file_data_source import FileDataSource
+from fixtures import build_bars
+
+
+class IndicatorWorkersTestCase(unittest.TestCase):
+    def test_retrieve_datas_with_indicator_workers(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        symbols = ['TSLA', 'AAPL', 'MSFT']
+        for seed, symbol in enumerate(symbols):
+            build_bars(seed).to_parquet(os.path.join(directory, f"{symbol}.parquet"))
+        scenario = Scenario(symbols=symbols,
+                            interval='1h',
+                            start_date=datetime(year=2022, month=1, day=3),
+                            end_date=datetime(year=2022, month=1, day=20))
+        parallel_data_provider: DataProvider = DataProvider(data_source=FileDataSource(directory),
+                                                            indicator_workers=2)
+        self.addCleanup(parallel_data_provider.close)
+        serial_data_provider: DataProvider = DataProvider(data_source=FileDataSource(directory))
+
+        # Act
+        parallel_dataframe_per_symbol = parallel_data_provider.retrieve_datas(scenario)
+        serial_dataframe_per_symbol = serial_data_provider.retrieve_datas(scenario)
+
+        # Assert
+        for symbol in symbols:
+            pd.testing.assert_frame_equal(serial_dataframe_per_symbol[symbol], parallel_dataframe_per_symbol[symbol])
+
+
+if __name__ == '__main__':
+    unittest.main()
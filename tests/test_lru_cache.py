@@ -0,0 +1,41 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from drltrader.data.lru_cache import LRUCache
+
+
+class LRUCacheTestCase(unittest.TestCase):
+    def test_put_evicts_least_recently_used_entry(self):
+        # Arrange
+        cache = LRUCache(max_entries=2)
+        cache.put('first', 1)
+        cache.put('second', 2)
+
+        # Act
+        cache.get('first')
+        cache.put('third', 3)
+
+        # Assert
+        self.assertIn('first', cache)
+        self.assertNotIn('second', cache)
+        self.assertIn('third', cache)
+
+    def test_put_evicts_over_byte_budget(self):
+        # Arrange
+        df = pd.DataFrame(np.zeros((100, 10)))
+        df_bytes = int(df.memory_usage(index=True, deep=True).sum())
+        cache = LRUCache(max_bytes=2 * df_bytes)
+
+        # Act
+        for key in range(0, 5):
+            cache.put(key, df.copy())
+
+        # Assert
+        self.assertEqual(2, len(cache))
+        self.assertEqual(2 * df_bytes, cache.current_bytes())
+        self.assertIn(4, cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
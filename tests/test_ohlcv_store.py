@@ -0,0 +1,97 @@
+import unittest
+import tempfile
+from datetime import datetime
+from datetime import timedelta
+import pandas as pd
+
+from drltrader.data.ohlcv_store import OHLCVStore
+from drltrader.data.scenario import Scenario
+
+
+class OHLCVStoreTestCase(unittest.TestCase):
+    def setUp(self):
+        self._fetched_scenarios = []
+
+    def test_retrieve_fetches_only_missing_gaps(self):
+        # Arrange
+        store = OHLCVStore(tempfile.mkdtemp())
+        first_scenario = Scenario(symbol='TSLA',
+                                  interval='1d',
+                                  start_date=datetime(year=2021, month=3, day=1),
+                                  end_date=datetime(year=2021, month=6, day=1))
+        second_scenario = Scenario(symbol='TSLA',
+                                   interval='1d',
+                                   start_date=datetime(year=2021, month=1, day=1),
+                                   end_date=datetime(year=2021, month=9, day=1))
+
+        # Act
+        store.retrieve(first_scenario, self._fetch_data)
+        df = store.retrieve(second_scenario, self._fetch_data)
+
+        # Assert
+        self.assertEqual(3, len(self._fetched_scenarios))
+        self.assertEqual(second_scenario.start_date, self._fetched_scenarios[1].start_date)
+        self.assertEqual(first_scenario.start_date, self._fetched_scenarios[1].end_date)
+        self.assertEqual(first_scenario.end_date, self._fetched_scenarios[2].start_date)
+        self.assertEqual(second_scenario.end_date, self._fetched_scenarios[2].end_date)
+        pd.testing.assert_frame_equal(self._fetch_data(second_scenario), df, check_freq=False)
+
+    def test_retrieve_bridges_gap_to_covered_range(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        stored_scenario = Scenario(symbol='TSLA',
+                                   interval='1d',
+                                   start_date=datetime(year=2021, month=2, day=1),
+                                   end_date=datetime(year=2021, month=2, day=10))
+        earlier_scenario = Scenario(symbol='TSLA',
+                                    interval='1d',
+                                    start_date=datetime(year=2021, month=1, day=1),
+                                    end_date=datetime(year=2021, month=1, day=5))
+        gap_scenario = Scenario(symbol='TSLA',
+                                interval='1d',
+                                start_date=datetime(year=2021, month=1, day=10),
+                                end_date=datetime(year=2021, month=1, day=20))
+        OHLCVStore(directory).retrieve(stored_scenario, self._fetch_data)
+
+        # Act
+        earlier_df = OHLCVStore(directory).retrieve(earlier_scenario, self._fetch_data)
+        gap_df = OHLCVStore(directory).retrieve(gap_scenario, self._fetch_data)
+
+        # Assert
+        self.assertEqual(2, len(self._fetched_scenarios))
+        self.assertEqual(earlier_scenario.start_date, self._fetched_scenarios[1].start_date)
+        self.assertEqual(stored_scenario.start_date, self._fetched_scenarios[1].end_date)
+        pd.testing.assert_frame_equal(self._fetch_data(earlier_scenario), earlier_df, check_freq=False)
+        pd.testing.assert_frame_equal(self._fetch_data(gap_scenario), gap_df, check_freq=False)
+
+    def test_retrieve_covered_range_does_not_fetch(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        scenario = Scenario(symbol='TSLA',
+                            interval='1d',
+                            start_date=datetime(year=2021, month=1, day=1),
+                            end_date=datetime(year=2021, month=9, day=1))
+        inner_scenario = Scenario(symbol='TSLA',
+                                  interval='1d',
+                                  start_date=datetime(year=2021, month=3, day=1),
+                                  end_date=datetime(year=2021, month=6, day=1))
+        OHLCVStore(directory).retrieve(scenario, self._fetch_data)
+
+        # Act
+        df = OHLCVStore(directory).retrieve(inner_scenario, self._fetch_data)
+
+        # Assert
+        self.assertEqual(1, len(self._fetched_scenarios))
+        pd.testing.assert_frame_equal(self._fetch_data(inner_scenario), df, check_freq=False)
+
+    def _fetch_data(self, scenario: Scenario):
+        self._fetched_scenarios.append(scenario)
+
+        index = pd.date_range(scenario.start_date, scenario.end_date - timedelta(days=1), freq='1D')
+        close = index.dayofyear.to_numpy().astype(float)
+        return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': close},
+                            index=index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from drltrader.data.panel import Panel, Alignments, FillPolicies
+from drltrader.envs.portfolio_stocks_env import PortfolioStocksEnv
+from fixtures import build_bars
+
+
+class PanelTestCase(unittest.TestCase):
+    def test_from_dataframes(self):
+        # Arrange
+        dataframe_per_symbol = {'TSLA': PanelTestCase._bars(seed=1), 'AAPL': PanelTestCase._bars(seed=2)}
+
+        # Act
+        panel = Panel.from_dataframes(dataframe_per_symbol, feature_names=['Close', 'Volume'])
+
+        # Assert
+        self.assertEqual((100, 2, 2), panel.values.shape)
+        self.assertEqual(np.float32, panel.values.dtype)
+        self.assertTrue(panel.values.flags['C_CONTIGUOUS'])
+        np.testing.assert_allclose(dataframe_per_symbol['AAPL']['Close'].to_numpy(), panel.feature('Close')[:, 1],
+                                   rtol=1e-6)
+        np.testing.assert_allclose(dataframe_per_symbol['AAPL'][['Close', 'Volume']].to_numpy(),
+                                   panel.features(['Close', 'Volume'])[:, 2:], rtol=1e-6)
+
+    def test_from_dataframes_with_missing_bars(self):
+        # Arrange
+        tsla_df = PanelTestCase._bars(seed=1)
+        aapl_df = PanelTestCase._bars(seed=2).drop(index=PanelTestCase._bars(seed=2).index[[0, 1, 50]])
+
+        # Act
+        union_panel = Panel.from_dataframes({'TSLA': tsla_df, 'AAPL': aapl_df}, alignment=Alignments.Union,
+                                            fill_policy=FillPolicies.Keep)
+        filled_panel = Panel.from_dataframes({'TSLA': tsla_df, 'AAPL': aapl_df}, alignment=Alignments.Union,
+                                             fill_policy=FillPolicies.ForwardFill)
+        intersection_panel = Panel.from_dataframes({'TSLA': tsla_df, 'AAPL': aapl_df},
+                                                   alignment=Alignments.Intersection)
+
+        # Assert
+        self.assertEqual(100, len(union_panel.timestamps))
+        self.assertEqual(3, (~union_panel.mask[:, 1]).sum())
+        self.assertTrue(np.isnan(union_panel.feature('Close')[50, 1]))
+
+        self.assertEqual(98, len(filled_panel.timestamps))
+        self.assertFalse(filled_panel.mask[48, 1])
+        self.assertEqual(filled_panel.feature('Close')[47, 1], filled_panel.feature('Close')[48, 1])
+
+        self.assertTrue(aapl_df.index.equals(intersection_panel.timestamps))
+        np.testing.assert_allclose(tsla_df.loc[aapl_df.index, 'Close'], intersection_panel.feature('Close')[:, 0],
+                                   rtol=1e-6)
+
+    def test_append(self):
+        # Arrange
+        dataframe_per_symbol = {'TSLA': PanelTestCase._bars(seed=1), 'AAPL': PanelTestCase._bars(seed=2)}
+        panel = Panel.from_dataframes({symbol: df.iloc[:60] for symbol, df in dataframe_per_symbol.items()})
+        new_panel = Panel.from_dataframes({symbol: df.iloc[40:] for symbol, df in dataframe_per_symbol.items()})
+
+        # Act
+        appended_panel = panel.append(new_panel)
+
+        # Assert
+        self.assertTrue(dataframe_per_symbol['TSLA'].index.equals(appended_panel.timestamps))
+        np.testing.assert_array_equal(Panel.from_dataframes(dataframe_per_symbol).values, appended_panel.values)
+
+    def test_portfolio_stocks_env_from_panel(self):
+        # Arrange
+        dataframe_per_symbol = {'TSLA': PanelTestCase._bars(seed=1), 'AAPL': PanelTestCase._bars(seed=2)}
+        panel = Panel.from_dataframes(dataframe_per_symbol)
+
+        # Act
+        panel_environment = PortfolioStocksEnv(window_size=8,
+                                               panel=panel,
+                                               initial_portfolio_allocation={'TSLA': 1.0},
+                                               signal_feature_names=['Close', 'Volume'])
+        dataframes_environment = PortfolioStocksEnv(window_size=8,
+                                                    dataframe_per_symbol=dataframe_per_symbol,
+                                                    initial_portfolio_allocation={'TSLA': 1.0},
+                                                    signal_feature_names=['Close', 'Volume'])
+
+        # Assert
+        self.assertEqual((8, 4), panel_environment.observation_space.shape)
+        np.testing.assert_array_equal(dataframes_environment.step(1)[0], panel_environment.step(1)[0])
+
+    def test_prices_keep_float64_precision(self):
+        # Arrange
+        tsla_df = PanelTestCase._bars(seed=1)
+        aapl_df = PanelTestCase._bars(seed=2).drop(index=PanelTestCase._bars(seed=2).index[[0, 1, 50]])
+
+        # Act
+        panel = Panel.from_dataframes({'TSLA': tsla_df, 'AAPL': aapl_df}, feature_names=['Close', 'Volume'])
+        environment = PortfolioStocksEnv(window_size=8,
+                                         panel=panel,
+                                         initial_portfolio_allocation={'AAPL': 3.0},
+                                         signal_feature_names=['Close', 'Volume'])
+        environment.step(1)
+
+        # Assert
+        self.assertEqual(np.float64, panel.feature('Close').dtype)
+        self.assertEqual(np.float32, panel.feature('Volume').dtype)
+        np.testing.assert_array_equal(aapl_df['Close'].to_numpy(), panel.feature('Close')[panel.mask[:, 1], 1])
+        self.assertEqual(panel.feature('Close')[48, 1], panel.feature('Close')[47, 1])
+        self.assertEqual(3.0 * aapl_df['Close'].iloc[8], environment.initial_portfolio_value())
+        self.assertEqual(3.0 * aapl_df['Close'].iloc[9], environment.current_portfolio_value())
+
+    def test_feature_values(self):
+        # Arrange
+        panel = Panel.from_dataframes({'TSLA': PanelTestCase._bars(seed=1), 'AAPL': PanelTestCase._bars(seed=2)},
+                                      feature_names=['Close', 'Volume', 'Open'])
+
+        # Act
+        contiguous_values = panel.feature_values(['Volume', 'Open'])
+        values = panel.feature_values(['Open', 'Close'])
+        empty_values = panel.feature_values([])
+
+        # Assert
+        self.assertTrue(np.shares_memory(panel.values, contiguous_values))
+        np.testing.assert_array_equal(panel.values[:, :, [2, 0]], values)
+        self.assertEqual((100, 2, 0), empty_values.shape)
+
+    @staticmethod
+    def _bars(seed: int):
+        return build_bars(seed, start_date=datetime(year=2022, month=1, day=3), periods=100,
+                          freq=pd.Timedelta(minutes=5))
+
+
+if __name__ == '__main__':
+    unittest.main()
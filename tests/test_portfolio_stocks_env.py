@@ -2,10 +2,14 @@ import unittest
 import random
 from datetime import datetime
 from datetime import timedelta
+import numpy as np
+import pandas as pd
 
 from drltrader.data.scenario import Scenario
 from drltrader.envs.portfolio_stocks_env import PortfolioStocksEnv
+from drltrader.envs.portfolio_stocks_env import InfoModes
 from drltrader.data.data_provider import DataProvider
+from drltrader.data.panel import Panel
 
 
 class PortfolioStocksEnvTestCase(unittest.TestCase):
@@ -102,6 +106,173 @@ class PortfolioStocksEnvTestCase(unittest.TestCase):
         obs, rewards, done, info = environment.step(action)
         self.assertIsNotNone(obs)
 
+    def test_observation_views(self):
+        # Arrange
+        panel = self._build_testing_panel()
+        environment = PortfolioStocksEnv(window_size=8,
+                                         panel=panel,
+                                         initial_portfolio_allocation={'TSLA': 1.0},
+                                         signal_feature_names=['RSI_4', 'RSI_16'],
+                                         copy_observations=False)
+
+        # Act
+        obs, rewards, done, info = environment.step(1)
+
+        # Assert
+        expected_obs = np.hstack([panel.values[1:9, symbol_idx, 1:] for symbol_idx in range(3)])
+        self.assertEqual(np.float32, obs.dtype)
+        self.assertFalse(obs.flags.writeable)
+        np.testing.assert_array_equal(expected_obs, obs)
+        np.testing.assert_array_equal(expected_obs, environment._observation_windows[1].reshape(8, -1))
+        self.assertTrue(np.shares_memory(panel.values, environment._observation_windows))
+
+    def test_observation_views_of_signals_panel(self):
+        # Arrange
+        panel = self._build_testing_panel()
+        signals_panel = Panel(panel.values[:, :, 1:], panel.timestamps, panel.symbols, ['RSI_4', 'RSI_16'])
+        environment = PortfolioStocksEnv(window_size=8,
+                                         panel=signals_panel,
+                                         initial_portfolio_allocation={'TSLA': 1.0},
+                                         prices_feature_name='RSI_4',
+                                         signal_feature_names=['RSI_4', 'RSI_16'],
+                                         copy_observations=False)
+
+        # Act
+        obs, rewards, done, info = environment.step(1)
+        copied_obs = environment._get_observation(9).copy()
+
+        # Assert
+        self.assertTrue(np.shares_memory(signals_panel.values, obs))
+        np.testing.assert_array_equal(copied_obs, obs)
+
+    def test_init_with_short_panel(self):
+        # Arrange
+        panel = self._build_testing_panel()
+        short_panel = Panel(panel.values[:8], panel.timestamps[:8], panel.symbols, panel.feature_names)
+
+        # Act/Assert
+        with self.assertRaises(ValueError):
+            PortfolioStocksEnv(window_size=8,
+                               panel=short_panel,
+                               initial_portfolio_allocation={'TSLA': 1.0},
+                               signal_feature_names=['RSI_4', 'RSI_16'])
+
+    def test_portfolio_valuation(self):
+        # Arrange
+        panel = self._build_testing_panel()
+        environment = PortfolioStocksEnv(window_size=8,
+                                         panel=panel,
+                                         initial_portfolio_allocation={'TSLA': 1.0},
+                                         signal_feature_names=['RSI_4', 'RSI_16'])
+        prices = panel.feature('Close').astype(np.float64)
+
+        # Act
+        environment.step(1)
+        obs, rewards, done, info = environment.step(2)
+
+        # Assert
+        msft_shares = prices[9, 0] * (1.0 - PortfolioStocksEnv.ALLOCATION_PENALTY) / prices[9, 1]
+        aapl_shares = msft_shares * prices[10, 1] * (1.0 - PortfolioStocksEnv.ALLOCATION_PENALTY) / prices[10, 2]
+        portfolio_allocation = environment.portfolio_allocation()
+        self.assertEqual(0.0, portfolio_allocation['TSLA'] + portfolio_allocation['MSFT'])
+        self.assertAlmostEqual(aapl_shares, portfolio_allocation['AAPL'])
+        self.assertAlmostEqual(prices[8, 0], environment.initial_portfolio_value(), places=6)
+        self.assertAlmostEqual(aapl_shares * prices[10, 2] / prices[8, 0], rewards)
+        self.assertEqual(rewards, info['current_profit'])
+
+    def test_scalars_info_mode(self):
+        # Arrange
+        environment = PortfolioStocksEnv(window_size=8,
+                                         panel=self._build_testing_panel(),
+                                         initial_portfolio_allocation={'TSLA': 1.0},
+                                         signal_feature_names=['RSI_4', 'RSI_16'],
+                                         info_mode=InfoModes.Scalars)
+
+        # Act
+        infos = []
+        done = False
+        action = 0
+        while not done:
+            action = (action + 1) % 3
+            obs, rewards, done, info = environment.step(action)
+            infos.append(info)
+
+        # Assert
+        self.assertEqual(['current_profit', 'current_portfolio_value'], list(infos[0].keys()))
+        allocations_history = infos[-1]['allocations_history']
+        self.assertEqual(len(infos), len(allocations_history))
+        self.assertEqual(list(range(9, 9 + len(infos))), list(allocations_history.records()['allocation_tick']))
+        self.assertEqual('TSLA', allocations_history[0]['source_symbol'])
+        self.assertEqual('MSFT', allocations_history[0]['target_symbol'])
+
+    def test_live_mode(self):
+        # Arrange
+        panel = self._build_testing_panel()
+        first_panel = Panel(panel.values[:22], panel.timestamps[:22], panel.symbols, panel.feature_names,
+                            prices=panel.prices[:22])
+        live_environment = PortfolioStocksEnv(window_size=8,
+                                              panel=first_panel,
+                                              initial_portfolio_allocation={'TSLA': 1.0},
+                                              signal_feature_names=['RSI_4', 'RSI_16'])
+        environment = PortfolioStocksEnv(window_size=8,
+                                         panel=panel,
+                                         initial_portfolio_allocation={'TSLA': 1.0},
+                                         signal_feature_names=['RSI_4', 'RSI_16'])
+        for action in [1, 2, 0, 0, 1, 1, 2, 0, 1, 2, 2, 0, 1]:
+            live_environment.step(action)
+            environment.step(action)
+
+        # Act
+        live_environment.enable_live_mode(lookback=5)
+        for end in range(25, 65, 3):
+            live_environment.append_data(panel=Panel(panel.values[end - 6:end],
+                                                     panel.timestamps[end - 6:end],
+                                                     panel.symbols,
+                                                     panel.feature_names,
+                                                     prices=panel.prices[end - 6:end]))
+            for action in [2, 1, 1]:
+                live_obs, live_rewards, live_done, live_info = live_environment.step(action)
+                obs, rewards, done, info = environment.step(action)
+
+                # Assert
+                np.testing.assert_array_equal(obs, live_obs)
+                self.assertEqual(rewards, live_rewards)
+
+        self.assertTrue(live_done)
+        self.assertTrue(done)
+        self.assertEqual(panel.timestamps[-1], live_environment.last_timestamp())
+        with self.assertRaises(ValueError):
+            live_environment.append_data(panel=Panel(panel.values,
+                                                     panel.timestamps + pd.Timedelta(days=1),
+                                                     panel.symbols,
+                                                     panel.feature_names))
+
+    def test_random_start_offsets(self):
+        # Arrange
+        environment = PortfolioStocksEnv(window_size=8,
+                                         panel=self._build_testing_panel(),
+                                         initial_portfolio_allocation={'TSLA': 1.0},
+                                         signal_feature_names=['RSI_4', 'RSI_16'],
+                                         random_start_offsets=True,
+                                         seed=0)
+
+        # Act
+        start_ticks = []
+        for _ in range(16):
+            environment.reset()
+            start_ticks.append(environment._current_tick)
+
+        # Assert
+        self.assertGreater(len(set(start_ticks)), 1)
+        self.assertTrue(all(8 <= start_tick < 63 for start_tick in start_ticks))
+        self.assertEqual(1.0, environment.current_profit())
+
+    def _build_testing_panel(self) -> Panel:
+        values = np.random.default_rng(0).uniform(1.0, 2.0, size=(64, 3, 3))
+        timestamps = pd.date_range('2022-01-03 09:30', periods=64, freq=pd.Timedelta(minutes=5))
+
+        return Panel(values, timestamps, ['TSLA', 'MSFT', 'AAPL'], ['Close', 'RSI_4', 'RSI_16'])
+
     def _build_testing_dataframe_per_symbol(self):
         scenario = Scenario(symbols=['TSLA', 'MSFT', 'AAPL'],
                             start_date=datetime.now() - timedelta(days=30),
@@ -0,0 +1,80 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from drltrader.data.panel import Panel
+from drltrader.envs.portfolio_stocks_env import PortfolioStocksEnv
+from drltrader.envs.portfolio_stocks_vec_env import PortfolioStocksVecEnv
+
+
+class PortfolioStocksVecEnvTestCase(unittest.TestCase):
+    def test_step(self):
+        # Arrange
+        panel = self._build_testing_panel()
+        vec_env = PortfolioStocksVecEnv(panel=panel,
+                                        window_size=8,
+                                        num_envs=3,
+                                        initial_portfolio_allocation={'TSLA': 1.0},
+                                        signal_feature_names=['RSI_4', 'RSI_16'],
+                                        random_start_offsets=False)
+        envs = [PortfolioStocksEnv(window_size=8,
+                                   panel=panel,
+                                   initial_portfolio_allocation={'TSLA': 1.0},
+                                   signal_feature_names=['RSI_4', 'RSI_16']) for _ in range(3)]
+        random_generator = np.random.default_rng(0)
+
+        # Act
+        vec_obs = vec_env.reset()
+        obs = [env.reset() for env in envs]
+        np.testing.assert_array_equal(np.stack(obs), vec_obs)
+
+        while True:
+            actions = random_generator.integers(0, 3, size=3)
+            vec_obs, vec_rewards, vec_dones, vec_infos = vec_env.step(actions)
+            obs, rewards, dones, infos = zip(*[env.step(action) for env, action in zip(envs, actions)])
+
+            # Assert
+            np.testing.assert_allclose(np.array(rewards, dtype=np.float32), vec_rewards, rtol=1e-6)
+            np.testing.assert_array_equal(np.array(dones), vec_dones)
+            if vec_dones.all():
+                break
+
+            np.testing.assert_array_equal(np.stack(obs), vec_obs)
+
+        np.testing.assert_array_equal(np.stack(obs), np.stack([info['terminal_observation'] for info in vec_infos]))
+        for info, vec_info in zip(infos, vec_infos):
+            np.testing.assert_allclose(list(info['portfolio_allocation'].values()),
+                                       list(vec_info['portfolio_allocation'].values()))
+        np.testing.assert_array_equal(np.full(3, 8), vec_env.current_ticks())
+        self.assertTrue(np.shares_memory(panel.values, vec_env._observation_windows))
+
+    def test_random_start_offsets(self):
+        # Arrange
+        vec_env = PortfolioStocksVecEnv(panel=self._build_testing_panel(),
+                                        window_size=8,
+                                        num_envs=16,
+                                        initial_portfolio_allocation={'TSLA': 1.0},
+                                        signal_feature_names=['RSI_4', 'RSI_16'],
+                                        seed=0)
+
+        # Act
+        vec_env.reset()
+        start_ticks = vec_env.current_ticks()
+        vec_obs, vec_rewards, vec_dones, vec_infos = vec_env.step(np.zeros(16))
+
+        # Assert
+        self.assertGreater(len(np.unique(start_ticks)), 1)
+        self.assertTrue(((start_ticks >= 8) & (start_ticks < 63)).all())
+        self.assertEqual((16, 8, 6), vec_obs.shape)
+        np.testing.assert_allclose(vec_env._prices[start_ticks + 1, 0] / vec_env._prices[start_ticks, 0], vec_rewards,
+                                   rtol=1e-6)
+
+    def _build_testing_panel(self) -> Panel:
+        values = np.random.default_rng(0).uniform(1.0, 2.0, size=(64, 3, 3))
+        timestamps = pd.date_range('2022-01-03 09:30', periods=64, freq=pd.Timedelta(minutes=5))
+
+        return Panel(values, timestamps, ['TSLA', 'MSFT', 'AAPL'], ['Close', 'RSI_4', 'RSI_16'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+import tempfile
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from drltrader.data.data_provider import DataProvider
+from drltrader.data.resampling import resample_ohlcv
+from drltrader.data.scenario import Scenario
+from drltrader.data.sources.file_data_source import FileDataSource
+from fixtures import build_session_bars
+
+
+class ResamplingTestCase(unittest.TestCase):
+    def test_resample_ohlcv(self):
+        # Arrange
+        df = build_session_bars(seed=0, days=20)
+
+        # Act
+        hourly_df = resample_ohlcv(df, '1h')
+        daily_df = resample_ohlcv(df, '1d')
+
+        # Assert
+        first_hour_df = df.iloc[:12]
+        self.assertEqual(pd.Timestamp('2022-01-03 09:30', tz='America/New_York'), hourly_df.index[0])
+        self.assertEqual(pd.Timestamp('2022-01-03 10:30', tz='America/New_York'), hourly_df.index[1])
+        self.assertEqual(first_hour_df['Open'].iloc[0], hourly_df['Open'].iloc[0])
+        self.assertEqual(first_hour_df['High'].max(), hourly_df['High'].iloc[0])
+        self.assertEqual(first_hour_df['Low'].min(), hourly_df['Low'].iloc[0])
+        self.assertEqual(first_hour_df['Close'].iloc[-1], hourly_df['Close'].iloc[0])
+        self.assertAlmostEqual(first_hour_df['Volume'].sum(), hourly_df['Volume'].iloc[0])
+        expected_daily_df = df.resample('D').agg({'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last',
+                                                  'Volume': 'sum'}).dropna()
+        np.testing.assert_allclose(expected_daily_df.to_numpy(), daily_df.to_numpy())
+
+    def test_retrieve_data_from_base_interval(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(directory, '5m'))
+        build_session_bars(seed=0, days=20).to_parquet(os.path.join(directory, '5m', 'TSLA.parquet'))
+        data_provider: DataProvider = DataProvider(data_source=FileDataSource(directory), base_interval='5m')
+
+        # Act
+        hourly_df = data_provider.retrieve_data(Scenario(symbol='TSLA',
+                                                         interval='1h',
+                                                         start_date=datetime(year=2022, month=1, day=3),
+                                                         end_date=datetime(year=2022, month=1, day=8)))
+        daily_df = data_provider.retrieve_data(Scenario(symbol='TSLA',
+                                                        interval='1d',
+                                                        start_date=datetime(year=2022, month=1, day=3),
+                                                        end_date=datetime(year=2022, month=1, day=22)))
+
+        # Assert
+        self.assertEqual(5 * 7 - 1, len(hourly_df.index))
+        self.assertEqual(3 * 5 - 1, len(daily_df.index))
+        self.assertIn('RSI_4', daily_df.columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import pickle
+from datetime import datetime
+
+from drltrader.data.scenario import Scenario
+
+
+class ScenarioTestCase(unittest.TestCase):
+    def test_equality_and_hashing(self):
+        # Arrange
+        scenario = Scenario(symbols=['TSLA', 'AAPL'],
+                            start_date=datetime(2022, 1, 3, 9, 30),
+                            end_date=datetime(2022, 1, 7, 16, 2),
+                            interval='5m')
+        same_bar_scenario = Scenario(symbols=('TSLA', 'AAPL'),
+                                     start_date=datetime(2022, 1, 3, 9, 34),
+                                     end_date=datetime(2022, 1, 7, 16, 0),
+                                     interval='5m')
+
+        # Act
+        cache = {scenario: 'value'}
+
+        # Assert
+        self.assertEqual(scenario, same_bar_scenario)
+        self.assertEqual('value', cache[same_bar_scenario])
+        self.assertEqual(str(scenario), str(same_bar_scenario))
+        self.assertEqual(scenario, pickle.loads(pickle.dumps(scenario)))
+        self.assertNotEqual(scenario, scenario.copy_with_interval('1h'))
+        self.assertIs(scenario.clone_with_symbol('TSLA'), scenario.clone_with_symbol('TSLA'))
+        with self.assertRaises(AttributeError):
+            scenario.end_date = datetime(2022, 2, 1)
+
+    def test_overlap_and_difference(self):
+        # Arrange
+        scenario = Scenario(symbol='TSLA', start_date=datetime(2022, 1, 1), end_date=datetime(2022, 3, 1))
+        inner_scenario = scenario.copy_with_dates(datetime(2022, 1, 15), datetime(2022, 2, 1))
+        later_scenario = scenario.copy_with_dates(datetime(2022, 2, 1), datetime(2022, 4, 1))
+        disjoint_scenario = scenario.copy_with_dates(datetime(2022, 5, 1), datetime(2022, 6, 1))
+
+        # Act
+        differences = scenario.difference(inner_scenario)
+
+        # Assert
+        self.assertEqual(inner_scenario, scenario.overlap(inner_scenario))
+        self.assertEqual(scenario.copy_with_dates(datetime(2022, 2, 1), datetime(2022, 3, 1)),
+                         scenario.overlap(later_scenario))
+        self.assertIsNone(scenario.overlap(disjoint_scenario))
+        self.assertEqual([scenario.copy_with_dates(datetime(2022, 1, 1), datetime(2022, 1, 15)),
+                          scenario.copy_with_dates(datetime(2022, 2, 1), datetime(2022, 3, 1))], differences)
+        self.assertEqual([], inner_scenario.difference(scenario))
+        self.assertEqual([scenario], scenario.difference(disjoint_scenario))
+        with self.assertRaises(ValueError):
+            scenario.overlap(scenario.clone_with_symbol('AAPL'))
+
+
+if __name__ == '__main__':
+    unittest.main()
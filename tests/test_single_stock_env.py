@@ -1,6 +1,8 @@
 import unittest
 from datetime import datetime
 from datetime import timedelta
+import numpy as np
+import pandas as pd
 
 from drltrader.data.scenario import Scenario
 from drltrader.envs.single_stock_env import SingleStockEnv
@@ -25,6 +27,40 @@ class SingleStockEnvTestCase(unittest.TestCase):
         # Assert
         self.assertIsNotNone(environment)
 
+    def test_step_without_modifying_dataframe(self):
+        # Arrange
+        df = SingleStockEnvTestCase._build_testing_dataframe()
+        environments = [SingleStockEnv(df=df,
+                                       window_size=4,
+                                       frame_bound=(4, len(df.index) - 1),
+                                       prices_feature_name='Close',
+                                       signal_feature_names=['RSI_6']) for _ in range(2)]
+
+        # Act
+        observations = [environment.reset() for environment in environments]
+        for action in [1, 1, 0, 1]:
+            results = [environment.step(action) for environment in environments]
+
+        # Assert
+        self.assertEqual(['Close', 'RSI_6'], list(df.columns))
+        np.testing.assert_array_equal(observations[0], observations[1])
+        obs, rewards, done, info = results[0]
+        close = df['Close'].to_numpy()
+        fees = (1 - SingleStockEnv.TRADE_FEE_ASK_PERCENT) * (1 - SingleStockEnv.TRADE_FEE_BID_PERCENT)
+        self.assertAlmostEqual(fees * close[7] / close[5], info['total_profit'])
+        self.assertAlmostEqual(fees * close[7] / close[5] - 1.0, info['total_reward'])
+        self.assertEqual(0.0, rewards)
+        self.assertEqual((4, 3), obs.shape)
+        np.testing.assert_allclose([1.0 - fees * close[6] / close[5], 1.0], obs[1, :2], rtol=1e-6)
+        np.testing.assert_array_equal([0.0, 0.0], obs[3, :2])
+
+    @staticmethod
+    def _build_testing_dataframe() -> pd.DataFrame:
+        values = np.random.default_rng(0).uniform(1.0, 2.0, size=(32, 2))
+        return pd.DataFrame(values,
+                            index=pd.date_range('2022-01-03 09:30', periods=32, freq=pd.Timedelta(minutes=5)),
+                            columns=['Close', 'RSI_6'])
+
 
 if __name__ == '__main__':
     unittest.main()
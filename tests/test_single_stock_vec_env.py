@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from drltrader.envs.single_stock_env import SingleStockEnv
+from drltrader.envs.single_stock_vec_env import SingleStockVecEnv
+
+
+class SingleStockVecEnvTestCase(unittest.TestCase):
+    def test_step(self):
+        # Arrange
+        df = self._build_testing_dataframe()
+        vec_env = SingleStockVecEnv(df=df,
+                                    window_size=4,
+                                    frame_bound=(4, len(df.index) - 1),
+                                    prices_feature_name='Close',
+                                    signal_feature_names=['RSI_6'],
+                                    num_envs=4,
+                                    random_start_offsets=False)
+        envs = [SingleStockEnv(df=df,
+                               window_size=4,
+                               frame_bound=(4, len(df.index) - 1),
+                               prices_feature_name='Close',
+                               signal_feature_names=['RSI_6']) for _ in range(4)]
+        random_generator = np.random.default_rng(0)
+
+        # Act
+        vec_obs = vec_env.reset()
+        obs = [env.reset() for env in envs]
+        np.testing.assert_array_equal(np.stack(obs), vec_obs)
+
+        while True:
+            actions = random_generator.integers(0, 2, size=4)
+            vec_obs, vec_rewards, vec_dones, vec_infos = vec_env.step(actions)
+            obs, rewards, dones, infos = zip(*[env.step(action) for env, action in zip(envs, actions)])
+
+            # Assert
+            np.testing.assert_allclose(np.array(rewards, dtype=np.float32), vec_rewards, rtol=1e-6)
+            np.testing.assert_array_equal(np.array(dones), vec_dones)
+            for info, vec_info in zip(infos, vec_infos):
+                self.assertAlmostEqual(info['total_profit'], vec_info['total_profit'])
+                self.assertEqual(info['position'], vec_info['position'])
+            if vec_dones.all():
+                break
+
+            np.testing.assert_allclose(np.stack(obs), vec_obs, rtol=1e-6)
+
+        np.testing.assert_allclose(np.stack(obs), np.stack([info['terminal_observation'] for info in vec_infos]),
+                                   rtol=1e-6)
+        np.testing.assert_array_equal(np.full(4, 4), vec_env.current_ticks())
+
+    def _build_testing_dataframe(self) -> pd.DataFrame:
+        values = np.random.default_rng(0).uniform(1.0, 2.0, size=(64, 2))
+        return pd.DataFrame(values,
+                            index=pd.date_range('2022-01-03 09:30', periods=64, freq=pd.Timedelta(minutes=5)),
+                            columns=['Close', 'RSI_6'])
+
+
+if __name__ == '__main__':
+    unittest.main()
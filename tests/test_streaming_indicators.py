@@ -0,0 +1,111 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from drltrader.data.data_provider import DataProvider
+from drltrader.data.scenario import Scenario
+from drltrader.data.sources.file_data_source import FileDataSource
+from drltrader.data.streaming_indicators import StreamingIndicatorEngine
+
+
+class StreamingIndicatorEngineTestCase(unittest.TestCase):
+    def test_update_matches_batch_indicators(self):
+        # Arrange
+        data_provider: DataProvider = DataProvider()
+        df = self._build_testing_dataframe()
+        batch_df = df.copy()
+        data_provider._calculate_indicators(batch_df)
+
+        engine = StreamingIndicatorEngine(data_provider._parse_indicators())
+
+        # Act
+        streamed_dfs = [engine.update(df.iloc[:300])]
+        for row_idx in range(300, len(df.index)):
+            streamed_dfs.append(engine.update(df.iloc[row_idx:row_idx + 1]))
+        streamed_df = pd.concat(streamed_dfs)
+
+        # Assert
+        self.assertListEqual(data_provider.indicator_column_names, list(streamed_df.columns))
+        np.testing.assert_allclose(batch_df[data_provider.indicator_column_names].to_numpy(),
+                                   streamed_df.to_numpy(),
+                                   rtol=1e-9, atol=1e-8)
+
+    def test_retrieve_live_datas_keeps_a_bounded_stream(self):
+        # Arrange
+        data_provider, batch_data_provider = self._build_testing_data_providers()
+        lookback = StreamingIndicatorEngine(data_provider._parse_indicators()).lookback
+
+        # Act
+        first_df = data_provider.retrieve_live_datas(self._live_scenario(day=3, end_day=10))['TSLA']
+        second_df = data_provider.retrieve_live_datas(self._live_scenario(day=3, end_day=12))['TSLA']
+        third_df = data_provider.retrieve_live_datas(self._live_scenario(day=3, end_day=13))['TSLA']
+        batch_df = batch_data_provider.retrieve_data(self._scenario(day=3, end_day=13))
+
+        # Assert
+        self.assertEqual(7 * 24 - 1, len(first_df.index))
+        self.assertEqual(lookback + 2 * 24, len(second_df.index))
+        self.assertEqual(lookback + 24, len(third_df.index))
+        self.assertEqual(second_df.index[-1], third_df.index[-25])
+        for streamed_df in [first_df, second_df, third_df]:
+            np.testing.assert_allclose(batch_df.loc[streamed_df.index, streamed_df.columns].to_numpy(),
+                                       streamed_df.to_numpy(),
+                                       rtol=1e-9, atol=1e-8)
+
+    def test_retrieve_data_with_streaming_returns_whole_scenario(self):
+        # Arrange
+        data_provider, batch_data_provider = self._build_testing_data_providers()
+        data_provider.retrieve_live_datas(self._live_scenario(day=3, end_day=10))
+
+        # Act
+        first_df = data_provider.retrieve_data(self._scenario(day=3, end_day=10))
+        second_df = data_provider.retrieve_data(self._scenario(day=3, end_day=12))
+
+        # Assert
+        self.assertEqual(7 * 24 - 1, len(first_df.index))
+        self.assertEqual(9 * 24 - 1, len(second_df.index))
+        pd.testing.assert_frame_equal(batch_data_provider.retrieve_data(self._scenario(day=3, end_day=12)),
+                                      second_df)
+
+    def _build_testing_data_providers(self):
+        # Streaming and batch data providers over the same hourly bars
+        directory = tempfile.mkdtemp()
+        df = self._build_testing_dataframe()
+        df.index = pd.date_range('2022-01-01', periods=len(df.index), freq=pd.Timedelta(hours=1))
+        df.to_parquet(os.path.join(directory, 'TSLA.parquet'))
+
+        return DataProvider(streaming_enabled=True, cache_enabled=False, data_source=FileDataSource(directory)), \
+            DataProvider(cache_enabled=False, data_source=FileDataSource(directory))
+
+    @staticmethod
+    def _scenario(day: int, end_day: int):
+        return Scenario(symbol='TSLA',
+                        interval='1h',
+                        start_date=datetime(year=2022, month=1, day=day),
+                        end_date=datetime(year=2022, month=1, day=end_day))
+
+    @staticmethod
+    def _live_scenario(day: int, end_day: int):
+        return Scenario(symbols=['TSLA'],
+                        interval='1h',
+                        start_date=datetime(year=2022, month=1, day=day),
+                        end_date=datetime(year=2022, month=1, day=end_day))
+
+    def _build_testing_dataframe(self):
+        random_generator = np.random.default_rng(0)
+        close = 100 * np.exp(np.cumsum(random_generator.normal(0.0, 0.01, 400)))
+        close[10:14] = close[9]
+
+        return pd.DataFrame({
+            'Open': close * (1 + random_generator.normal(0.0, 0.003, 400)),
+            'High': close * (1 + random_generator.uniform(0.0, 0.01, 400)),
+            'Low': close * (1 - random_generator.uniform(0.0, 0.01, 400)),
+            'Close': close,
+            'Volume': random_generator.integers(1000, 100000, 400).astype(float)
+        }, index=pd.date_range('2022-03-01', periods=400, freq='5min'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import os
+import tempfile
 import warnings
 from datetime import datetime
 from datetime import timedelta
@@ -6,7 +8,9 @@ from datetime import timedelta
 from drltrader.brain.brain import BrainConfiguration
 from drltrader.data.data_provider import DataProvider
 from drltrader.data.data_provider import Scenario
+from drltrader.data.sources.file_data_source import FileDataSource
 from drltrader.trainer.evolutionary_trainer import EvolutionaryTrainer, TrainingConfiguration
+from fixtures import build_bars
 
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
@@ -94,6 +98,37 @@ class EvolutionaryTrainerTestCase(unittest.TestCase):
         self.assertIsNotNone(best_brain_configuration)
         print(best_brain_configuration)
 
+    def test_short_train_multi_stock_in_workers(self):
+        # Arrange
+        directory = tempfile.mkdtemp()
+        for seed, symbol in enumerate(['TSLA', 'AAPL', 'MSFT']):
+            build_bars(seed).to_parquet(os.path.join(directory, f"{symbol}.parquet"))
+        data_provider: DataProvider = DataProvider(data_source=FileDataSource(directory),
+                                                   feature_cache_directory=os.path.join(directory, 'features'))
+        EvolutionaryTrainer.INSTANCE = None
+        trainer: EvolutionaryTrainer = EvolutionaryTrainer(data_provider=data_provider)
+
+        training_scenarios = [Scenario(symbols=['TSLA', 'AAPL', 'MSFT'],
+                                       interval='1h',
+                                       start_date=datetime(year=2022, month=1, day=3),
+                                       end_date=datetime(year=2022, month=1, day=20))]
+        training_configuration = TrainingConfiguration(training_scenarios=training_scenarios,
+                                                       testing_scenarios=training_scenarios,
+                                                       generations=1,
+                                                       start_timesteps=100,
+                                                       stop_timesteps=100,
+                                                       workers=2)
+
+        # Act
+        best_brain_configuration: BrainConfiguration = trainer.train(training_configuration)
+
+        # Assert
+        self.assertIsNotNone(best_brain_configuration)
+        self.assertIsNone(trainer.pool)
+        self.assertIsNone(trainer._temporary_store_directory)
+        self.assertEqual(12, len(trainer.solutions_statistics.index))
+        self.assertEqual(sorted(trainer.fitness_cache), sorted(trainer.solutions_statistics.index))
+
     def test_big_train_multi_stock(self):
         # Arrange
         data_provider: DataProvider = DataProvider()